@@ -1,7 +1,12 @@
 import pandas as pd
 import scipy.optimize as opt
 import numpy as np
-from numpy import cos, sin, arcsin, sqrt, log
+from numpy import log
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from Distance_engine import haversine_df
 
 class Demand_forcast():
     def __init__(self):
@@ -36,25 +41,12 @@ class Demand_forcast():
         return data, demand_2020
 
     def calculate_distance(self):
-        deg2rad = np.pi/180
         airports = self.data.columns
 
-        d = np.zeros([len(airports),len(airports)])
-        for i, airport_i in enumerate(airports):
-            for j, airport_j in enumerate(airports):
-
-                ##just for conviniece
-                phi_i = deg2rad * self.data[airport_i]['Latitude']
-                phi_j = deg2rad * self.data[airport_j]['Latitude']
-                lambda_i = deg2rad * self.data[airport_i]['Longitude']
-                lambda_j = deg2rad * self.data[airport_j]['Longitude']
-
-                term_1 = (sin( (phi_i-phi_j)/2 ))**2
-                term_2 = cos(phi_i)*cos(phi_j)*(sin( (lambda_i-lambda_j)/2 ))**2
-
-                d[i,j] =  2 * self.R_E * arcsin(sqrt(term_1+term_2))
-
-        distance = pd.DataFrame(d,airports,airports)
+        distance = haversine_df(airports=airports,
+                                lat=self.data.loc['Latitude'].to_numpy(dtype=float),
+                                lon=self.data.loc['Longitude'].to_numpy(dtype=float),
+                                R=self.R_E)
 
         return distance
 
@@ -7,6 +7,8 @@
 # Built-in/Generic Imports
 from copy import deepcopy
 from math import log
+import os
+import sys
 
 # Libs
 import pandas as pd
@@ -18,6 +20,9 @@ import plotly.graph_objects as go
 # Own modules
 from Network_generator_1B import generate_data
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from Metrics import metrics, model_size, solve_result
+
 __version__ = '1.1.1'
 
 ################################################################################################################
@@ -32,10 +37,13 @@ AC_productivity = True
 # ============================================================================= Generate data
 # ======================================================================================================
 
+phase = metrics.phase("Model_1B data").start()
 hub, hub_ref, max_continuous_operation, average_load_factor, \
 aircraft_dict, airports_dict, distances_df, demand_df, yield_df = generate_data()
+phase.stop(airports=len(airports_dict), aircraft_types=len(aircraft_dict))
 
 # -> Creating model
+phase = metrics.phase("Model_1B build").start()
 model = gp.Model("APO_assignment_model_1B")
 
 # -> Disabling the gurobi console output, set to 1 to enable
@@ -236,7 +244,12 @@ model.setObjective(objective_function, GRB.MAXIMIZE)
 
 # model.write("Model_1B.lp")
 print("Model 1 compiled!!!\n")
+model.update()
+phase.stop(**model_size(model))
+
+phase = metrics.phase("Model_1B optimize").start()
 model.optimize()
+phase.stop(**solve_result(model))
 model.printStats()
 
 # ======================================================================================================
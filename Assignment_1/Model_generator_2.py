@@ -7,6 +7,8 @@
 # Built-in/Generic Imports
 from copy import deepcopy
 from math import log
+import os
+import sys
 
 # Libs
 import pandas as pd
@@ -19,6 +21,9 @@ import plotly.graph_objects as go
 from Network_generator_2 import generate_data
 from Progress_bar import Progress_bar
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from Metrics import metrics, model_size, solve_result
+
 __version__ = '1.1.1'
 
 ################################################################################################################
@@ -35,11 +40,14 @@ utilisation_constraint = True
 
 display_progress_bars = True
 airports_included = 5
+phase = metrics.phase("Model_2 data", airports_included=airports_included).start()
 hub, hub_ref, max_continuous_operation, average_load_factor, \
 aircraft_dict, airports_dict, distances_df, routes_dict, demand_df, yield_df = \
     generate_data(include_two_stop_routes=True, include_electric_ac=True, airports_included=airports_included)
+phase.stop(airports=len(airports_dict), routes=len(routes_dict), aircraft_types=len(aircraft_dict))
 
 # -> Creating model
+phase = metrics.phase("Model_2 build").start()
 model = gp.Model("APO_assignment_model")
 
 # -> Disabling the gurobi console output, set to 1 to enable
@@ -476,9 +484,13 @@ model.setObjective(objective_function, GRB.MAXIMIZE)
 print("write_mode....")
 # model.write("Model_2.lp")
 print("\nModel compiled!!!")
+model.update()
+phase.stop(**model_size(model))
 
 print("optimize")
+phase = metrics.phase("Model_2 optimize").start()
 model.optimize()
+phase.stop(**solve_result(model))
 
 flow_x = deepcopy(edges_df)
 flow_w = deepcopy(edges_df)
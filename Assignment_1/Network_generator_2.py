@@ -1,37 +1,19 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from math import sqrt, pi, sin, cos
-from numpy import arcsin
+import os
 import sys
 from copy import deepcopy
 from Demand_forecast_1A import Demand_forcast
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from Distance_engine import haversine_df
+
 USD2EUR = 1  # EUR/USD in 2020
 e_eur = 0.07 * USD2EUR  # EUR/kWh
 f_eur = 1.42 * USD2EUR  # EUR/gallon
 
 
-def haversine(coord1: tuple, coord2: tuple):
-    deg2rad = pi / 180
-    R = 6371
-    lat1, lon1 = coord1
-    lat2, lon2 = coord2
-
-    # just for convenience
-    phi_i = deg2rad * lat1
-    phi_j = deg2rad * lat2
-    lambda_i = deg2rad * lon1
-    lambda_j = deg2rad * lon2
-
-    term_1 = (sin((phi_i - phi_j) / 2)) ** 2
-    term_2 = cos(phi_i) * cos(phi_j) * (sin((lambda_i - lambda_j) / 2)) ** 2
-
-    km = 2 * R * arcsin(sqrt(term_1 + term_2))
-
-    return 0, km
-
-
 def generate_data(include_two_stop_routes=True, include_electric_ac=True, airports_included=15):
     # -> Set Network hub
     hub = "Malmö"
@@ -185,20 +167,18 @@ def generate_data(include_two_stop_routes=True, include_electric_ac=True, airpor
         }
 
         # -> Create network legs len df
-    distances_df = deepcopy(edges_df)
+    distances_df = haversine_df(airports=airports_dict.keys(),
+                                lat=[airport["lat"] for airport in airports_dict.values()],
+                                lon=[airport["lon"] for airport in airports_dict.values()])
     yield_df = deepcopy(edges_df)
 
     # -> Solving for legs values
     for airport_i_ref, airport_i in airports_dict.items():
-        # -> Solving for distance between nodes using haversine equation
         for airport_j_ref, airport_j in airports_dict.items():
             if airport_i_ref == airport_j_ref:
                 continue
             else:
-                leg_len = \
-                    haversine((airport_i["lat"], airport_i["lon"]), (airport_j["lat"], airport_j["lon"]))[1]
-
-                distances_df.loc[airport_i_ref, airport_j_ref] = leg_len
+                leg_len = distances_df.at[airport_i_ref, airport_j_ref]
 
                 # Solve for leg yield per passenger
                 yield_df.loc[airport_i_ref, airport_j_ref] = 5.9 * leg_len ** (-0.76) + 0.043
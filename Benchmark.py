@@ -0,0 +1,313 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+
+Benchmark of the network build, model build and solve phases on the input files and on synthetic instances.
+    python Benchmark.py --scenario input --scenario 12x192x1000 --output benchmark.json
+    python Benchmark.py --parity --scenario input
+A scenario is "input" (the xlsx files) or "<airports>x<planning horizon (h)>x<requests>[x<timestep (min)>]",
+e.g. 6x96x115x30 for half hour timesteps (default: 240 min).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import gurobipy as gp
+
+from Data_processor import Data_processor
+from TSN import Time_space_network
+from TSN_compact import Compact_time_space_network
+from Model_generator_3 import Model_3
+from Collum_generation import CG
+from Solver_backend import BACKENDS
+
+
+class Synthetic_data_processor(Data_processor):
+    """
+    Data_processor with generated input frames instead of the xlsx files, with the same ranges as the input data:
+        airports spread over the globe, a share od_density of the OD pairs is viable,
+        time windows of 20-70% of the planning horizon, 3-5 ton, 10000-30000 MU/ton penalty
+    Every airport is given a fleet position at random, aircraft_count aircraft per aircraft type.
+    """
+    def __init__(self, airport_count=6, planning_horizon=96, request_count=115, aircraft_count=3, od_density=0.7, seed=0,
+                 timestep_duration=4):
+        self.use_cache = False
+        self.timestep_duration = timestep_duration # hours
+        self.planning_horizon = planning_horizon
+
+        self.aircraft_count = aircraft_count
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+
+        # -> Airports
+        airport_refs = [f"A{i:03d}" for i in range(airport_count)]
+        self.airport_input_df = pd.DataFrame({"Airport": airport_refs,
+                                              "Lat": rng.uniform(-35, 60, airport_count),
+                                              "Lon": rng.uniform(-120, 30, airport_count),
+                                              "Index": np.arange(1, airport_count + 1)})
+
+        # -> OD pairs
+        pairs = [(o, d) for o in airport_refs for d in airport_refs if o != d and rng.random() < od_density]
+        self.OD_pairs_input_df = pd.DataFrame(pairs, columns=["O", "D"])
+
+        # -> Requests
+        horizon = planning_horizon * 60 # minutes
+        origin = rng.integers(0, airport_count, request_count)
+        destination = (origin + rng.integers(1, airport_count, request_count)) % airport_count
+        release = rng.uniform(-0.1, 0.6, request_count) * horizon
+        due = np.minimum(release + rng.uniform(0.2, 0.7, request_count) * horizon, horizon)
+
+        self.request_input_df = pd.DataFrame({"Request ID": np.arange(1, request_count + 1),
+                                              "Weight [ton]": rng.uniform(3, 5, request_count).round(3),
+                                              "Origin airport": np.array(airport_refs)[origin],
+                                              "Destination airport": np.array(airport_refs)[destination],
+                                              "Release time [minutes]": release.astype(np.int64),
+                                              "Due date [minutes]": due.astype(np.int64),
+                                              "Penalty [MU/ton]": rng.integers(10000, 30000, request_count)})
+
+    def create_initial_final_aircrafts_dict(self):
+        rng = np.random.default_rng(self.seed + 1)
+        airport_refs = list(self.airport_input_df["Airport"])
+
+        init_fin_aircraft_dict = {airport_ref: {"AC_1": 0, "AC_2": 0} for airport_ref in airport_refs}
+        for aircraft_ref in ["AC_1", "AC_2"]:
+            for airport_ref in rng.choice(airport_refs, self.aircraft_count):
+                init_fin_aircraft_dict[airport_ref][aircraft_ref] += 1
+
+        return init_fin_aircraft_dict
+
+
+@contextmanager
+def phase(phases, name):
+    t_start = time.perf_counter()
+    yield
+    phases[name] = phases.get(name, 0) + time.perf_counter() - t_start
+
+
+def timed_method(obj, method_name, phases, name):
+    """
+    Adds the time spent in obj.method_name to phases[name], for phases that run inside another method (e.g. pricing)
+    """
+    method = getattr(obj, method_name)
+
+    def wrapper(*args, **kwargs):
+        with phase(phases, name):
+            return method(*args, **kwargs)
+
+    setattr(obj, method_name, wrapper)
+
+
+def create_data(scenario):
+    """
+    :param scenario: "input" or "<airports>x<planning horizon>x<requests>[x<timestep (min)>]"
+    """
+    if scenario == "input":
+        data = Data_processor()
+    else:
+        airport_count, planning_horizon, request_count, *timestep = (int(value) for value in scenario.split("x"))
+        data = Synthetic_data_processor(airport_count=airport_count,
+                                        planning_horizon=planning_horizon,
+                                        request_count=request_count,
+                                        timestep_duration=timestep[0] / 60 if timestep else 4)
+    return data.build_all()
+
+
+def run_scenario(scenario, model="both", compact_network=False, compress_network=False, time_limit=60):
+    """
+    :param scenario: "input" or "<airports>x<planning horizon>x<requests>[x<timestep (min)>]"
+    :param model: "model_3", "cg" or "both"
+    :return: dict with the scenario, the instance size and the time per phase (s)
+    """
+    if compact_network and compress_network:
+        raise ValueError("compress_network requires the Time_space_network, "
+                         "the Compact_time_space_network can not be compressed")
+
+    phases = {}
+    result = {"scenario": scenario, "compact_network": compact_network, "compress_network": compress_network,
+              "phases": phases}
+
+    # -> Data_processor load
+    with phase(phases, "data"):
+        data = create_data(scenario)
+
+    # -> TSN construction
+    with phase(phases, "tsn"):
+        if compact_network:
+            TSN = Compact_time_space_network(data=data)
+        else:
+            TSN = Time_space_network(data=data, compress=compress_network)
+
+    result["size"] = {"airports": len(data.airport_dict),
+                      "timesteps": TSN.request_incidence.timestep_count,
+                      "nodes": sum(len(network_layer) for network_layer in TSN.network),
+                      "requests": len(data.request_dict),
+                      "flight_arcs": len(TSN.flight_arc_lst),
+                      "ground_arcs": len(TSN.ground_arc_lst)}
+
+    if model in ["model_3", "both"]:
+        # -> Variable and constraint creation
+        with phase(phases, "model_3 build"):
+            model_3 = Model_3(TSN=TSN, solve=False)
+            model_3.model.update()
+
+        model_3.model.setParam("OutputFlag", 0)
+        model_3.model.setParam("TimeLimit", time_limit)
+        result["size"]["model_3"] = {"variables": model_3.model.NumVars, "constraints": model_3.model.NumConstrs}
+
+        # -> LP relaxation
+        with phase(phases, "model_3 LP relaxation"):
+            relaxation = model_3.model.relax()
+            relaxation.optimize()
+        result["model_3 LP bound"] = relaxation.ObjVal
+
+        # -> MIP solve
+        with phase(phases, "model_3 MIP"):
+            model_3.model.optimize()
+        result["model_3 MIP"] = {"objective": model_3.model.ObjVal if model_3.model.SolCount > 0 else None,
+                                 "gap": model_3.model.MIPGap if model_3.model.SolCount > 0 else None}
+
+    if model in ["cg", "both"]:
+        # -> Variable and constraint creation of the initial master
+        with phase(phases, "cg build"):
+            cg = CG(TSN=TSN, solve=False)
+
+        # -> Column generation, split in LP relaxation (incl. duals) and pricing
+        timed_method(cg, "price_requests", phases, "cg pricing")
+        timed_method(cg, "add_path", phases, "cg add columns")
+
+        phases["cg pricing"] = phases["cg add columns"] = 0
+
+        t_start = time.perf_counter()
+        cg.run()
+        phases["cg LP relaxation"] = time.perf_counter() - t_start - phases["cg pricing"] - phases["cg add columns"]
+        result["cg LP bound"] = cg.lp_bound
+
+        # -> MIP solve of the final master
+        cg.master.setParam("OutputFlag", 0)
+        cg.master.setParam("TimeLimit", time_limit)
+        with phase(phases, "cg MIP"):
+            cg.set_mip_start()
+            cg.master.optimize()
+        result["size"]["cg"] = {"paths": cg.path_count, "variables": cg.master.NumVars}
+        result["cg MIP"] = {"objective": cg.master.ObjVal if cg.master.SolCount > 0 else None,
+                            "gap": cg.master.MIPGap if cg.master.SolCount > 0 else None}
+
+    return result
+
+
+def backend_parity(scenario, backends=BACKENDS, time_limit=60):
+    """
+    Solves Model_3 (LP relaxation and MIP) and CG (LP bound and MIP of the final master) of one instance on every
+    Solver_backend, to compare their runtime and objective
+    :return: dict with the time per phase (s) and the results per backend
+    """
+    TSN = Time_space_network(data=create_data(scenario))
+    parity = {"scenario": scenario}
+
+    for backend in backends:
+        phases = {}
+        result = {"phases": phases}
+        parity[backend] = result
+
+        # -> Model_3
+        with phase(phases, "model_3 build"):
+            model_3 = Model_3(TSN=TSN, solve=False, backend=backend)
+        model_3.model.set_output(False)
+        model_3.model.set_time_limit(time_limit)
+
+        with phase(phases, "model_3 LP relaxation"):
+            model_3.model.set_integrality(False)
+            model_3.model.optimize()
+        result["model_3 LP bound"] = model_3.model.result()["objective"]
+
+        with phase(phases, "model_3 MIP"):
+            model_3.model.set_integrality(True)
+            model_3.model.optimize()
+        result["model_3 MIP"] = model_3.model.result()
+
+        # -> CG
+        with phase(phases, "cg build"):
+            cg = CG(TSN=TSN, solve=False, backend=backend)
+
+        with phase(phases, "cg column generation"):
+            cg.run()
+        result["cg LP bound"] = cg.lp_bound
+        result["cg paths"] = cg.path_count
+
+        cg.master.set_output(False)
+        cg.master.set_time_limit(time_limit)
+        with phase(phases, "cg MIP"):
+            cg.master.optimize()
+        result["cg MIP"] = cg.master.result()
+
+    return parity
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Times the data, TSN, model build, LP, pricing and MIP phases")
+    parser.add_argument("--scenario", action="append",
+                        help='"input" or "<airports>x<planning horizon (h)>x<requests>[x<timestep (min)>]", can be repeated')
+    parser.add_argument("--model", default="both", choices=["model_3", "cg", "both"])
+    parser.add_argument("--compact", action="store_true", help="use the Compact_time_space_network")
+    parser.add_argument("--compress", action="store_true", help="merge event-free ground nodes of the TSN")
+    parser.add_argument("--time-limit", type=float, default=60, help="MIP time limit per solve (s)")
+    parser.add_argument("--parity", action="store_true",
+                        help="compare the Solver_backends on Model_3 and CG instead (default scenario: input)")
+    parser.add_argument("--backend", action="append", choices=BACKENDS, help="backends of --parity, default: all")
+    parser.add_argument("--output", default="benchmark.json")
+    args = parser.parse_args()
+    if args.compact and args.compress:
+        parser.error("--compress can not be combined with --compact, the Compact_time_space_network is not compressed")
+
+    results = []
+    if args.parity:
+        for scenario in args.scenario if args.scenario else ["input"]:
+            parity = backend_parity(scenario, backends=args.backend if args.backend else BACKENDS,
+                                    time_limit=args.time_limit)
+            results.append(parity)
+
+            print(f"\n{scenario}")
+            for backend in args.backend if args.backend else BACKENDS:
+                result = parity[backend]
+                print(f"   {backend}: Model_3 LP {result['model_3 LP bound']}, MIP {result['model_3 MIP']['objective']}, "
+                      f"CG LP {result['cg LP bound']}, MIP {result['cg MIP']['objective']}")
+                for name, seconds in result["phases"].items():
+                    print(f"      > {name}: {round(seconds, 3)} s")
+
+    else:
+        for scenario in args.scenario if args.scenario else ["input", "12x192x500", "24x336x2000"]:
+            result = run_scenario(scenario, model=args.model, compact_network=args.compact,
+                                  compress_network=args.compress, time_limit=args.time_limit)
+            results.append(result)
+
+            print(f"\n{scenario}")
+            for name, seconds in result["phases"].items():
+                print(f"   > {name}: {round(seconds, 3)} s")
+
+    report = {"commit": git_commit(),
+              "date": datetime.now().isoformat(timespec="seconds"),
+              "python": platform.python_version(),
+              "gurobi": ".".join(str(v) for v in gp.gurobi.version()),
+              "results": results}
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"\nsaved benchmark to '{args.output}'")
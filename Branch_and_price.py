@@ -0,0 +1,447 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+
+Branch-and-price on top of the column generation master of CG.
+    Every node solves the LP relaxation of the master with column generation (CG.run_column_generation), under the
+    branching decisions of the node, the paths priced at a node stay in the master and are shared by every node
+    (column pool: CG.path_dict and the master columns, the decisions of a node only change their bounds).
+    Branching, on the arc flows:
+        x_f_k fractional:                   x_f_k = 0 | x_f_k = 1 (bounds, the pricing is not affected)
+        flow of request r on flight arc f:  r does not use f | r uses f
+            r does not use f:   f is forbidden in the pricing of r, the paths of r over f are fixed to 0
+            r uses f:           every arc overlapping f in time is forbidden for r (a path can only cross the time
+                                span of f over f), the paths of r over those arcs and the NS path of r are fixed to 0
+    With x integer y is integer too (aircraft flow over forward-in-time ground arcs), and with integer flight arc flows
+    every request is on a single route, so a node without fractional x or request flows gives a feasible solution.
+    Artificial variables (cost: the penalty of every request) keep the node LPs feasible when a request has no
+    allowed path in the master yet, a node whose converged LP still uses them is infeasible.
+    Nodes are explored best bound first, the restricted master (the master as MIP over the column pool) is solved
+    at the root and every heuristic_frequency nodes as primal heuristic.
+"""
+
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+from Metrics import metrics, solve_result
+from Solver_backend import Gurobi_model
+
+
+class Branch_node:
+    """
+    Node of the search tree: the branching decisions from the root and the LP bound of its parent
+        decision: ("x", (flight arc index, aircraft index), value) or ("flow", (request_id, flight arc id), value)
+    """
+    def __init__(self, decisions, bound, depth):
+        self.decisions = decisions
+        self.bound = bound
+        self.depth = depth
+
+
+class Branch_and_price:
+    def __init__(self, cg, time_limit=600, node_limit=None, mip_gap=1e-4, heuristic_time=10, heuristic_frequency=50,
+                 tolerance=1e-6, solve=True):
+        """
+        :param cg: CG built with solve=False (pricing="dag", master_update="incremental"), the root is solved here
+        :param time_limit: (s), for the whole search
+        :param node_limit: maximum number of nodes solved, None: no limit
+        :param mip_gap: relative gap between the incumbent and the best bound at which the search stops
+        :param heuristic_time: time limit of a restricted master MIP (s)
+        :param heuristic_frequency: the restricted master MIP is solved at the root and every heuristic_frequency nodes
+        """
+        if cg.pricing != "dag":
+            raise ValueError(f"Branch_and_price requires a CG with pricing='dag' (got {cg.pricing!r}): only the DAG "
+                             f"pricer honours the arcs forbidden by the branching decisions (CG.forbidden_arcs)")
+        if cg.master_update != "incremental":
+            raise ValueError(f"Branch_and_price requires a CG with master_update='incremental' "
+                             f"(got {cg.master_update!r}): the nodes share the columns of a single master")
+
+        self.cg = cg
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.mip_gap = mip_gap
+        self.heuristic_time = heuristic_time
+        self.heuristic_frequency = heuristic_frequency
+        self.tolerance = tolerance
+
+        # -> LP relaxation solved at the nodes: the (relaxed) Solver_backend master or the gurobipy relaxed master
+        self.lp = cg.master if cg.backend is not None else cg.relaxed_master
+
+        # -> Arcs of the pricing, flight arcs first
+        pricer = cg.pricer
+        airport_count = len(cg.TSN.request_incidence.airport_index)
+        self.arc_origin_timestep = pricer.arc_origin // airport_count
+        self.arc_destination_timestep = pricer.arc_destination // airport_count
+        self.arc_id = {arc.ref: a for a, arc in enumerate(pricer.arcs)}
+        self.flight_count = pricer.flight_count
+
+        # -> Artificial variables, cost of the all-NS solution
+        request_dict = cg.TSN.data.request_dict
+        self.artificial_cost = sum(request["penalty"] * request["weight"] for request in request_dict.values())
+        artificial = cg.add_artificial_columns(self.artificial_cost)
+
+        # -> Column indices, shared by the master and its gurobipy relaxation
+        self.sync_columns()
+        aircraft_refs = list(cg.TSN.data.aircraft_dict.keys())
+        variables = cg.decision_variable_dict
+        self.x_columns = np.array([[variables["x"][arc.ref][k].index for k in aircraft_refs]
+                                   for arc in cg.TSN.flight_arc_lst], dtype=np.int64).reshape(-1, len(aircraft_refs))
+        self.y_columns = np.array([variables["y"][arc.ref][k].index for arc in cg.TSN.ground_arc_lst
+                                   for k in aircraft_refs], dtype=np.int64)
+        self.artificial_columns = np.array([artificial[r].index for r in request_dict.keys()], dtype=np.int64)
+
+        # -> Column pool: column, request and flight arc ids per path, extended as paths are priced (update_pool)
+        self.paths = []
+        self.path_columns = []
+        self.path_arc_ids = []
+
+        self.incumbent = None               # Value per master column of the best solution
+        self.incumbent_objective = np.inf
+        self.best_bound = -np.inf
+        self.node_count = 0
+        self.status = None
+
+        if solve:
+            self.run()
+
+    # ============================================================================= Column pool
+    def sync_columns(self):
+        """
+        gurobipy masters only give the index of new variables after an update
+        """
+        if self.cg.backend is None:
+            self.cg.master.update()
+            self.lp.update()
+
+    def column_count(self):
+        return self.lp.column_count if self.cg.backend is not None else self.lp.NumVars
+
+    def update_pool(self):
+        self.sync_columns()
+        paths = list(self.cg.path_dict["paths"].values())
+
+        for path in paths[len(self.paths):]:
+            self.paths.append(path)
+            self.path_columns.append(self.cg.decision_variable_dict["z"][path.ref][path.request_id].index)
+            self.path_arc_ids.append(set() if path.type == "NS" else {self.arc_id[arc.ref] for arc in path.arcs})
+
+    # ============================================================================= Node LP
+    def apply_decisions(self, decisions):
+        """
+        Sets the bounds of every column and the forbidden pricing arcs of the branching decisions
+        """
+        self.update_pool()
+
+        lb = np.zeros(self.column_count())
+        ub = np.ones(self.column_count())
+        ub[self.y_columns] = np.inf
+        ub[self.artificial_columns] = np.inf
+
+        forbidden = {}      # request_id -> set of arc ids
+        served = set()      # requests that have to use a flight arc, their NS path is fixed to 0
+
+        for kind, key, value in decisions:
+            if kind == "x":
+                lb[self.x_columns[key]] = ub[self.x_columns[key]] = value
+                continue
+
+            r, a = key
+            if value == 0:
+                forbidden.setdefault(r, set()).add(a)
+            else:
+                overlapping = np.flatnonzero((self.arc_origin_timestep < self.arc_destination_timestep[a]) &
+                                             (self.arc_destination_timestep > self.arc_origin_timestep[a]))
+                forbidden.setdefault(r, set()).update(int(b) for b in overlapping if b != a)
+                served.add(r)
+
+        for path, column, arc_ids in zip(self.paths, self.path_columns, self.path_arc_ids):
+            r = path.request_id
+            if (path.type == "NS" and r in served) or (r in forbidden and not arc_ids.isdisjoint(forbidden[r])):
+                ub[column] = 0
+
+        self.cg.forbidden_arcs = {r: np.array(sorted(arc_ids), dtype=np.int64) for r, arc_ids in forbidden.items()}
+        self.set_bounds(lb, ub)
+
+    def set_bounds(self, lb, ub):
+        if self.cg.backend is not None:
+            self.lp.set_bounds(np.arange(len(lb)), lb, ub)
+        else:
+            variables = self.lp.getVars()
+            self.lp.setAttr("LB", variables, lb.tolist())
+            self.lp.setAttr("UB", variables, ub.tolist())
+
+    def lp_status(self):
+        if self.cg.backend is not None:
+            return self.lp.result()["status"]
+        return Gurobi_model.STATUS.get(self.lp.Status, "other")
+
+    def lp_values(self):
+        if self.cg.backend is not None:
+            return self.lp.values()
+        return np.array(self.lp.getAttr("X", self.lp.getVars()))
+
+    def solver_settings(self):
+        """
+        :return: list of (model, time limit, output) of the models whose settings the search changes
+        """
+        if self.cg.backend is not None:
+            return [(self.cg.master, self.cg.master.get_time_limit(), self.cg.master.get_output())]
+
+        return [(model, model.Params.TimeLimit, model.Params.OutputFlag)
+                for model in [self.cg.master, self.cg.relaxed_master]]
+
+    def restore_solver_settings(self, settings):
+        for model, time_limit, output in settings:
+            if self.cg.backend is not None:
+                model.set_time_limit(time_limit)
+                model.set_output(output)
+            else:
+                model.setParam("TimeLimit", time_limit)
+                model.setParam("OutputFlag", output)
+
+    def set_lp_time_limit(self, seconds):
+        if self.cg.backend is not None:
+            self.lp.set_time_limit(max(seconds, 0))
+        else:
+            self.lp.setParam("TimeLimit", max(seconds, 0))
+
+    def solve_node(self, node):
+        """
+        :return: ("infeasible", None), ("time_limit", None) or ("solved", LP values), the LP bound is in cg.lp_bound
+        """
+        self.apply_decisions(node.decisions)
+        self.set_lp_time_limit(self.remaining_time())
+
+        self.cg.run_column_generation()
+        self.update_pool()
+
+        # -> Stopped by the time limit: a feasible LP solution is no bound of the node
+        if self.lp_status() == "time_limit":
+            return "time_limit", None
+
+        # -> No LP solution: the decisions are infeasible for the aircraft flow
+        if self.cg.lp_bound is None:
+            return "infeasible", None
+
+        values = self.lp_values()
+        if values[self.artificial_columns].max(initial=0) > self.tolerance:
+            return "infeasible", None
+
+        return "solved", values
+
+    # ============================================================================= Branching
+    def request_flows(self, values):
+        """
+        :return: {(request_id, flight arc id): flow} of the paths in the LP solution
+        """
+        flows = {}
+        for path, column, arc_ids in zip(self.paths, self.path_columns, self.path_arc_ids):
+            if values[column] <= self.tolerance:
+                continue
+
+            for a in arc_ids:
+                if a < self.flight_count:
+                    key = (path.request_id, a)
+                    flows[key] = flows.get(key, 0) + values[column]
+        return flows
+
+    def branching_decision(self, values):
+        """
+        :return: (kind, key) of the most fractional x, else of the most fractional request flow, None if both are integer
+        """
+        x = values[self.x_columns]
+        fractionality = np.abs(x - np.round(x))
+        if fractionality.max(initial=0) > self.tolerance:
+            f, k = np.unravel_index(np.argmax(fractionality), x.shape)
+            return "x", (int(f), int(k))
+
+        flows = self.request_flows(values)
+        if flows:
+            key, flow = max(flows.items(), key=lambda item: abs(item[1] - round(item[1])))
+            if abs(flow - round(flow)) > self.tolerance:
+                return "flow", key
+
+        return None
+
+    def integer_solution(self, values):
+        """
+        Rounds an LP solution without fractional x or request flows: x/y rounded, every request on its path with
+        the largest value (paths with equal flight arcs cost the same)
+        """
+        solution = np.zeros(len(values))
+        solution[self.x_columns] = np.round(values[self.x_columns])
+        solution[self.y_columns] = np.round(values[self.y_columns])
+
+        best = {}
+        for path, column in zip(self.paths, self.path_columns):
+            r = path.request_id
+            if r not in best or values[column] > values[best[r]]:
+                best[r] = column
+        solution[list(best.values())] = 1
+        return solution
+
+    def update_incumbent(self, objective, solution):
+        if objective < self.incumbent_objective - self.tolerance:
+            self.incumbent_objective = objective
+            self.incumbent = solution
+            return True
+        return False
+
+    # ============================================================================= Primal heuristic
+    def restricted_master(self):
+        """
+        Solves the master as MIP over the current column pool (no branching decisions)
+        """
+        time_limit = min(self.heuristic_time, self.remaining_time())
+        if time_limit <= 0:
+            return
+
+        with metrics.phase("Branch_and_price restricted master", paths=len(self.paths)) as phase:
+            if self.cg.backend is not None:
+                self.apply_decisions([])
+                master = self.cg.master
+                master.set_integrality(True)
+                master.set_time_limit(time_limit)
+                master.optimize()
+                result = master.result()
+                solution = master.values() if result["objective"] is not None else None
+                master.set_integrality(False)
+
+            else:
+                master = self.cg.master
+                master.setParam("OutputFlag", 0)
+                master.setParam("TimeLimit", time_limit)
+                master.optimize()
+                result = solve_result(master)
+                solution = np.array(master.getAttr("X", master.getVars())) if master.SolCount > 0 else None
+
+            if solution is not None:
+                phase.count(objective=result["objective"],
+                            improved=self.update_incumbent(result["objective"], solution))
+
+    # ============================================================================= Search
+    def remaining_time(self):
+        return self.time_limit - (time.perf_counter() - self.t_start)
+
+    def gap(self):
+        if self.incumbent is None:
+            return np.inf
+        return (self.incumbent_objective - self.best_bound) / max(abs(self.incumbent_objective), 1e-10)
+
+    def run(self):
+        self.t_start = time.perf_counter()
+        queue = []          # (bound, -depth, push number, node), best bound first, deepest first on ties
+        push_count = itertools.count()
+        heapq.heappush(queue, (-np.inf, 0, next(push_count), Branch_node([], -np.inf, 0)))
+
+        # -> The node LPs and the heuristic change the time limit and output of the CG models, restored at the end
+        settings = self.solver_settings()
+
+        self.cg.start_pricing_workers()
+        try:
+            with metrics.phase("Branch_and_price", backend=self.cg.backend) as phase:
+                self.status = "optimal"
+
+                while queue:
+                    self.best_bound = queue[0][0]
+                    if self.gap() <= self.mip_gap:
+                        break
+
+                    if self.remaining_time() <= 0:
+                        self.status = "time_limit"
+                        break
+
+                    if self.node_limit is not None and self.node_count >= self.node_limit:
+                        self.status = "node_limit"
+                        break
+
+                    bound, _, _, node = heapq.heappop(queue)
+                    if self.incumbent is not None and \
+                            bound >= self.incumbent_objective - self.mip_gap * abs(self.incumbent_objective):
+                        continue
+
+                    # -> Node LP with column generation
+                    self.node_count += 1
+                    status, values = self.solve_node(node)
+                    lp_bound = self.cg.lp_bound
+
+                    metrics.count("Branch_and_price node", node=self.node_count, depth=node.depth, status=status,
+                                  bound=lp_bound, paths=len(self.paths), incumbent=self.incumbent_objective)
+
+                    if status == "time_limit":
+                        heapq.heappush(queue, (bound, -node.depth, next(push_count), node))
+                        self.status = "time_limit"
+                        break
+
+                    if self.node_count == 1 or self.node_count % self.heuristic_frequency == 0:
+                        self.restricted_master()
+
+                    if status == "infeasible" or lp_bound >= self.incumbent_objective - self.tolerance:
+                        continue
+
+                    # -> Branch, or a new incumbent if the LP solution is integer
+                    decision = self.branching_decision(values)
+                    if decision is None:
+                        self.update_incumbent(lp_bound, self.integer_solution(values))
+                        continue
+
+                    kind, key = decision
+                    for value in [0, 1]:
+                        child = Branch_node(node.decisions + [(kind, key, value)], lp_bound, node.depth + 1)
+                        heapq.heappush(queue, (lp_bound, -child.depth, next(push_count), child))
+
+                # -> Every node pruned without an integer solution
+                if not queue and self.incumbent is None:
+                    self.status = "infeasible"
+
+                self.best_bound = queue[0][0] if queue else self.incumbent_objective
+                self.best_bound = min(self.best_bound, self.incumbent_objective)
+
+                phase.count(status=self.status, nodes=self.node_count, open_nodes=len(queue), paths=len(self.paths),
+                            objective=self.incumbent_objective, bound=self.best_bound, gap=self.gap())
+
+            self.load_incumbent()
+        finally:
+            self.cg.stop_pricing_workers()
+            self.restore_solver_settings(settings)
+
+        return self.incumbent_objective
+
+    def load_incumbent(self):
+        """
+        Fixes every master column to the incumbent and solves the master, so its solution (and Result_extraction)
+        gives the incumbent. Paths priced after the incumbent was found are 0.
+        """
+        self.apply_decisions([])
+        if self.incumbent is None:
+            return
+
+        values = np.zeros(self.column_count())
+        values[:len(self.incumbent)] = self.incumbent
+
+        master = self.cg.master
+        if self.cg.backend is not None:
+            master.set_bounds(np.arange(len(values)), values, values)
+            master.set_integrality(True)
+            master.set_time_limit(self.heuristic_time)
+            master.optimize()
+        else:
+            variables = master.getVars()
+            master.setAttr("LB", variables, values.tolist())
+            master.setAttr("UB", variables, values.tolist())
+            master.setParam("TimeLimit", self.heuristic_time)
+            master.optimize()
+
+
+if __name__ == "__main__":
+    from Collum_generation import CG
+
+    branch_and_price = Branch_and_price(CG(solve=False), time_limit=600)
+
+    print(f"\nStatus: {branch_and_price.status}, nodes: {branch_and_price.node_count}")
+    print(f"Objective: {branch_and_price.incumbent_objective}, bound: {branch_and_price.best_bound}, "
+          f"gap: {branch_and_price.gap()}")
@@ -1,13 +1,40 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
+import scipy.sparse as sp
 import gurobipy as gp
 from gurobipy import GRB
 
 # Own modules
 from TSN import Time_space_network
+from TSN_compact import Compact_time_space_network
+from DAG_pricing import DAG_pricer
+from Pricing_strategy import Pricing_strategy
+from Matrix_builder import Matrix_builder
+from Metrics import metrics, model_size, solve_result
+from Solver_backend import create_model, Gurobi_model
 __version__ = '1.1.1'
 
 ################################################################################################################
 
+# -> Pricer of a pricing worker process, set once by init_pricing_worker so the TSN is only sent once per process
+worker_pricer = None
+
+
+def init_pricing_worker(pricer):
+    global worker_pricer
+    worker_pricer = pricer
+
+
+def price_chunk(chunk, pi_f, columns):
+    """
+    Prices a chunk of requests in a worker process
+    :param chunk: list of (request_id, request, pi_r, forbidden arc ids or None)
+    :return: list of (request_id, list of (reduced cost, arc ids))
+    """
+    return [(r, worker_pricer.price_columns_arc_ids(request, pi_f, pi_r, columns, forbidden))
+            for r, request, pi_r, forbidden in chunk]
+
 
 class Path:
     def __init__(self, request_id, arc_list, path_number):
@@ -32,19 +59,91 @@ class Path:
 
 
 class CG:
-    def __init__(self):
+    def __init__(self, compact_network=False, compress_network=False, pricing="dag", master_update="incremental",
+                 pricing_workers=1, pricing_pool="thread", pricing_strategy=None, warm_start=True,
+                 TSN=None, solve=True, backend=None):
+        """
+        :param compress_network: merge event-free ground nodes of the Time_space_network (see Time_space_network.compress)
+        :param pricing: "dag" solves the pricing problem as a shortest path over the TSN,
+                        "gurobi" solves it as a MIP per request
+        :param pricing_workers: Number of workers pricing the requests in parallel (1 = serial)
+        :param pricing_pool: "thread" or "process" ("process" requires the dag pricer)
+        :param pricing_strategy: Pricing_strategy, default: full pricing with one column per request
+        :param master_update: "incremental" appends new paths as columns to the existing master and its LP relaxation,
+                              "rebuild" re-creates the master after every pricing round
+        :param warm_start: carry the LP basis across rebuilt masters and give the final integer master
+                           MIP starts built from the last LP solution (see set_mip_start)
+        :param TSN: prebuilt time space network (e.g. of a synthetic instance), default: built from the input files
+        :param solve: False only builds the initial master, run() and the final optimize are left to the caller
+        :param backend: None builds the master with gurobipy directly,
+                        "gurobi"/"highs" build it through Solver_backend (see build_backend_master), this requires
+                        master_update="incremental" and the final master gets no MIP start
+        """
+        if compact_network and compress_network:
+            raise ValueError("compress_network requires the Time_space_network, "
+                             "the Compact_time_space_network can not be compressed")
+
         # -> Generate data
-        self.TSN = Time_space_network()
+        if TSN is not None:
+            self.TSN = TSN
+        elif compact_network:
+            self.TSN = Compact_time_space_network()
+        else:
+            self.TSN = Time_space_network(compress=compress_network)
+
+        self.pricing = pricing
+        self.pricing_workers = pricing_workers
+        self.pricing_pool = pricing_pool
+        self.pricing_executor = None
+
+        if self.pricing_pool == "process" and self.pricing != "dag":
+            raise ValueError("Process pricing pools require pricing='dag', the Gurobi pricer can not be sent to a process")
+        self.pricing_strategy = Pricing_strategy() if pricing_strategy is None else pricing_strategy
+        if self.pricing == "dag":
+            self.pricer = DAG_pricer(TSN=self.TSN,
+                                     flight_unit_cost=self.TSN.flight_arc_costs.unit_cost)
 
         self.path_count = 0
         self.path_dict = self.create_initial_paths()
 
+        # -> request_id -> arc ids (DAG_pricer.arcs) the pricing may not use, set by Branch_and_price (dag pricing only)
+        self.forbidden_arcs = {}
+
         # -> Initialize model object
         self.master = None
         self.decision_variable_dict = None
+        self.constraint_dict = None
+
+        self.master_update = master_update
+        self.backend = backend
+        self.relaxed_master = None
+
+        if self.backend is not None and self.master_update != "incremental":
+            raise ValueError("Solver_backend masters require master_update='incremental'")
+        self.relaxed_constraint_dict = None
+
+        # -> Warm start data of the last LP relaxation
+        self.warm_start = warm_start
+        self.lp_basis = None        # (VBasis, CBasis)
+        self.lp_solution = None     # VarName -> X
+        self.lp_bound = None        # Objective of the last LP relaxation
 
         # -> Initial build model
-        self.rebuild_master()
+        with metrics.phase("CG initial master", master_update=master_update, backend=backend) as phase:
+            if self.backend is not None:
+                self.build_backend_master()
+
+            else:
+                self.rebuild_master()
+
+                if self.master_update == "incremental":
+                    self.relax_master()
+
+                self.master.update()
+            phase.count(**model_size(self.master), paths=self.path_count)
+
+        if not solve:
+            return
 
         # -> Run compilers
         self.run()
@@ -53,8 +152,16 @@ class CG:
 
         # -> Write model
         self.master.write("Model_4.lp")
-        self.master.printStats()
-        self.master.optimize()
+        if self.backend is None:
+            self.master.printStats()
+
+        if self.warm_start and self.backend is None:
+            with metrics.phase("CG MIP start"):
+                self.set_mip_start()
+
+        with metrics.phase("CG optimize") as phase:
+            self.master.optimize()
+            phase.count(**solve_result(self.master), paths=self.path_count)
 
         print("\nModel optimized!!!")
 
@@ -190,8 +297,9 @@ class CG:
             for k, aircraft in self.TSN.data.aircraft_dict.items():
                 constraint_r += aircraft["payload"] * self.decision_variable_dict["x"][f][k]
 
-            self.master.addConstr(constraint_l <= constraint_r,
-                                 name=f"Weight capacity--{f}")
+            self.constraint_dict["Weight capacity"][f] = \
+                self.master.addConstr(constraint_l <= constraint_r,
+                                      name=f"Weight capacity--{f}")
 
     def add_request_paths_constraint(self):
         # ... per request
@@ -200,22 +308,24 @@ class CG:
             # ... per path of request
             for p, path in self.path_dict["request paths"][r].items():
                 constraint_l += self.decision_variable_dict["z"][p][r]
-            self.master.addConstr(constraint_l == 1,
-                                  name=f"Request paths--{r}")
+            self.constraint_dict["Request paths"][r] = \
+                self.master.addConstr(constraint_l == 1,
+                                      name=f"Request paths--{r}")
 
     def add_objective_function(self, display_progress_bars=False):
         # --> Initiating objective function linear expression
         objective_function = gp.LinExpr()
 
+        costs = self.TSN.flight_arc_costs
+        flight_refs = [flight_arc.ref for flight_arc in self.TSN.flight_arc_lst]
+
         # ... per aircraft
-        for k, aircraft in self.TSN.data.aircraft_dict.items():
+        for k_i, k in enumerate(costs.aircraft_refs):
             # ... per flight arc
-            for flight_arc in self.TSN.flight_arc_lst:
-                f = flight_arc.ref
-                Ck = self.TSN.data.aircraft_dict[k]["operational_cost"] # MU/km
-                Df = self.Df(flight_arc)
+            for f_i, f in enumerate(flight_refs):
+                CkDf = costs.operational_cost[f_i, k_i] # MU
 
-                objective_function += Ck*Df*self.decision_variable_dict["x"][f][k] # TODO: check
+                objective_function += CkDf*self.decision_variable_dict["x"][f][k] # TODO: check
 
         # ... per request
         for r, request in self.TSN.data.request_dict.items():
@@ -242,6 +352,8 @@ class CG:
     def rebuild_master(self):
         # -> Re-initialised model
         self.master = gp.Model("APO_assignment_model_4")
+        self.constraint_dict = {"Weight capacity": {},  # constraint_dict[Weight capacity][f] -> constraint
+                                "Request paths": {}}    # constraint_dict[Request paths][request_id] -> constraint
 
         # -> Creating decision variables
         self.decision_variable_dict = self.generate_decision_variables()
@@ -259,6 +371,147 @@ class CG:
         # -> ?Parse? rebuilt model
         self.master.update()
 
+    def build_backend_master(self):
+        """
+        Builds the master as a Solver_backend model:
+            x/y columns, flight arc usage (1), aircraft flow (2) and the payload side of weight capacity (3) from
+            Matrix_builder, an empty request paths row (4) per request, then one z column per path (add_column)
+        The integer columns stay relaxed during column generation, so the LP keeps its basis while columns are added.
+        constraint_dict holds row indices instead of constraints.
+        """
+        builder = Matrix_builder(TSN=self.TSN, z_columns=False)
+        self.master = create_model(self.backend, "APO_assignment_model_4")
+
+        # -> x binary, y integer
+        ub = np.ones(builder.column_count)
+        ub[builder.y_start:builder.z_start] = np.inf
+        variables = self.master.add_variables(builder.objective(), lb=0, ub=ub, integer=True,
+                                              names=builder.column_names())
+
+        self.decision_variable_dict = {"x": {}, "y": {}, "z": {}}
+        for i, flight_arc in enumerate(self.TSN.flight_arc_lst):
+            self.decision_variable_dict["x"][flight_arc.ref] = dict(zip(builder.aircraft_refs,
+                                                                        variables[i*builder.K:(i+1)*builder.K]))
+        for i, ground_arc in enumerate(self.TSN.ground_arc_lst):
+            start = builder.y_start + i*builder.K
+            self.decision_variable_dict["y"][ground_arc.ref] = dict(zip(builder.aircraft_refs,
+                                                                        variables[start:start+builder.K]))
+
+        # -> Constraints (1)-(3)
+        for constraint_name, A, sense, rhs, row_names in [builder.flight_arc_usage(), builder.aircraft_flow()]:
+            self.master.add_constraints(A, sense, rhs, row_names)
+
+        constraint_name, A, sense, rhs, row_names = builder.weight_capacity()
+        weight_rows = self.master.add_constraints(A, sense, rhs, row_names)
+
+        # -> Constraint (4), filled by the path columns
+        request_ids = list(self.TSN.data.request_dict.keys())
+        request_rows = self.master.add_constraints(sp.csr_matrix((len(request_ids), 0)), "=", 1,
+                                                   [f"Request paths--{r}" for r in request_ids])
+
+        self.constraint_dict = {"Weight capacity": dict(zip([arc.ref for arc in self.TSN.flight_arc_lst], weight_rows)),
+                                "Request paths": dict(zip(request_ids, request_rows))}
+
+        for path in self.path_dict["paths"].values():
+            self.add_column(path)
+
+        self.master.set_integrality(False)
+        self.master.set_output(False)
+
+    def relax_master(self):
+        """
+        Creates the LP relaxation once, it is kept (and warm) for all pricing rounds in incremental mode.
+            relax() keeps the constraint order, so the handles are mapped through their index
+        """
+        self.relaxed_master = self.master.relax()
+        self.relaxed_master.setParam("OutputFlag", 0)
+        self.relaxed_constraint_dict = self.map_constraints(self.relaxed_master)
+
+    def map_constraints(self, relaxed_model):
+        """
+        :return: constraint_dict with the master constraints replaced by the matching constraints of relaxed_model
+        """
+        relaxed_constrs = relaxed_model.getConstrs()
+
+        relaxed_constraint_dict = {}
+        for constraint_type, constraints in self.constraint_dict.items():
+            relaxed_constraint_dict[constraint_type] = {key: relaxed_constrs[constraint.index]
+                                                        for key, constraint in constraints.items()}
+        return relaxed_constraint_dict
+
+    def get_duals(self, linear_relaxation, constraint_dict):
+        """
+        Fetches the duals relevant for the pricing problem in a single getAttr call
+        :return: (pi_f in TSN.flight_arc_lst order, pi_r in request_dict order), as numpy arrays
+        """
+        if self.backend is not None:
+            duals = linear_relaxation.duals()
+            return (duals[list(constraint_dict["Weight capacity"].values())],
+                    duals[list(constraint_dict["Request paths"].values())])
+
+        flight_constrs = list(constraint_dict["Weight capacity"].values())
+        request_constrs = list(constraint_dict["Request paths"].values())
+
+        pi = np.array(linear_relaxation.getAttr("Pi", flight_constrs + request_constrs))
+        return pi[:len(flight_constrs)], pi[len(flight_constrs):]
+
+    def add_column(self, path):
+        """
+        Adds the z variable of a new path to the master and to its LP relaxation
+        """
+        r = path.request_id
+        request = self.TSN.data.request_dict[r]
+        p = path.ref
+
+        # -> Coefficients: 1 in the request paths constraint, Wr in the weight capacity constraint of every flight arc
+        coefficients = [1] + [request["weight"]] * len(path.flight_arcs)
+
+        if self.backend is not None:
+            rows = [self.constraint_dict["Request paths"][r]] + \
+                   [self.constraint_dict["Weight capacity"][flight_arc.ref] for flight_arc in path.flight_arcs]
+            cost = request["penalty"] * request["weight"] if path.type == "NS" else self.MCpr(path, request)
+
+            z = self.master.add_column(cost, rows, coefficients, lb=0, ub=1, integer=True, name=f"z-{p}-#{r}#")
+            self.decision_variable_dict["z"][p] = {r: z}
+            return
+
+        models = [(self.master, self.constraint_dict, GRB.BINARY),
+                  (self.relaxed_master, self.relaxed_constraint_dict, GRB.CONTINUOUS)]
+
+        for model, constraint_dict, vtype in models:
+            constraints = [constraint_dict["Request paths"][r]] + \
+                          [constraint_dict["Weight capacity"][flight_arc.ref] for flight_arc in path.flight_arcs]
+
+            z = model.addVar(lb=0, ub=1,
+                             obj=self.MCpr(path, request),
+                             vtype=vtype,
+                             name=f"z-{p}-#{r}#",
+                             column=gp.Column(coefficients, constraints))
+
+            if model is self.master:
+                self.decision_variable_dict["z"][p] = {r: z}
+
+    def add_artificial_columns(self, cost):
+        """
+        Adds an artificial variable with the given cost to every request paths constraint (4), so the LP relaxation
+        stays feasible when branching excludes every path of a request in the master (see Branch_and_price).
+            gurobipy masters: continuous in the LP relaxation, fixed to 0 in the integer master
+        :return: artificial variable per request, Solver_backend Variables or master Vars
+        """
+        artificial = {}
+        for r, constraint in self.constraint_dict["Request paths"].items():
+            name = f"artificial-#{r}#"
+
+            if self.backend is not None:
+                artificial[r] = self.master.add_column(cost, [constraint], [1], lb=0, ub=np.inf, name=name)
+                continue
+
+            artificial[r] = self.master.addVar(lb=0, ub=0, obj=cost, name=name, column=gp.Column([1], [constraint]))
+            self.relaxed_master.addVar(lb=0, ub=GRB.INFINITY, obj=cost, name=name,
+                                       column=gp.Column([1], [self.relaxed_constraint_dict["Request paths"][r]]))
+
+        return artificial
+
     def create_initial_paths(self):
         path_dict = {"request paths": {},               # path_dict[request paths][request_id][path_ref] -> path
                      "paths": {},                       # path_dict[paths][path_ref] -> path
@@ -297,15 +550,8 @@ class CG:
 
         return path_dict
 
-    def add_path(self, request_id, x, arc_dict):
-        solution = []
-
-        for a, v in x.items():
-            if v.x != 0:
-                solution.append(arc_dict[a])
-
+    def add_path(self, request_id, solution):
         self.path_count += 1
-        print(f'\r path_count: {self.path_count}',end = '')
         new_path = Path(request_id=request_id,
                         arc_list=solution,
                         path_number=self.path_count)
@@ -318,126 +564,336 @@ class CG:
             f = flight_arc.ref
             self.path_dict["paths containing flight arc"][f][request_id][new_path.ref] = new_path
 
+        if self.master_update == "incremental":
+            self.add_column(new_path)
+
         # -> collum to master based on path
 
     # -> Marginal cost per flight arc
     def MCf(self, flight_arc):
-        i = self.TSN.data.airport_dict[flight_arc.origin_airport]["index"]
-        j = self.TSN.data.airport_dict[flight_arc.destination_airport]["index"]
-        n = len(self.TSN.data.airport_dict)
-        depart_time = flight_arc.origin_timestep * self.TSN.data.timestep_duration
-        h = depart_time % 24
-        d = (depart_time - h) / 24 + 1
-        # print(f"time = {depart_time}, d = {d}, h = {h}")
-
-        return 0.05 * (i + j) / (2 * n - 1) + 0.15 * np.sin(2 * np.pi * h / 24) ** 2 + 0.005 * d  # MU/(km*ton)
+        costs = self.TSN.flight_arc_costs
+        return costs.marginal_cost[flight_arc.index]  # MU/(km*ton)
 
     # -> Total marginal cost per path for a specific request
     def MCpr(self, path, request):
+        costs = self.TSN.flight_arc_costs
         MCpr = 0
 
         for flight_arc in path.flight_arcs:
-            MCpr += self.MCf(flight_arc) * self.Df(flight_arc) * request["weight"]
+            MCpr += costs.unit_cost[flight_arc.index] * request["weight"]
 
         return MCpr
 
     def Df(self, flight_arc):
-        return self.TSN.data.distance_df.loc[flight_arc.origin_airport,flight_arc.destination_airport] # km
+        costs = self.TSN.flight_arc_costs
+        return costs.distance[flight_arc.index] # km
+
+    def price_requests(self, pi, pi_f=None):
+        """
+        Solves the pricing problem of the requests, serially or on the worker pool
+        :return: (list of (request_id, reduced cost, list of arcs) entering the master, True if every request was priced)
+        """
+        strategy = self.pricing_strategy
+        columns = strategy.columns_per_request
+        requests = strategy.request_order(list(self.TSN.data.request_dict.items()))
+
+        if self.pricing == "dag":
+            def price_request(item):
+                r, request = item
+                return r, self.pricer.price_columns(request, pi_f, pi["r"][r], columns, self.forbidden_arcs.get(r))
+        else:
+            def price_request(item):
+                r, request = item
+                return r, self.price_gurobi(r, request, pi, columns)
+
+        # -> Serial, partial pricing stops as soon as enough columns are found
+        if self.pricing_executor is None:
+            priced = []
+            found = 0
+            for item in requests:
+                priced.append(price_request(item))
+                found += len(strategy.accepted(priced[-1][1]))
+
+                if strategy.round_complete(found):
+                    break
+
+        # -> Thread pool, the workers share the TSN and duals of this process
+        elif self.pricing_pool == "thread":
+            priced = list(self.pricing_executor.map(price_request, requests))
+
+        # -> Process pool, one chunk of requests per worker and arc ids mapped back to the arcs of this process
+        else:
+            chunk_size = -(-len(requests) // self.pricing_workers)
+            chunks = [[(r, request, pi["r"][r], self.forbidden_arcs.get(r)) for r, request in requests[i:i + chunk_size]]
+                      for i in range(0, len(requests), chunk_size)]
+
+            priced = []
+            for chunk_result in self.pricing_executor.map(price_chunk, chunks,
+                                                          [pi_f] * len(chunks), [columns] * len(chunks)):
+                for r, columns_lst in chunk_result:
+                    priced.append((r, [(reduced_cost, [self.pricer.arcs[a] for a in arc_ids])
+                                       for reduced_cost, arc_ids in columns_lst]))
+
+        # -> Results are merged in pricing order, independent of the number of workers
+        return strategy.select(priced, len(requests))
 
     def run(self):
+        self.start_pricing_workers()
+
+        try:
+            with metrics.phase("CG column generation", pricing=self.pricing, workers=self.pricing_workers) as phase:
+                iterations = self.run_column_generation()
+                phase.count(iterations=iterations, paths=self.path_count)
+        finally:
+            self.stop_pricing_workers()
+
+        # -> The master is integer again for the final optimize
+        if self.backend is None:
+            self.master.update()
+        else:
+            self.master.set_integrality(True)
+            self.master.set_output(True)
+
+    def start_pricing_workers(self):
+        if self.pricing_workers > 1:
+            if self.pricing_pool == "process":
+                self.pricing_executor = ProcessPoolExecutor(max_workers=self.pricing_workers,
+                                                            initializer=init_pricing_worker,
+                                                            initargs=(self.pricer,))
+            else:
+                self.pricing_executor = ThreadPoolExecutor(max_workers=self.pricing_workers)
+
+    def stop_pricing_workers(self):
+        if self.pricing_executor is not None:
+            self.pricing_executor.shutdown()
+            self.pricing_executor = None
+
+    def run_column_generation(self):
+        """
+        Solves the LP relaxation of the master, with column generation until no column has a negative reduced cost.
+            The relaxation is left as it is (relaxed, with its last solution), see run
+        :return: number of iterations (master LP + pricing round)
+        """
         # -> Run conditional
-        new_column_added = True
+        converged = False
+        iteration = 0
+
+        while not converged:
+            iteration += 1
 
-        while new_column_added:
             # -> Perform model relaxation
-            linear_relaxation = self.master.relax()
-            linear_relaxation.setParam("OutputFlag", 0)
+            if self.backend is not None:
+                linear_relaxation = self.master
+                relaxed_constraint_dict = self.constraint_dict
+
+            elif self.master_update == "incremental":
+                linear_relaxation = self.relaxed_master
+                relaxed_constraint_dict = self.relaxed_constraint_dict
+            else:
+                linear_relaxation = self.master.relax()
+                linear_relaxation.setParam("OutputFlag", 0)
+                relaxed_constraint_dict = self.map_constraints(linear_relaxation)
+
+                # -> The persistent relaxation of incremental mode keeps its basis, a rebuilt one gets the previous basis
+                if self.warm_start and self.lp_basis is not None:
+                    self.set_basis(linear_relaxation, self.lp_basis)
 
             # -> Optimise relaxed master model
-            linear_relaxation.optimize()
+            with metrics.phase("CG master LP") as phase:
+                linear_relaxation.optimize()
+                lp_result = solve_result(linear_relaxation)
+                phase.count(iteration=iteration, **lp_result)
+
+            self.lp_bound = lp_result.get("objective")
+
+            # -> Infeasible (e.g. a branch-and-price node) or stopped by the time limit, no (optimal) duals to price with
+            #    ... a time limited LP can still have a feasible, non-optimal solution
+            status = lp_result["status"] if self.backend is not None else Gurobi_model.STATUS.get(lp_result["status"])
+            if self.lp_bound is None or status == "time_limit":
+                break
+
+            if self.warm_start and self.backend is None:
+                variables = linear_relaxation.getVars()
+                self.lp_solution = dict(zip(linear_relaxation.getAttr("VarName", variables),
+                                            linear_relaxation.getAttr("X", variables)))
+
+                if self.master_update == "rebuild":
+                    self.lp_basis = (linear_relaxation.getAttr("VBasis", variables),
+                                     linear_relaxation.getAttr("CBasis", linear_relaxation.getConstrs()))
 
             # -> Obtain dual values for each constraint (based on current master model with latest columns)
             # 4 constrains, only 2 relevant for price model
             # pi_f, pi_r
-            pi = {"f": {},
-                  "r": {}}
-
-            for c in linear_relaxation.getConstrs():
-                if "Request paths" in c.ConstrName:
-                    # f"Conservation_of_request_flow-{t}-{airport_ref}-{r}"
-                    r = int(c.ConstrName.split('--')[-1])
-                    pi["r"][r] = c.Pi
+            pi_f, pi_r = self.get_duals(linear_relaxation, relaxed_constraint_dict)
 
-                if "Weight capacity" in c.ConstrName:
-                    # f"Weight capacity-{f}"
-                    f = c.ConstrName.split('--')[-1]
-                    pi["f"][f] = c.Pi
+            pi = {"f": dict(zip(relaxed_constraint_dict["Weight capacity"].keys(), pi_f)),  # pi[f][flight arc ref]
+                  "r": dict(zip(relaxed_constraint_dict["Request paths"].keys(), pi_r))}    # pi[r][request_id]
 
             # -> Created and solve reduced cost and pricing problem to find new columns
-            # ... for every request
-            for r, request in self.TSN.data.request_dict.items():
-                # -> Create secondary model
-                RC = gp.Model(str(r))
-                RC.setParam("OutputFlag",0)
-
-                # -> add decision variables
-                x = {}
-                arc_dict = {}
-
-                for arc in self.TSN.arc_lst_no_ns:
-                    a = arc.ref
-                    arc_dict[a] = arc
-                    x[a] = RC.addVar(vtype=GRB.BINARY,
-                                     name=f"x-{a}")
-
-                # -> add constraints
-                # ... per node
-                for t, timestep in enumerate(self.TSN.network):  # ... per timestep
-                    for airport_ref, node in timestep.items():  # ... per airport
-                        constraint_l = gp.LinExpr()
-
-                        # ... per arc existing the node
-                        for arc in node.out_arc_lst:
-                            if arc.type != "NS":
-                                a = arc.ref
-                                constraint_l -= x[a] # TODO: dubble check - and + for delta
-
-                        # ... per arc entering the node
-                        for arc in node.in_arc_lst:
-                            if arc.type != "NS":
-                                a = arc.ref
-                                constraint_l += x[a] # TODO: dubble check - and + for delta
-
-                        RC.addConstr(constraint_l == node.v[r],
-                                     name=f"Constraint-{t}-{airport_ref}")
-
-                # -> add objective
-                objective_function = gp.LinExpr()
-
-                for flight_arc in self.TSN.flight_arc_lst:
-                    f = flight_arc.ref
-                    Df = self.TSN.data.distance_df.loc[flight_arc.origin_airport, flight_arc.destination_airport]
-                    MCf = self.MCf(flight_arc)
-                    Wr = request["weight"] #ton
-
-                    objective_function += (MCf*Df*Wr - Wr*pi["f"][f])*x[f]
-
-                objective_function -= pi["r"][r]
-                RC.setObjective(objective_function, GRB.MINIMIZE)
-                RC.update() # TODO: CHeck if needed?
-
-                # -> optimize RC model
-                RC.optimize()
-
-                new_column_added = False
-
-                # -> Check if optimal solution is negative, add new column if true
-                if RC.Status != 3: # infeasible
-                    if RC.ObjVal < 0:
-                        self.add_path(r, x, arc_dict)
-                        new_column_added = True
-
-            self.rebuild_master()
+
+            # ... for every request, only negative reduced cost columns are returned
+            with metrics.phase("CG pricing") as phase:
+                new_columns, all_requests_priced = self.price_requests(pi, pi_f)
+                phase.count(iteration=iteration, columns=len(new_columns), complete=all_requests_priced)
+
+            for r, reduced_cost, solution in new_columns:
+                self.add_path(r, solution)
+
+            # -> Converged once a round priced every request without finding a column
+            converged = all_requests_priced and len(new_columns) == 0
+
+            if self.master_update == "rebuild" and not converged:
+                self.rebuild_master()
+
+        return iteration
+
+    @staticmethod
+    def set_basis(model, basis):
+        """
+        Starts model from the basis of the previous relaxation.
+            The rebuilt master has the same constraints and the same variables, followed by the z variables of the
+            new paths (paths are appended to path_dict), those start nonbasic at their lower bound.
+        """
+        vbasis, cbasis = basis
+        variables = model.getVars()
+        constraints = model.getConstrs()
+
+        if len(constraints) != len(cbasis) or len(variables) < len(vbasis):
+            return
+
+        model.setAttr("VBasis", variables, list(vbasis) + [-1] * (len(variables) - len(vbasis)))
+        model.setAttr("CBasis", constraints, list(cbasis))
+
+    def set_mip_start(self, time_limit=10):
+        """
+        MIP starts for the final integer master:
+            0: every request on its NS path and every aircraft on the ground at its initial airport (always feasible)
+            1: restricted master heuristic, the master with only the NS paths and the paths used by the last LP solution,
+               solved for at most time_limit seconds (the NS paths keep it feasible)
+        """
+        variables = self.master.getVars()
+        starts = [self.ns_start(variables)]
+
+        if self.lp_solution is not None:
+            # -> The copy keeps the variable order, so its solution maps onto the master by position
+            restricted_master = self.master.copy()
+            restricted_master.setParam("OutputFlag", 0)
+            restricted_master.setParam("TimeLimit", time_limit)
+
+            restricted_variables = restricted_master.getVars()
+            for r, paths in self.path_dict["request paths"].items():
+                for p, path in paths.items():
+                    z = self.decision_variable_dict["z"][p][r]
+                    if path.type != "NS" and self.lp_solution.get(z.VarName, 0) < 1e-6:
+                        restricted_variables[z.index].UB = 0
+
+            restricted_master.optimize()
+
+            if restricted_master.SolCount > 0:
+                starts.append(restricted_master.getAttr("X", restricted_variables))
+
+        self.master.NumStart = len(starts)
+        self.master.update()
+
+        for start_number, start in enumerate(starts):
+            self.master.setParam("StartNumber", start_number)
+            self.master.setAttr("Start", variables, start)
+
+    def ns_start(self, variables):
+        """
+        :return: Start value per variable of the all-NS solution
+        """
+        start = dict.fromkeys(variables, 0)
+
+        # -> Requests on their NS path
+        for r, paths in self.path_dict["request paths"].items():
+            for p, path in paths.items():
+                if path.type == "NS":
+                    start[self.decision_variable_dict["z"][p][r]] = 1
+
+        # -> Aircraft on the ground at their initial airport
+        for ground_arc in self.TSN.ground_arc_lst:
+            for k, y in self.decision_variable_dict["y"][ground_arc.ref].items():
+                start[y] = self.TSN.data.airport_dict[ground_arc.origin_airport]["aircrafts"][k]
+
+        return [start[v] for v in variables]
+
+    def price_gurobi(self, r, request, pi, columns=1):
+        """
+        Pricing problem of a single request solved as a MIP, the solution pool provides extra columns
+        :return: list of (reduced cost, list of arcs), empty if infeasible
+        """
+        # -> Create secondary model
+        RC = gp.Model(str(r))
+        RC.setParam("OutputFlag",0)
+
+        if columns > 1:
+            RC.setParam("PoolSearchMode", 2)
+            RC.setParam("PoolSolutions", columns)
+
+        # -> add decision variables
+        x = {}
+        arc_dict = {}
+
+        for arc in self.TSN.arc_lst_no_ns:
+            a = arc.ref
+            arc_dict[a] = arc
+            x[a] = RC.addVar(vtype=GRB.BINARY,
+                             name=f"x-{a}")
+
+        # -> add constraints
+        # ... per node
+        for t, timestep in enumerate(self.TSN.network):  # ... per timestep
+            for airport_ref, node in timestep.items():  # ... per airport
+                constraint_l = gp.LinExpr()
+
+                # ... per arc existing the node
+                for arc in node.out_arc_lst:
+                    if arc.type != "NS":
+                        a = arc.ref
+                        constraint_l -= x[a] # TODO: dubble check - and + for delta
+
+                # ... per arc entering the node
+                for arc in node.in_arc_lst:
+                    if arc.type != "NS":
+                        a = arc.ref
+                        constraint_l += x[a] # TODO: dubble check - and + for delta
+
+                RC.addConstr(constraint_l == node.v[r],
+                             name=f"Constraint-{t}-{airport_ref}")
+
+        # -> add objective
+        objective_function = gp.LinExpr()
+
+        costs = self.TSN.flight_arc_costs
+        Wr = request["weight"] #ton
+
+        for f_i, flight_arc in enumerate(self.TSN.flight_arc_lst):
+            f = flight_arc.ref
+            objective_function += (costs.unit_cost[f_i]*Wr - Wr*pi["f"][f])*x[f]
+
+        objective_function -= pi["r"][r]
+        RC.setObjective(objective_function, GRB.MINIMIZE)
+        RC.update() # TODO: CHeck if needed?
+
+        # -> optimize RC model
+        RC.optimize()
+
+        if RC.Status == 3: # infeasible
+            return []
+
+        columns_lst = []
+        for i in range(min(RC.SolCount, columns)):
+            RC.setParam("SolutionNumber", i)
+
+            solution = []
+            for a, v in x.items():
+                if v.Xn > 0.5:
+                    solution.append(arc_dict[a])
+
+            columns_lst.append((RC.PoolObjVal, solution))
+
+        return columns_lst
 
 
 if __name__ == '__main__':
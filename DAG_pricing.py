@@ -0,0 +1,211 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import numpy as np
+
+from TSN import arc_node_ids, group_by_timestep
+
+
+class DAG_pricer:
+    """
+    Pricing problem of the column generation solved as a shortest path over the time space network.
+    Every non-NS arc goes forward in time, so the network is a DAG and processing the nodes timestep by timestep
+    is a topological order.
+        Flight arc cost: MCf*Df*Wr - Wr*pi_f, ground arc cost: 0
+    Arcs can be forbidden per call (e.g. by the branching decisions of Branch_and_price), they get an infinite cost.
+    """
+    def __init__(self, TSN, flight_unit_cost):
+        """
+        :param TSN: Time_space_network or Compact_time_space_network
+        :param flight_unit_cost: MCf*Df per flight arc, in TSN.flight_arc_lst order (MU/ton)
+        """
+        self.TSN = TSN
+        self.incidence = TSN.request_incidence
+
+        # -> Non-NS arcs, flight arcs first (same order as TSN.arc_lst_no_ns)
+        self.arcs = TSN.arc_lst_no_ns
+        self.flight_count = len(flight_unit_cost)
+        self.flight_unit_cost = np.asarray(flight_unit_cost, dtype=float)
+
+        self.arc_origin, self.arc_destination = arc_node_ids(TSN)
+
+        airport_count = len(self.incidence.airport_index)
+        self.node_count = self.incidence.timestep_count * airport_count
+        self.arc_destination_timestep = self.arc_destination // airport_count
+
+        # -> Arc ids grouped per origin timestep
+        arc_origin_timestep = self.arc_origin // airport_count
+        self.layer_order, self.layer_indptr = group_by_timestep(arc_origin_timestep, self.incidence.timestep_count)
+
+    def arc_cost(self, request, pi_f, forbidden=None):
+        """
+        :param pi_f: Dual of the weight capacity constraint per flight arc, in TSN.flight_arc_lst order
+        :param forbidden: arc ids (index in self.arcs) the path may not use
+        """
+        Wr = request["weight"] # ton
+
+        cost = np.zeros(len(self.arcs))
+        cost[:self.flight_count] = Wr * self.flight_unit_cost - Wr * np.asarray(pi_f, dtype=float)
+
+        if forbidden is not None:
+            cost[forbidden] = np.inf
+        return cost
+
+    def price(self, request, pi_f, pi_r, forbidden=None):
+        """
+        Minimum reduced cost path for one request
+        :return: (reduced cost, list of arcs) or None if the request can not be routed
+        """
+        column = self.price_arc_ids(request, pi_f, pi_r, forbidden)
+        if column is None:
+            return None
+
+        reduced_cost, arc_ids = column
+        return reduced_cost, [self.arcs[a] for a in arc_ids]
+
+    def price_arc_ids(self, request, pi_f, pi_r, forbidden=None):
+        """
+        Same as price, but the path is returned as arc ids (index in self.arcs), which are cheap to send between processes
+        """
+        origin = self.incidence.node_id(request["release_step"], request["airport_O"])
+        destination = self.incidence.node_id(request["due_step"], request["airport_D"])
+        release_step = int(request["release_step"])
+        due_step = int(request["due_step"])
+
+        if origin == destination or due_step < release_step:
+            return None
+
+        cost = self.arc_cost(request, pi_f, forbidden)
+
+        dist = np.full(self.node_count, np.inf)
+        pred = np.full(self.node_count, -1, dtype=np.int64)
+        dist[origin] = 0
+
+        # ... per timestep, every arc leaving it is relaxed at once
+        for t in range(release_step, due_step):
+            arc_ids = self.layer_order[self.layer_indptr[t]:self.layer_indptr[t + 1]]
+            arc_ids = arc_ids[self.arc_destination_timestep[arc_ids] <= due_step]
+
+            candidate = dist[self.arc_origin[arc_ids]] + cost[arc_ids]
+            arc_destination = self.arc_destination[arc_ids]
+
+            improved = candidate < dist[arc_destination]
+            if not improved.any():
+                continue
+
+            arc_ids, candidate, arc_destination = arc_ids[improved], candidate[improved], arc_destination[improved]
+
+            # -> Keep the cheapest arc per destination node (lowest arc id on ties)
+            order = np.lexsort((arc_ids, candidate, arc_destination))
+            arc_destination = arc_destination[order]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = arc_destination[1:] != arc_destination[:-1]
+
+            dist[arc_destination[first]] = candidate[order][first]
+            pred[arc_destination[first]] = arc_ids[order][first]
+
+        if not np.isfinite(dist[destination]):
+            return None
+
+        # -> Backtrack the path
+        path = []
+        node = destination
+        while node != origin:
+            a = pred[node]
+            path.append(int(a))
+            node = self.arc_origin[a]
+        path.reverse()
+
+        return dist[destination] - pi_r, path
+
+    def price_columns(self, request, pi_f, pi_r, columns=1, forbidden=None):
+        """
+        The columns cheapest paths for one request
+        :return: list of (reduced cost, list of arcs), cheapest first
+        """
+        return [(reduced_cost, [self.arcs[a] for a in arc_ids])
+                for reduced_cost, arc_ids in self.price_columns_arc_ids(request, pi_f, pi_r, columns, forbidden)]
+
+    def price_columns_arc_ids(self, request, pi_f, pi_r, columns=1, forbidden=None):
+        """
+        Same as price_columns, with the paths returned as arc ids.
+            Every node keeps its columns cheapest labels (cost, arc in, label at the origin of that arc),
+            which gives the columns cheapest distinct paths of the DAG
+        """
+        if columns == 1:
+            column = self.price_arc_ids(request, pi_f, pi_r, forbidden)
+            return [] if column is None else [column]
+
+        origin = self.incidence.node_id(request["release_step"], request["airport_O"])
+        destination = self.incidence.node_id(request["due_step"], request["airport_D"])
+        release_step = int(request["release_step"])
+        due_step = int(request["due_step"])
+
+        if origin == destination or due_step < release_step:
+            return []
+
+        cost = self.arc_cost(request, pi_f, forbidden)
+        k = columns
+
+        dist = np.full((self.node_count, k), np.inf)
+        pred_arc = np.full((self.node_count, k), -1, dtype=np.int64)
+        pred_label = np.full((self.node_count, k), -1, dtype=np.int64)
+        dist[origin, 0] = 0
+
+        # ... per timestep
+        for t in range(release_step, due_step):
+            arc_ids = self.layer_order[self.layer_indptr[t]:self.layer_indptr[t + 1]]
+            arc_ids = arc_ids[self.arc_destination_timestep[arc_ids] <= due_step]
+
+            # -> Every label of the origin node extended over every arc
+            candidate = (dist[self.arc_origin[arc_ids]] + cost[arc_ids][:, None]).ravel()
+            candidate_node = np.repeat(self.arc_destination[arc_ids], k)
+            candidate_arc = np.repeat(arc_ids, k)
+            candidate_label = np.tile(np.arange(k), len(arc_ids))
+
+            finite = np.isfinite(candidate)
+            if not finite.any():
+                continue
+
+            candidate, candidate_node = candidate[finite], candidate_node[finite]
+            candidate_arc, candidate_label = candidate_arc[finite], candidate_label[finite]
+
+            # -> Merged with the labels already at the destination nodes, the k cheapest are kept
+            nodes = np.unique(candidate_node)
+            label_cost = np.concatenate((dist[nodes].ravel(), candidate))
+            label_node = np.concatenate((np.repeat(nodes, k), candidate_node))
+            label_arc = np.concatenate((pred_arc[nodes].ravel(), candidate_arc))
+            label_label = np.concatenate((pred_label[nodes].ravel(), candidate_label))
+
+            order = np.lexsort((label_cost, label_node))
+            label_node = label_node[order]
+            group_start = np.flatnonzero(np.r_[True, label_node[1:] != label_node[:-1]])
+            rank = np.arange(len(order)) - np.repeat(group_start, np.diff(np.r_[group_start, len(order)]))
+            keep = rank < k
+
+            kept = order[keep]
+            dist[label_node[keep], rank[keep]] = label_cost[kept]
+            pred_arc[label_node[keep], rank[keep]] = label_arc[kept]
+            pred_label[label_node[keep], rank[keep]] = label_label[kept]
+
+        # -> Backtrack every finite label of the destination
+        columns_lst = []
+        for label in range(k):
+            if not np.isfinite(dist[destination, label]):
+                break
+
+            path = []
+            node, node_label = destination, label
+            while node != origin:
+                a = pred_arc[node, node_label]
+                node_label = pred_label[node, node_label]
+                path.append(int(a))
+                node = self.arc_origin[a]
+            path.reverse()
+
+            columns_lst.append((dist[destination, label] - pi_r, path))
+
+        return columns_lst
@@ -5,8 +5,48 @@ Created on 24 dec. 2021
 """
 
 
+import os
+
 import pandas as pd
-from numpy import pi, sin, cos, arcsin, sqrt, ceil, floor
+from numpy import ceil
+
+from Distance_engine import haversine_df
+from Input_cache import read_excel_cached
+from Metrics import metrics
+from Request_table import Request_table, STEP_TOLERANCE
+
+INPUT_FILES = {"airport_input_df": "airports_input_data.xlsx",
+               "OD_pairs_input_df": "OD_pairs_input_data.xlsx",
+               "request_input_df": "requests_input_data.xlsx"}
+
+# -> Derived attribute -> method creating it, evaluated on first access
+LAZY_ATTRIBUTES = {"airport_dict":  "create_airport_dict",
+                   "OD_df":         "create_OD_df",
+                   "OD_list":       "create_OD_df",
+                   "request_dict":  "create_request_dict",
+                   "request_table": "create_request_dict",
+                   "distance_df":   "create_distance_df",
+                   "aircraft_dict": "create_aircraft_dict",
+                   "duration_df":   "create_duration_df",
+                   "max_arc_time":  "create_duration_df"}
+
+# -> Data_processor per (working directory, use_cache, timestep_duration, planning_horizon), see shared_data_processor
+_shared_data_processors = {}
+
+
+def shared_data_processor(use_cache=True, timestep_duration=4, planning_horizon=96):
+    """
+    Process-wide Data_processor, every TSN/model of an experiment reuses the same input and derived tables.
+    One instance is kept per (working directory, use_cache, timestep_duration, planning_horizon), calls with a
+    different timestep or horizon get their own instance.
+    It is shared, so treat it as read-only (create a Data_processor to modify the data).
+    """
+    key = (os.getcwd(), use_cache, timestep_duration, planning_horizon)
+    if key not in _shared_data_processors:
+        _shared_data_processors[key] = Data_processor(use_cache=use_cache,
+                                                      timestep_duration=timestep_duration,
+                                                      planning_horizon=planning_horizon)
+    return _shared_data_processors[key]
 
 
 class Data_processor:
@@ -16,47 +56,84 @@ class Data_processor:
     OD_pairs_input_df: pd.DataFrame
     request_input_df: pd.DataFrame
 
-    """These are all the usefull dicts, lists, and DataFrames to be returned in the export function"""
+    """These are all the usefull dicts, lists, and DataFrames to be returned in the export function
+    They are created on first access (see LAZY_ATTRIBUTES) and then stored as normal attributes,
+    so a pickled Data_processor carries everything computed so far and never re-reads the input files"""
     airport_dict: dict
     OD_df: pd.DataFrame
     OD_list: list
     request_dict: dict
+    request_table: Request_table
     distance_df : pd.DataFrame
     aircraft_dict : dict
     duration_df : pd.DataFrame
     max_arc_time : int
 
-    def __init__(self):
-        try:
-            self.make_input_data_frames("G10/") # if files are in a folder  G10
-        except:
-            self.make_input_data_frames("") # if they are in the same directory
-        self.timestep_duration = 4 # hours
-        self.planning_horizon = 96 # TODO: take from here in netwerk gereration
-
-        self.create_airport_dict()
-        self.create_OD_df()
-        self.create_request_dict()
-        self.create_distance_df()
-        self.create_aircraft_dict()
-        self.create_duration_df()
+    """First timestep of the network in the full planning horizon, only non-zero for a window of Rolling_horizon"""
+    timestep_offset = 0
+
+    def __init__(self, use_cache=True, timestep_duration=4, planning_horizon=96):
+        """
+        :param use_cache: read the input files from the .npz snapshot in .input_cache/ if their contents did not change
+        :param timestep_duration: (h), e.g. 0.25 for 15 minute timesteps
+        :param planning_horizon: (h), a whole number of timesteps
+        """
+        self.use_cache = use_cache
+
+        with metrics.phase("Data_processor load", use_cache=use_cache) as phase:
+            if all(os.path.exists(f"G10/{file_name}") for file_name in INPUT_FILES.values()):
+                self.make_input_data_frames("G10/") # if files are in a folder  G10
+            else:
+                self.make_input_data_frames("") # if they are in the same directory
+
+            phase.count(airports=len(self.airport_input_df),
+                        OD_pairs=len(self.OD_pairs_input_df),
+                        requests=len(self.request_input_df))
+
+        self.timestep_duration = timestep_duration # hours
+        self.planning_horizon = planning_horizon # hours
+
+    def __getattr__(self, name):
+        # -> Only called if the attribute does not exist yet
+        if name in LAZY_ATTRIBUTES:
+            with metrics.phase(f"Data_processor {LAZY_ATTRIBUTES[name]}"):
+                getattr(self, LAZY_ATTRIBUTES[name])()
+            return self.__dict__[name]
+
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @property
+    def timestep_count(self):
+        """
+        Number of node layers of the time space network, timestep 0 up to and including the planning horizon
+        """
+        return int(round(self.planning_horizon/self.timestep_duration)) + 1
+
+    def build_all(self):
+        """
+        Creates every derived attribute now, e.g. before sending the Data_processor to worker processes
+        """
+        for name in LAZY_ATTRIBUTES:
+            getattr(self, name)
+        return self
 
     def make_input_data_frames(self,dir):
         """
         The given excel files will be put into Dataframes.
         """
-
-        file_name = f"{dir}airports_input_data.xlsx"
-        self.airport_input_df = pd.read_excel(file_name)
+        file_names = {name: f"{dir}{file_name}" for name, file_name in INPUT_FILES.items()}
 
         # file_name = f"{dir}/fleet_initial_final_position_input_data.xlsx"
         # self.fleet_initial_final_position_input_df = pd.read_excel(file_name)
 
-        file_name = f"{dir}OD_pairs_input_data.xlsx"
-        self.OD_pairs_input_df = pd.read_excel(file_name)
+        if self.use_cache:
+            frames = read_excel_cached(file_names)
+        else:
+            frames = {name: pd.read_excel(file_name) for name, file_name in file_names.items()}
 
-        file_name = f"{dir}requests_input_data.xlsx"
-        self.request_input_df = pd.read_excel(file_name)
+        self.airport_input_df = frames["airport_input_df"]
+        self.OD_pairs_input_df = frames["OD_pairs_input_df"]
+        self.request_input_df = frames["request_input_df"]
 
     def create_initial_final_aircrafts_dict(self):
         """
@@ -116,48 +193,20 @@ class Data_processor:
 
     def create_request_dict(self):
         """The request_dict is a dictionary with all the request ID's as key.
-        The item per ID is the request, which is a sub_dictionary with the information about the reqeust"""
-        self.request_dict = {}
-        for i in self.request_input_df.index:
-            release_step = int(ceil(self.request_input_df.loc[i,"Release time [minutes]"]/60/self.timestep_duration))
-            if release_step < 0:
-                release_step = 0
-
-            due_step = int(floor(self.request_input_df.loc[i,"Due date [minutes]"]/60/self.timestep_duration))
-            if due_step > self.planning_horizon/self.timestep_duration:
-                due_step = self.planning_horizon/self.timestep_duration
-
-            self.request_dict[self.request_input_df.loc[i,"Request ID"]] = {
-                "weight":        self.request_input_df.loc[i,"Weight [ton]"], # TODO: check unit conversion!
-                "airport_O":     self.request_input_df.loc[i,"Origin airport"],
-                "airport_D":     self.request_input_df.loc[i,"Destination airport"],
-                "release_time":  self.request_input_df.loc[i,"Release time [minutes]"], # TODO: check unit conversion!
-                "release_step":  release_step,
-                "due_time":      self.request_input_df.loc[i,"Due date [minutes]"], # TODO: check unit conversion!
-                "due_step":      due_step,
-                "penalty":       self.request_input_df.loc[i,"Penalty [MU/ton]"], # TODO: check unit conversion!
-            }
+        The item per ID is the request, which is a sub_dictionary with the information about the reqeust
+        Both are built from the request_table, which holds the same data as numpy arrays (see Request_table)"""
+        self.request_table = Request_table(request_input_df=self.request_input_df,
+                                           timestep_duration=self.timestep_duration,
+                                           planning_horizon=self.planning_horizon,
+                                           airport_refs=self.airport_dict.keys())
+        self.request_dict = self.request_table.to_dict()
 
     def create_distance_df(self):
-        deg2rad = pi/180
-        R_E = 6371 # km
-
+        """All airport pairs are solved in one go, see Distance_engine"""
         airports = self.airport_dict.keys()
-        self.distance_df = pd.DataFrame(index=airports,columns=airports,data=0)
-
-        for airport_i_ref, airport_i in self.airport_dict.items():
-            for airport_j_ref, airport_j in self.airport_dict.items():
-
-                ##just for conviniece
-                lat_i = deg2rad * airport_i["lat"]
-                lat_j = deg2rad * airport_j["lat"]
-                lon_i = deg2rad * airport_i["lon"]
-                lon_j = deg2rad * airport_j["lon"]
-
-                term_1 = (sin( (lat_i-lat_j)/2 ))**2
-                term_2 = cos(lat_i)*cos(lat_j)*(sin( (lon_i-lon_j)/2 ))**2
-
-                self.distance_df.loc[airport_i_ref,airport_j_ref] = 2 * R_E * arcsin(sqrt(term_1+term_2)) # TODO: check unit conversion
+        self.distance_df = haversine_df(airports=airports,
+                                        lat=[airport["lat"] for airport in self.airport_dict.values()],
+                                        lon=[airport["lon"] for airport in self.airport_dict.values()]) # TODO: check unit conversion
 
     def create_aircraft_dict(self):
         """
@@ -186,7 +235,7 @@ class Data_processor:
             Note that the duration is equal for both aircraft types, because they have equal speed, LTO and TAT.
         """
         airports = self.airport_dict.keys()
-        self.duration_df = pd.DataFrame(index=airports,columns=airports,data=0)
+        self.duration_df = pd.DataFrame(index=airports,columns=airports,data=0.0)
 
         self.max_arc_time = 0
         for airport_i_ref, airport_i in self.airport_dict.items():
@@ -196,12 +245,12 @@ class Data_processor:
                            self.aircraft_dict["AC_1"]["TAT"] + self.aircraft_dict["AC_1"]["LTO"]
 
                 if airport_i_ref != airport_j_ref:
-                    arc_time = ceil(denominator/self.timestep_duration)*self.timestep_duration
+                    arc_time = ceil(denominator/self.timestep_duration - STEP_TOLERANCE)*self.timestep_duration
                     self.max_arc_time = max(arc_time,self.max_arc_time)
                     self.duration_df.loc[airport_i_ref,airport_j_ref] = arc_time
 
 if __name__ == '__main__':
-    D = Data_reader()
+    D = Data_processor()
     # print(D.airport_input_df)
     # for airport_ref, airport in D.airport_dict.items():
     #     print(airport_ref,":",airport)
@@ -213,4 +262,4 @@ if __name__ == '__main__':
     #
     # print(distance_df)
     # print(OD_list)
-    print(vars(D)["duration_df"])
+    print(D.duration_df)
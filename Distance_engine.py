@@ -0,0 +1,44 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+
+import numpy as np
+import pandas as pd
+
+R_E = 6371 # km
+
+
+def haversine_matrix(lat, lon, R=R_E):
+    """
+    All-pairs great-circle distance using the haversine equation, evaluated in one numpy broadcast.
+    :param lat: Latitudes of the airports (deg)
+    :param lon: Longitudes of the airports (deg)
+    :param R: Radius of the earth (km)
+    :return: (N, N) array with the distance between airport i and airport j (km)
+    """
+    deg2rad = np.pi/180
+
+    phi = deg2rad * np.asarray(lat, dtype=float)
+    lambda_ = deg2rad * np.asarray(lon, dtype=float)
+
+    # -> Column (i) against row (j) broadcast
+    phi_i, phi_j = phi[:, None], phi[None, :]
+    lambda_i, lambda_j = lambda_[:, None], lambda_[None, :]
+
+    term_1 = (np.sin( (phi_i-phi_j)/2 ))**2
+    term_2 = np.cos(phi_i)*np.cos(phi_j)*(np.sin( (lambda_i-lambda_j)/2 ))**2
+
+    # -> Clip guards against round-off pushing antipodal pairs just above 1
+    return 2 * R * np.arcsin(np.sqrt(np.clip(term_1+term_2, 0, 1)))
+
+
+def haversine_df(airports, lat, lon, R=R_E):
+    """
+    Same as haversine_matrix, but labelled with the airport refs as index and columns.
+    """
+    airports = list(airports)
+    return pd.DataFrame(haversine_matrix(lat, lon, R=R), index=airports, columns=airports)
+
@@ -0,0 +1,113 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = ".input_cache"
+CACHE_VERSION = 2   # Bump if the snapshot layout changes, old snapshots are then ignored
+
+
+def content_hash(file_names):
+    """
+    :return: sha256 over the contents of the files (in the given order)
+    """
+    sha = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    for file_name in file_names:
+        with open(file_name, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                sha.update(block)
+    return sha.hexdigest()
+
+
+def save_frames(path, frames):
+    """
+    Stores DataFrames column by column in a single .npz, text columns as fixed width unicode (no pickling needed)
+    with a mask of their missing cells
+    :param frames: {name: DataFrame}
+    """
+    arrays = {}
+    for name, df in frames.items():
+        arrays[f"{name}/columns"] = np.array([str(column) for column in df.columns])
+        for i, column in enumerate(df.columns):
+            values = df[column].to_numpy()
+            if values.dtype != object:
+                arrays[f"{name}/{i}"] = values
+                continue
+
+            missing = pd.isna(values)
+            arrays[f"{name}/{i}"] = np.where(missing, "", values).astype(str)
+            if missing.any():
+                arrays[f"{name}/{i}/missing"] = missing
+
+    # -> Written next to the target and renamed, so an interrupted run never leaves a half snapshot
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_frames(path, names):
+    """
+    :return: {name: DataFrame} as stored by save_frames, text columns as object with NaN for missing cells like
+             pd.read_excel
+    """
+    frames = {}
+    with np.load(path, allow_pickle=False) as arrays:
+        for name in names:
+            columns = arrays[f"{name}/columns"]
+            data = {}
+            for i, column in enumerate(columns):
+                values = arrays[f"{name}/{i}"]
+                if values.dtype.kind == "U":
+                    values = values.astype(object)
+                    if f"{name}/{i}/missing" in arrays:
+                        values[arrays[f"{name}/{i}/missing"]] = np.nan
+                data[str(column)] = values
+            frames[name] = pd.DataFrame(data)
+    return frames
+
+
+def read_excel_cached(file_names, cache_dir=None):
+    """
+    pd.read_excel for every file, served from a .npz snapshot if one exists for the current file contents.
+        The snapshot is keyed by the content hash, so editing any of the workbooks invalidates it.
+        On a miss the workbooks are parsed and a new snapshot replaces the old one.
+    :param file_names: {name: path of the .xlsx}
+    :param cache_dir: directory of the snapshots, default: CACHE_DIR next to the first workbook
+    :return: {name: DataFrame}
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(list(file_names.values())[0]), CACHE_DIR)
+
+    key = content_hash(file_names.values())
+    path = os.path.join(cache_dir, f"input_{key}.npz")
+
+    # -> Hit
+    if os.path.exists(path):
+        try:
+            return load_frames(path, file_names.keys())
+        except (OSError, KeyError, ValueError):
+            pass    # Unreadable snapshot, treated as a miss and overwritten
+
+    # -> Miss
+    frames = {name: pd.read_excel(file_name) for name, file_name in file_names.items()}
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # -> Snapshots of older workbook contents are stale
+        for file_name in os.listdir(cache_dir):
+            if file_name.startswith("input_") and file_name.endswith(".npz"):
+                os.remove(os.path.join(cache_dir, file_name))
+
+        save_frames(path, frames)
+    except OSError:
+        pass    # Read-only location, the frames are still returned
+
+    return frames
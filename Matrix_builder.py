@@ -0,0 +1,211 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+from TSN import arc_node_ids, reachable_request_arcs
+
+
+class Matrix_builder:
+    """
+    Model 3 as sparse matrices, assembled from the TSN with numpy instead of one LinExpr per constraint.
+        Columns: x (flight arc, aircraft) | y (ground arc, aircraft) | z (arc, request)
+        x and y are flattened arc-major, z holds only the (arc, request) pairs of the z variables
+    Every constraint block is a (name, A, sense, rhs, row names) tuple over all columns, in the order Model_3 adds them.
+    """
+    def __init__(self, TSN, prune_z=True, z_columns=True, aircraft_boundary=None, free_end=False):
+        """
+        :param prune_z: only create z variables for arcs on a path between the origin and destination of the request
+        :param z_columns: False leaves out the z columns, e.g. for the column generation master that adds path columns
+        :param aircraft_boundary: h per (node id, aircraft type), default: -fleet at the first timestep and +fleet at
+                                  the last timestep (see aircraft_flow)
+        :param free_end: no aircraft flow constraints at the last timestep, the aircraft end wherever they are routed
+                         (e.g. a window of Rolling_horizon that is not the last one)
+        """
+        self.TSN = TSN
+        self.aircraft_boundary = aircraft_boundary
+        self.free_end = free_end
+        self.data = TSN.data
+        incidence = TSN.request_incidence
+
+        self.aircraft_refs = list(self.data.aircraft_dict.keys())
+        self.request_ids = list(self.data.request_dict.keys())
+        self.airport_refs = list(incidence.airport_index.keys())
+
+        self.F = len(TSN.flight_arc_lst)
+        self.G = len(TSN.ground_arc_lst)
+        self.K = len(self.aircraft_refs)
+        self.R = len(self.request_ids)
+        self.node_count = incidence.timestep_count * len(self.airport_refs)
+
+        # -> Origin and destination node of every arc, in TSN.arc_lst order (flight | ground | NS)
+        arc_origin, arc_destination = arc_node_ids(TSN)
+        requests = list(self.data.request_dict.values())
+
+        self.request_origin = np.array([incidence.node_id(request["release_step"], request["airport_O"])
+                                        for request in requests], dtype=np.int64)
+        self.request_destination = np.array([incidence.node_id(request["due_step"], request["airport_D"])
+                                             for request in requests], dtype=np.int64)
+
+        self.arc_origin = np.concatenate((arc_origin, self.request_origin))
+        self.arc_destination = np.concatenate((arc_destination, self.request_destination))
+
+        # -> z columns: every reachable (non-NS arc, request) pair, then the NS arc of every request
+        if not z_columns:
+            self.z_arc = np.zeros(0, dtype=np.int64)
+            self.z_request = np.zeros(0, dtype=np.int64)
+        else:
+            if prune_z:
+                z_arc, z_request = reachable_request_arcs(TSN)
+            else:
+                z_arc = np.repeat(np.arange(self.F + self.G), self.R)
+                z_request = np.tile(np.arange(self.R), self.F + self.G)
+
+            self.z_arc = np.concatenate((z_arc, self.F + self.G + np.arange(self.R)))
+            self.z_request = np.concatenate((z_request, np.arange(self.R)))
+
+        # -> Column layout
+        self.x_start = 0
+        self.y_start = self.F * self.K
+        self.z_start = self.y_start + self.G * self.K
+        self.column_count = self.z_start + len(self.z_arc)
+
+    # ============================================================================= Columns
+    def objective(self):
+        """
+        :return: objective coefficient of every column
+        """
+        weight = np.array([request["weight"] for request in self.data.request_dict.values()], dtype=float)
+        penalty = np.array([request["penalty"] for request in self.data.request_dict.values()], dtype=float)
+
+        costs = self.TSN.flight_arc_costs
+
+        # -> x: Ck*Df, y: 0
+        c_x = costs.operational_cost.ravel()
+        c_y = np.zeros(self.G * self.K)
+
+        # -> z: MCf*Df*Wr on flight arcs, PCr*Wr on NS arcs, 0 on ground arcs
+        c_z = np.zeros(len(self.z_arc))
+
+        flight = self.z_arc < self.F
+        c_z[flight] = costs.unit_cost[self.z_arc[flight]] * weight[self.z_request[flight]]
+
+        ns = self.z_arc >= self.F + self.G
+        c_z[ns] = penalty[self.z_request[ns]] * weight[self.z_request[ns]]
+
+        return np.concatenate((c_x, c_y, c_z))
+
+    def column_names(self):
+        arc_refs = [arc.ref for arc in self.TSN.arc_lst]
+
+        names = [f"x-{arc_refs[f]}-{k}" for f in range(self.F) for k in self.aircraft_refs]
+        names += [f"y-{arc_refs[self.F + g]}-{k}" for g in range(self.G) for k in self.aircraft_refs]
+        names += [f"z-{arc_refs[a]}-#{self.request_ids[r]}#" for a, r in zip(self.z_arc, self.z_request)]
+        return names
+
+    # ============================================================================= Constraints
+    def flight_arc_usage(self):
+        """
+        (1) sum_k x_f_k <= 1
+        """
+        rows = np.repeat(np.arange(self.F), self.K)
+        cols = self.x_start + np.arange(self.F * self.K)
+        A = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(self.F, self.column_count))
+
+        arc_refs = [arc.ref for arc in self.TSN.flight_arc_lst]
+        return "Flight_arc_usage", A, "<", np.ones(self.F), [f"Flight_arc_usage-{f}" for f in arc_refs]
+
+    def aircraft_flow(self):
+        """
+        (2) Aircraft in - aircraft out == h, per node and aircraft type
+        """
+        K = self.K
+        k = np.arange(K)
+
+        # -> Flight and ground arcs with their x/y columns, one entry per aircraft type
+        arc_count = self.F + self.G
+        arc_cols = self.x_start + np.arange(arc_count * K)  # x and y are adjacent and both arc-major
+        origin_rows = (self.arc_origin[:arc_count, None] * K + k).ravel()
+        destination_rows = (self.arc_destination[:arc_count, None] * K + k).ravel()
+
+        rows = np.concatenate((destination_rows, origin_rows))
+        cols = np.concatenate((arc_cols, arc_cols))
+        values = np.concatenate((np.ones(len(arc_cols)), -np.ones(len(arc_cols))))
+        A = sp.csr_matrix((values, (rows, cols)), shape=(self.node_count * K, self.column_count))
+
+        # -> h: -fleet at the first timestep, +fleet at the last timestep
+        airport_count = len(self.airport_refs)
+        if self.aircraft_boundary is None:
+            fleet = np.array([[self.data.airport_dict[airport_ref]["aircrafts"][aircraft_ref]
+                               for aircraft_ref in self.aircraft_refs] for airport_ref in self.airport_refs], dtype=float)
+
+            h = np.zeros((self.node_count, K))
+            h[-airport_count:] = fleet
+            h[:airport_count] = -fleet
+        else:
+            h = np.asarray(self.aircraft_boundary, dtype=float).reshape(self.node_count, K)
+
+        # -> Only nodes with arcs or boundary values, the nodes removed by TSN compression have neither
+        node_ids = np.union1d(np.concatenate((self.arc_origin[:arc_count], self.arc_destination[:arc_count])),
+                              np.flatnonzero(h.any(axis=1)))
+        if self.free_end:
+            node_ids = node_ids[node_ids < self.node_count - airport_count]
+        rows = (node_ids[:, None] * K + k).ravel()
+
+        names = [f"Conservation_of_aircraft_flow-{n // airport_count}-{self.airport_refs[n % airport_count]}-{aircraft_ref}"
+                 for n in node_ids for aircraft_ref in self.aircraft_refs]
+        return "Conservation_of_aircraft_flow", A[rows], "=", h.ravel()[rows], names
+
+    def request_flow(self):
+        """
+        (3) Request in - request out == v, only for the (node, request) pairs with a z variable
+        """
+        R = self.R
+        z_cols = self.z_start + np.arange(len(self.z_arc))
+
+        # -> Row key per (node, request), keys are node-major like the loop builder
+        origin_keys = self.arc_origin[self.z_arc] * R + self.z_request
+        destination_keys = self.arc_destination[self.z_arc] * R + self.z_request
+        keys, rows = np.unique(np.concatenate((destination_keys, origin_keys)), return_inverse=True)
+
+        cols = np.concatenate((z_cols, z_cols))
+        values = np.concatenate((np.ones(len(z_cols)), -np.ones(len(z_cols))))
+        A = sp.csr_matrix((values, (rows, cols)), shape=(len(keys), self.column_count))
+
+        # -> v: +1 at the destination node, -1 at the origin node (origin takes precedence)
+        v = np.zeros(len(keys))
+        request_index = np.arange(R)
+        v[np.searchsorted(keys, self.request_destination * R + request_index)] = 1
+        v[np.searchsorted(keys, self.request_origin * R + request_index)] = -1
+
+        airport_count = len(self.airport_refs)
+        names = [f"Conservation_of_request_flow-{n // airport_count}-{self.airport_refs[n % airport_count]}-"
+                 f"{self.request_ids[r]}" for n, r in zip(keys // R, keys % R)]
+        return "Conservation_of_request_flow", A, "=", v, names
+
+    def weight_capacity(self):
+        """
+        (4) sum_r Wr z_f_r - sum_k payload_k x_f_k <= 0
+        """
+        weight = np.array([request["weight"] for request in self.data.request_dict.values()], dtype=float)
+        payload = np.array([self.data.aircraft_dict[k]["payload"] for k in self.aircraft_refs], dtype=float)
+
+        flight = np.flatnonzero(self.z_arc < self.F)
+
+        rows = np.concatenate((self.z_arc[flight], np.repeat(np.arange(self.F), self.K)))
+        cols = np.concatenate((self.z_start + flight, self.x_start + np.arange(self.F * self.K)))
+        values = np.concatenate((weight[self.z_request[flight]], -np.tile(payload, self.F)))
+        A = sp.csr_matrix((values, (rows, cols)), shape=(self.F, self.column_count))
+
+        arc_refs = [arc.ref for arc in self.TSN.flight_arc_lst]
+        return "Weight capacity", A, "<", np.zeros(self.F), [f"Weight capacity-{f}" for f in arc_refs]
+
+    def constraints(self):
+        return [self.flight_arc_usage(),
+                self.aircraft_flow(),
+                self.request_flow(),
+                self.weight_capacity()]
@@ -0,0 +1,236 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+
+Phase timers and counters of the data, network, model and solve phases.
+Every phase records its duration, the counts given to it (arcs, variables, constraints, columns, ...) and the
+memory peak, and is appended to the metrics file as soon as it ends, so a run can be followed while it is going:
+    APO_METRICS_FILE=runs/metrics.csv python Model_generator_3.py
+        .csv:   one row per (phase, metric): run, timestamp, phase, parent, metric, value
+        .jsonl: one json object per phase
+    APO_METRICS_MEMORY=rss (default, peak resident memory of the process), tracemalloc (peak of the python
+    allocations during the phase, slower) or none
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+METRICS_FILE_VARIABLE = "APO_METRICS_FILE"
+METRICS_MEMORY_VARIABLE = "APO_METRICS_MEMORY"
+
+CSV_COLUMNS = ["run", "timestamp", "phase", "parent", "metric", "value"]
+
+
+def max_rss_mb():
+    """
+    :return: peak resident memory of the process so far (MB), None if not available
+    """
+    if resource is None:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024 # bytes on macOS, kB on Linux
+
+
+class Phase:
+    """
+    Timer of one phase, used as a context manager or with start/stop when the phase is not a single block:
+        with metrics.phase("TSN build") as phase:
+            ...
+            phase.count(flight_arcs=len(flight_arc_lst))
+
+        phase = metrics.phase("Model_1B build").start()
+        ...
+        phase.stop(variables=model.NumVars)
+    """
+    def __init__(self, metrics, name, counts):
+        self.metrics = metrics
+        self.name = name
+        self.parent = None
+        self.counts = dict(counts)
+
+        self.t_start = None
+        self.traced_peak = 0    # Peak of the phases nested in this one
+
+    def start(self):
+        self.parent = self.metrics.stack[-1] if self.metrics.stack else None
+        self.metrics.stack.append(self)
+
+        if self.metrics.memory == "tracemalloc":
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+        self.t_start = time.perf_counter()
+        return self
+
+    def count(self, **counts):
+        self.counts.update(counts)
+        return self
+
+    def stop(self, **counts):
+        """
+        :return: record of the phase, {"phase", "parent", "duration_s", memory, counts...}
+        """
+        duration = time.perf_counter() - self.t_start
+        self.counts.update(counts)
+        self.metrics.stack.remove(self)
+
+        record = {"phase": self.name,
+                  "parent": self.parent.name if self.parent is not None else None,
+                  "duration_s": duration}
+
+        if self.metrics.memory == "tracemalloc":
+            # ... reset_peak of a nested phase drops the peak before it, so it is passed on to the parent
+            peak = max(self.traced_peak, tracemalloc.get_traced_memory()[1])
+            if self.parent is not None:
+                self.parent.traced_peak = max(self.parent.traced_peak, peak)
+            record["traced_peak_mb"] = peak / 1024**2
+
+        elif self.metrics.memory == "rss":
+            record["max_rss_mb"] = max_rss_mb()
+
+        record.update(self.counts)
+        self.metrics.emit(record)
+        return record
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.counts["failed"] = exc_type.__name__
+        self.stop()
+        return False
+
+
+class Metrics:
+    """
+    Registry of the phase records of a run, written to file (see module docstring) and kept in records
+    """
+    def __init__(self, file=None, memory="rss", run=None):
+        """
+        :param file: .csv or .jsonl file the records are appended to, None keeps them in memory only
+        :param memory: "rss", "tracemalloc" or None
+        :param run: id of the run in the file, default: start time and process id
+        """
+        self.file = file
+        self.memory = memory
+        self.run = run if run is not None else f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+        self.records = []
+        self.stack = []
+
+    def phase(self, name, **counts):
+        return Phase(self, name, counts)
+
+    def count(self, name, **counts):
+        """
+        Records counts without a duration, e.g. per iteration of a loop
+        """
+        parent = self.stack[-1].name if self.stack else None
+        self.emit(dict({"phase": name, "parent": parent}, **counts))
+
+    def emit(self, record):
+        record = dict({"run": self.run, "timestamp": datetime.now().isoformat(timespec="milliseconds")}, **record)
+        self.records.append(record)
+
+        if self.file is not None:
+            self.write([record], self.file)
+
+    @staticmethod
+    def write(records, file):
+        """
+        Appends records to a .csv (one row per metric) or .jsonl (one line per record) file
+        """
+        directory = os.path.dirname(file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if file.endswith(".jsonl"):
+            with open(file, "a") as f:
+                for record in records:
+                    f.write(json.dumps(record, default=str) + "\n")
+            return
+
+        new_file = not os.path.exists(file) or os.path.getsize(file) == 0
+        with open(file, "a", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(CSV_COLUMNS)
+
+            for record in records:
+                for metric, value in record.items():
+                    if metric in ["run", "timestamp", "phase", "parent"] or value is None:
+                        continue
+                    writer.writerow([record["run"], record["timestamp"], record["phase"], record["parent"], metric, value])
+
+    def save(self, file):
+        """
+        Writes every record of this run to file (e.g. when no metrics file was set)
+        """
+        self.write(self.records, file)
+
+    def summary(self):
+        """
+        :return: {phase: {"calls", "duration_s"}}, durations of repeated phases are summed
+        """
+        summary = {}
+        for record in self.records:
+            if "duration_s" not in record:
+                continue
+            phase = summary.setdefault(record["phase"], {"calls": 0, "duration_s": 0})
+            phase["calls"] += 1
+            phase["duration_s"] += record["duration_s"]
+        return summary
+
+
+def model_size(model):
+    """
+    :param model: Gurobi model (call model.update() first) or Solver_backend model
+    :return: number of variables, constraints and nonzeros
+    """
+    if hasattr(model, "size"):
+        return model.size()
+    return {"variables": model.NumVars, "constraints": model.NumConstrs, "nonzeros": model.NumNZs}
+
+
+def solve_result(model):
+    """
+    :param model: optimized Gurobi model or Solver_backend model
+    :return: status, objective and search counts
+    """
+    if hasattr(model, "result"):
+        return model.result()
+
+    result = {"status": model.Status, "solutions": model.SolCount, "iterations": model.IterCount}
+
+    if model.SolCount > 0:
+        result["objective"] = model.ObjVal
+
+    if model.IsMIP:
+        result["nodes"] = model.NodeCount
+        if model.SolCount > 0:
+            result["gap"] = model.MIPGap
+
+    return result
+
+
+def memory_mode():
+    mode = os.environ.get(METRICS_MEMORY_VARIABLE, "rss").lower()
+    return None if mode == "none" else mode
+
+
+# -> Process-wide registry used by the data, network, model and solver modules
+metrics = Metrics(file=os.environ.get(METRICS_FILE_VARIABLE), memory=memory_mode())
@@ -16,49 +16,208 @@ from gurobipy import GRB
 
 
 # Own modules
-from TSN import Time_space_network
+from TSN import Time_space_network, reachable_request_arcs
+from TSN_compact import Compact_time_space_network
+from Matrix_builder import Matrix_builder
+from Metrics import metrics, model_size, solve_result
+from Solver_backend import create_model
 __version__ = '1.1.1'
 
 ################################################################################################################
 
 
 class Model_3:
-    def __init__(self,max_time = 3600):
+    def __init__(self,max_time = 3600, compact_network=False, compress_network=False, prune_z=True, builder="matrix",
+                 mip_start=None, save_solution=None, TSN=None, solve=True, backend=None, aircraft_boundary=None,
+                 free_end=False):
+        """
+        :param compress_network: merge event-free ground nodes of the Time_space_network (see Time_space_network.compress)
+        :param prune_z: only create z variables for arcs on a path between the origin and destination of the request
+        :param builder: "matrix" assembles the constraints as sparse matrices and adds them in bulk,
+                        "linexpr" builds every constraint term by term
+        :param mip_start: .npz solution file of an earlier run (see write_solution), used as MIP start
+        :param save_solution: .npz file to store the best solution in, for use as mip_start of a later run
+        :param TSN: prebuilt time space network (e.g. of a synthetic instance), default: built from the input files
+        :param solve: False only builds the model (no .lp file, no optimize)
+        :param backend: None builds and solves the model with gurobipy directly,
+                        "gurobi"/"highs" build the matrix model through Solver_backend (no mip_start/save_solution)
+        :param aircraft_boundary: h per (node id, aircraft type) instead of the fleet positions (see Matrix_builder)
+        :param free_end: no aircraft flow constraints at the last timestep (see Matrix_builder)
+        """
+        if compact_network and compress_network:
+            raise ValueError("compress_network requires the Time_space_network, "
+                             "the Compact_time_space_network can not be compressed")
+
         # -> Generate data
-        self.TSN = Time_space_network()
+        if TSN is not None:
+            self.TSN = TSN
+        elif compact_network:
+            self.TSN = Compact_time_space_network()
+        else:
+            self.TSN = Time_space_network(compress=compress_network)
+
+        self.prune_z = prune_z
+        self.builder = builder
+        self.backend = backend
+        self.aircraft_boundary = aircraft_boundary
+        self.free_end = free_end
+
+        if self.backend is None and self.builder != "matrix" and (aircraft_boundary is not None or free_end):
+            raise ValueError("aircraft_boundary and free_end require builder='matrix'")
+
+        if self.backend is not None and (mip_start is not None or save_solution is not None):
+            raise ValueError("mip_start and save_solution require backend=None")
 
         # -> Creating model
-        self.model = gp.Model("APO_assignment_model_3")
+        if self.backend is None:
+            self.model = gp.Model("APO_assignment_model_3")
+
+            self.model.Params.OutputFlag = 1    # Disabling the gurobi console output, set to 1 to enable
+
+            self.model.setParam("TimeLimit",max_time)
+        else:
+            self.model = create_model(self.backend, "APO_assignment_model_3")
+            self.model.set_time_limit(max_time)
 
         # -> Adjusting settings
         display_progress_bars = True
 
-        self.model.Params.OutputFlag = 1    # Disabling the gurobi console output, set to 1 to enable
+        with metrics.phase("Model_3 build", builder=builder, prune_z=prune_z, backend=backend) as phase:
+            if self.backend is not None:
+                self.decision_variable_dict = self.build_backend_model()
 
-        self.model.setParam("TimeLimit",max_time)
+            elif self.builder == "matrix":
+                self.decision_variable_dict = self.build_matrix_model()
 
-        # -> Creating decision variables
-        self.decision_variable_dict = self.generate_decision_variables()
+            else:
+                # -> Creating decision variables
+                self.decision_variable_dict = self.generate_decision_variables()
 
-        # -> Add constraints
-        self.add_flight_arc_usage_constraint(display_progress_bars)
-        self.add_conservation_of_aircraft_flow_constraint(display_progress_bars)
-        self.add_conservation_of_request_flow_constraint(display_progress_bars)
-        self.add_weight_capacity_constraint(display_progress_bars)
-        self.add_net_aircraft_flow_constraint(display_progress_bars) #not used
+                # -> Add constraints
+                self.add_flight_arc_usage_constraint(display_progress_bars)
+                self.add_conservation_of_aircraft_flow_constraint(display_progress_bars)
+                self.add_conservation_of_request_flow_constraint(display_progress_bars)
+                self.add_weight_capacity_constraint(display_progress_bars)
+                self.add_net_aircraft_flow_constraint(display_progress_bars) #not used
 
-        # -> Add objective function
-        self.add_objective_function(display_progress_bars)
+                # -> Add objective function
+                self.add_objective_function(display_progress_bars)
+
+            if self.backend is None:
+                self.model.update()
+            phase.count(**model_size(self.model))
 
         print("\nModel compiled!!!")
 
+        if not solve:
+            return
+
         # -> Write model
         self.model.write("Model_3.lp")
-        self.model.printStats()
-        self.model.optimize()
+        if self.backend is None:
+            self.model.printStats()
+
+        if mip_start is not None:
+            self.read_mip_start(mip_start)
+
+        with metrics.phase("Model_3 optimize") as phase:
+            self.model.optimize()
+            phase.count(**solve_result(self.model))
+
+        if save_solution is not None and self.model.SolCount > 0:
+            self.write_solution(save_solution)
 
         print("\nModel optimized!!!")
 
+    def build_matrix_model(self):
+        """
+        Adds the variables, constraints and objective of Matrix_builder with one addMVar/addMConstr call per block
+        :return: decision_variable_dict, with the same layout as generate_decision_variables
+        """
+        builder = Matrix_builder(TSN=self.TSN, prune_z=self.prune_z, aircraft_boundary=self.aircraft_boundary,
+                                 free_end=self.free_end)
+
+        # -> Variables, the objective coefficients are set on creation
+        c = builder.objective()
+        x = self.model.addMVar(builder.F * builder.K, vtype=GRB.BINARY, obj=c[builder.x_start:builder.y_start])
+        y = self.model.addMVar(builder.G * builder.K, vtype=GRB.INTEGER, obj=c[builder.y_start:builder.z_start])
+        z = self.model.addMVar(len(builder.z_arc), vtype=GRB.BINARY, obj=c[builder.z_start:])
+        self.model.ModelSense = GRB.MINIMIZE
+        self.model.update()
+
+        variables = x.tolist() + y.tolist() + z.tolist()
+        self.model.setAttr("VarName", variables, builder.column_names())
+
+        # -> Constraints
+        for constraint_name, A, sense, rhs, row_names in builder.constraints():
+            constraints = self.model.addMConstr(A, None, sense, rhs, name=constraint_name)
+            self.model.update()
+            self.model.setAttr("ConstrName", constraints.tolist(), row_names)
+
+        return self.matrix_variable_dict(builder, variables)
+
+    def build_backend_model(self):
+        """
+        Adds the columns and constraint blocks of Matrix_builder to the Solver_backend model
+        :return: decision_variable_dict of Solver_backend Variables, with the same layout as generate_decision_variables
+        """
+        builder = Matrix_builder(TSN=self.TSN, prune_z=self.prune_z, aircraft_boundary=self.aircraft_boundary,
+                                 free_end=self.free_end)
+
+        # -> Variables: x and z binary, y integer
+        ub = np.ones(builder.column_count)
+        ub[builder.y_start:builder.z_start] = np.inf
+        variables = self.model.add_variables(builder.objective(), lb=0, ub=ub, integer=True,
+                                             names=builder.column_names())
+
+        # -> Constraints
+        for constraint_name, A, sense, rhs, row_names in builder.constraints():
+            self.model.add_constraints(A, sense, rhs, row_names)
+
+        return self.matrix_variable_dict(builder, variables)
+
+    def matrix_variable_dict(self, builder, variables):
+        """
+        :param variables: variable per Matrix_builder column
+        :return: decision_variable_dict, with the same layout as generate_decision_variables
+        """
+        arc_lst = self.TSN.arc_lst
+        decision_variable_dict = {"x": {}, "y": {}, "z": {arc.ref: {} for arc in arc_lst}}
+
+        for i, arc in enumerate(self.TSN.flight_arc_lst):
+            decision_variable_dict["x"][arc.ref] = dict(zip(builder.aircraft_refs, variables[i*builder.K:(i+1)*builder.K]))
+
+        for i, arc in enumerate(self.TSN.ground_arc_lst):
+            start = builder.y_start + i*builder.K
+            decision_variable_dict["y"][arc.ref] = dict(zip(builder.aircraft_refs, variables[start:start+builder.K]))
+
+        for variable, a, r in zip(variables[builder.z_start:], builder.z_arc, builder.z_request):
+            decision_variable_dict["z"][arc_lst[a].ref][builder.request_ids[r]] = variable
+
+        return decision_variable_dict
+
+    def write_solution(self, file_name):
+        """
+        Stores the best solution as variable names and values (Gurobi's .sol files rename our arc refs)
+        """
+        variables = self.model.getVars()
+        np.savez(file_name,
+                 names=np.array(self.model.getAttr("VarName", variables)),
+                 values=np.array(self.model.getAttr("X", variables)))
+
+    def read_mip_start(self, file_name):
+        """
+        Sets the solution of write_solution as MIP start, matched by variable name.
+            Variables missing from the file (e.g. new requests in a re-plan) are left undefined and completed by Gurobi
+        """
+        with np.load(file_name) as solution:
+            values = dict(zip(solution["names"].tolist(), solution["values"].tolist()))
+
+        self.model.update()
+        variables = self.model.getVars()
+        names = self.model.getAttr("VarName", variables)
+        self.model.setAttr("Start", variables, [values.get(name, GRB.UNDEFINED) for name in names])
+
     def generate_decision_variables(self):
         decision_variable_dict = {"x": {},      # FLight arc decision variables
                                   "y": {},      # Ground arc decision variables
@@ -85,19 +244,35 @@ class Model_3:
                                       name=f"y-{g}-{k}")
 
         # -> Adding arc-request decision variables - z_a_r
-        for arc in self.TSN.arc_lst:
+        # Sparse: z[a] only holds the requests that can use arc a, a missing request means z_a_r = 0
+        request_ids = list(self.TSN.data.request_dict.keys())
+
+        arc_count = len(self.TSN.arc_lst_no_ns)
+        if self.prune_z:
+            z_arc, z_request = reachable_request_arcs(self.TSN)
+        else:
+            z_arc = np.repeat(np.arange(arc_count), len(request_ids))
+            z_request = np.tile(np.arange(len(request_ids)), arc_count)
+
+        # ... per non-NS arc, the pairs are sorted by arc
+        arc_indptr = np.searchsorted(z_arc, np.arange(arc_count + 1))
+        for i, arc in enumerate(self.TSN.arc_lst_no_ns):
             a = arc.ref
             decision_variable_dict["z"][a] = {}
 
-            for r, request in self.TSN.data.request_dict.items(): # TODO: these if statementes are no where mentioned in the assignment but they should be here right?
-                decision_variable_dict["z"][a][r] = 0
-                if arc.type == "NS":
-                    if arc.request_id != r:
-                        continue
+            for j in z_request[arc_indptr[i]:arc_indptr[i+1]]:
+                r = request_ids[j]
                 decision_variable_dict["z"][a][r] = \
                     self.model.addVar(vtype=GRB.BINARY,
                                       name=f"z-{a}-#{r}#")
 
+        # ... per NS arc, only the request it belongs to
+        for ns_arc in self.TSN.ns_arc_lst:
+            a = ns_arc.ref
+            r = ns_arc.request_id
+            decision_variable_dict["z"][a] = {r: self.model.addVar(vtype=GRB.BINARY,
+                                                                   name=f"z-{a}-#{r}#")}
+
         return decision_variable_dict
 
     def add_flight_arc_usage_constraint(self, display_progress_bars=False):
@@ -166,24 +341,28 @@ class Model_3:
         for t, timestep in enumerate(self.TSN.network):     # ... per timestep
             for airport_ref, node in timestep.items():      # ... per airport
 
-                # ... per request
-                for r, request in self.TSN.data.request_dict.items():
-                    constraint_l = gp.LinExpr()
+                # -> Only requests with a z variable on an arc of the node get a constraint
+                constraint_l_dict = {}
 
-                    # ... per arc existing the node
-                    for arc in node.out_arc_lst:
-                        a = arc.ref
+                # ... per arc existing the node
+                for arc in node.out_arc_lst:
+                    for r, z in self.decision_variable_dict["z"][arc.ref].items():
+                        constraint_l = constraint_l_dict.setdefault(r, gp.LinExpr())
+                        constraint_l -= z
 
-                        constraint_l -= self.decision_variable_dict["z"][a][r]
+                # ... per arc entering the node
+                for arc in node.in_arc_lst:
+                    for r, z in self.decision_variable_dict["z"][arc.ref].items():
+                        constraint_l = constraint_l_dict.setdefault(r, gp.LinExpr())
+                        constraint_l += z
 
-                    # ... per arc entering the node
-                    for arc in node.in_arc_lst:
-                        a = arc.ref
-
-                        constraint_l += self.decision_variable_dict["z"][a][r]
+                # ... per request
+                for r in self.TSN.data.request_dict.keys():
+                    if r not in constraint_l_dict:
+                        continue
 
                     # TODO: Double check v
-                    self.model.addConstr(constraint_l == node.v[r],
+                    self.model.addConstr(constraint_l_dict[r] == node.v[r],
                                          name=f"Conservation_of_request_flow-{t}-{airport_ref}-{r}")
 
     def add_weight_capacity_constraint(self, display_progress_bars=False):
@@ -194,9 +373,9 @@ class Model_3:
             constraint_l = gp.LinExpr()
             constraint_r = gp.LinExpr()
 
-            # ... per request
-            for r, request in self.TSN.data.request_dict.items():
-                constraint_l += request["weight"] * self.decision_variable_dict["z"][f][r]
+            # ... per request that can use the flight arc
+            for r, z in self.decision_variable_dict["z"][f].items():
+                constraint_l += self.TSN.data.request_dict[r]["weight"] * z
 
             # ... per aircraft
             for k, aircraft in self.TSN.data.aircraft_dict.items():
@@ -210,43 +389,36 @@ class Model_3:
         pass
 
     def MCf(self,flight_arc):
-        i = self.TSN.data.airport_dict[flight_arc.origin_airport]["index"]
-        j = self.TSN.data.airport_dict[flight_arc.destination_airport]["index"]
-        n = len(self.TSN.data.airport_dict)
-        depart_time = flight_arc.origin_timestep * self.TSN.data.timestep_duration
-        h = depart_time % 24
-        d = (depart_time - h) / 24 + 1
-        # print(f"time = {depart_time}, d = {d}, h = {h}")
-        MCf = 0.05 * (i + j) / (2 * n - 1) + 0.15 * np.sin(2 * np.pi * h / 24) ** 2 + 0.005 * d  # MU/(km*ton)
-        return MCf
+        costs = self.TSN.flight_arc_costs
+        return costs.marginal_cost[flight_arc.index]  # MU/(km*ton)
 
     def Df(self,flight_arc):
-        return self.TSN.data.distance_df.loc[flight_arc.origin_airport,flight_arc.destination_airport] # km
+        costs = self.TSN.flight_arc_costs
+        return costs.distance[flight_arc.index] # km
 
     def add_objective_function(self, display_progress_bars=False):
         # --> Initiating objective function linear expression
         objective_function = gp.LinExpr()
 
+        costs = self.TSN.flight_arc_costs
+        flight_refs = [flight_arc.ref for flight_arc in self.TSN.flight_arc_lst]
+
         # ... per aircraft
-        for k, aircraft in self.TSN.data.aircraft_dict.items():
+        for k_i, k in enumerate(costs.aircraft_refs):
             # ... per flight arc
-            for flight_arc in self.TSN.flight_arc_lst:
-                f = flight_arc.ref
-                Cfk = self.TSN.data.aircraft_dict[k]["operational_cost"] # MU/km
-                Df = self.Df(flight_arc)
+            for f_i, f in enumerate(flight_refs):
+                CfkDf = costs.operational_cost[f_i, k_i] # MU
 
-                objective_function += Cfk*Df*self.decision_variable_dict["x"][f][k] # TODO: check
+                objective_function += CfkDf*self.decision_variable_dict["x"][f][k] # TODO: check
 
         # ... per flight arc
-        for flight_arc in self.TSN.flight_arc_lst:
-            f = flight_arc.ref
-            # ... per request
-            for r, request in self.TSN.data.request_dict.items():
-                MCf = self.MCf(flight_arc) # MU/(km*ton)
-                Df = self.Df(flight_arc)
-                Wr = request["weight"] #ton
+        for f_i, f in enumerate(flight_refs):
+            MCfDf = costs.unit_cost[f_i] # MU/ton
+            # ... per request that can use the flight arc
+            for r, z in self.decision_variable_dict["z"][f].items():
+                Wr = self.TSN.data.request_dict[r]["weight"] #ton
 
-                objective_function += MCf*Df*Wr*self.decision_variable_dict["z"][f][r]
+                objective_function += MCfDf*Wr*z
 
         # ... per request
         for r, request in self.TSN.data.request_dict.items():
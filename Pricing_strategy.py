@@ -0,0 +1,79 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+
+class Pricing_strategy:
+    """
+    Decides which priced columns enter the master and when the column generation has converged.
+        full:    every request is priced, at most columns_per_request columns are added per request
+        partial: requests are priced round robin (continuing where the last round stopped)
+                 until max_columns columns are found
+    Only columns with a reduced cost below -tolerance count as new columns.
+    Column generation has converged once a round has priced every request without finding a column.
+    """
+    def __init__(self, mode="full", columns_per_request=1, max_columns=None, tolerance=1e-6):
+        if mode not in ["full", "partial"]:
+            raise ValueError(f"Unknown pricing strategy mode: {mode}")
+
+        if mode == "partial" and max_columns is None:
+            raise ValueError("Partial pricing requires max_columns")
+
+        self.mode = mode
+        self.columns_per_request = columns_per_request
+        self.max_columns = max_columns
+        self.tolerance = tolerance
+
+        # -> Position in the request list where the next partial pricing round starts
+        self.start = 0
+
+    def request_order(self, requests):
+        """
+        :param requests: list of requests in request_dict order
+        :return: the same list, rotated to the start of this round
+        """
+        if self.mode == "full" or len(requests) == 0:
+            return requests
+
+        start = self.start % len(requests)
+        return requests[start:] + requests[:start]
+
+    def accepted(self, columns):
+        """
+        :param columns: list of (reduced cost, arcs) of a single request
+        :return: the columns entering the master, cheapest first
+        """
+        columns = sorted((column for column in columns if column[0] < -self.tolerance), key=lambda column: column[0])
+        return columns[:self.columns_per_request]
+
+    def round_complete(self, found):
+        """
+        :return: True if no more requests have to be priced this round
+        """
+        return self.mode == "partial" and found >= self.max_columns
+
+    def select(self, priced, request_count):
+        """
+        :param priced: list of (request_id, list of (reduced cost, arcs)), in pricing order
+        :param request_count: number of requests
+        :return: (list of (request_id, reduced cost, arcs), True if every request was priced)
+        """
+        selected = []
+        priced_count = 0
+
+        for r, columns in priced:
+            priced_count += 1
+
+            for reduced_cost, arcs in self.accepted(columns):
+                selected.append((r, reduced_cost, arcs))
+
+            if self.round_complete(len(selected)):
+                break
+
+        if self.mode == "partial":
+            selected = selected[:self.max_columns]
+            self.start += priced_count
+
+        return selected, priced_count == request_count
@@ -0,0 +1,68 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import numpy as np
+import pandas as pd
+
+# -> Times that are a whole number of timesteps up to float error (e.g. 10 min steps) are not rounded to the next step
+STEP_TOLERANCE = 1e-9
+
+
+class Request_table:
+    """
+    Requests stored column wise (one numpy array per field, row i is the i-th request of the input file).
+        release_step = ceil(release time / timestep), clipped to >= 0
+        due_step     = floor(due date / timestep), clipped to <= planning_horizon / timestep
+        origin_index/destination_index: position of airport_O/airport_D in airport_refs
+    to_dict gives the request_dict layout used by the TSN and the models.
+    """
+    def __init__(self, request_input_df, timestep_duration, planning_horizon, airport_refs):
+        """
+        :param timestep_duration: (h)
+        :param planning_horizon: (h)
+        :param airport_refs: airport refs in airport_dict order
+        """
+        self.ids = request_input_df["Request ID"].to_numpy()
+        self.weight = request_input_df["Weight [ton]"].to_numpy(dtype=float)     # TODO: check unit conversion!
+        self.penalty = request_input_df["Penalty [MU/ton]"].to_numpy()           # TODO: check unit conversion!
+        self.airport_O = request_input_df["Origin airport"].to_numpy()
+        self.airport_D = request_input_df["Destination airport"].to_numpy()
+        self.release_time = request_input_df["Release time [minutes]"].to_numpy() # TODO: check unit conversion!
+        self.due_time = request_input_df["Due date [minutes]"].to_numpy()         # TODO: check unit conversion!
+
+        # -> Time in minutes to timesteps, rounded inwards so the request fits its time window
+        last_step = int(round(planning_horizon/timestep_duration))
+        release = np.ceil(self.release_time/60/timestep_duration - STEP_TOLERANCE)
+        due = np.floor(self.due_time/60/timestep_duration + STEP_TOLERANCE)
+        self.release_step = np.maximum(release, 0).astype(np.int64)
+        self.due_step = np.minimum(due, last_step).astype(np.int64)
+
+        airport_refs = pd.Index(list(airport_refs))
+        self.origin_index = airport_refs.get_indexer(self.airport_O)
+        self.destination_index = airport_refs.get_indexer(self.airport_D)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def to_dict(self):
+        """
+        :return: request_dict, {request id: {"weight", "airport_O", "airport_D", "release_time", "release_step",
+                                             "due_time", "due_step", "penalty"}}
+        """
+        columns = zip(self.ids.tolist(), self.weight.tolist(), self.airport_O.tolist(), self.airport_D.tolist(),
+                      self.release_time.tolist(), self.release_step.tolist(),
+                      self.due_time.tolist(), self.due_step.tolist(), self.penalty.tolist())
+
+        return {request_id: {"weight":        weight,
+                             "airport_O":     airport_O,
+                             "airport_D":     airport_D,
+                             "release_time":  release_time,
+                             "release_step":  release_step,
+                             "due_time":      due_time,
+                             "due_step":      due_step,
+                             "penalty":       penalty}
+                for request_id, weight, airport_O, airport_D, release_time, release_step, due_time, due_step, penalty
+                in columns}
@@ -0,0 +1,108 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import numpy as np
+import pandas as pd
+
+from Solver_backend import variable_values
+
+ARC_COLUMNS = ["arc", "arc_type", "origin_timestep", "origin_airport", "destination_timestep", "destination_airport"]
+
+
+def arc_row(arc):
+    return [arc.ref, arc.type, arc.origin_timestep, arc.origin_airport, arc.destination_timestep, arc.destination_airport,
+            arc.index]
+
+
+class Solution:
+    """
+    Solution of a solved Model_3 or CG master as tables, mapped onto the TSN arcs and requests through
+    decision_variable_dict (no variable names are parsed). X is read in a single call.
+        Every row holds the ARC_COLUMNS and arc_index, the position of the arc in TSN.arc_lst
+        aircraft_arcs:  one row per (flight/ground arc, aircraft type) with x/y > 0
+        request_arcs:   one row per (arc, request) carrying flow, NS arcs included (CG paths are expanded to their arcs)
+        unserved:       one row per request (partly) on its NS arc, with the penalty paid
+    """
+    def __init__(self, model, TSN, decision_variable_dict, path_dict=None, tolerance=1e-6):
+        """
+        :param model: solved Gurobi or Solver_backend model (Model_3.model or CG.master)
+        :param decision_variable_dict: z keyed by arc ref (Model_3) or by path ref (CG, requires path_dict)
+        :param path_dict: CG.path_dict
+        """
+        self.TSN = TSN
+        request_dict = TSN.data.request_dict
+        arcs = {arc.ref: arc for arc in TSN.arc_lst}
+
+        # -> Variables with what they represent, in one list
+        variables = []
+        aircraft_keys = []      # (arc, aircraft_ref)
+        request_keys = []       # (list of arcs, request_id)
+
+        for variable_type in ["x", "y"]:
+            for a, variables_a in decision_variable_dict[variable_type].items():
+                for k, variable in variables_a.items():
+                    variables.append(variable)
+                    aircraft_keys.append((arcs[a], k))
+
+        for key, variables_key in decision_variable_dict["z"].items():
+            for r, variable in variables_key.items():
+                if isinstance(variable, int):   # Placeholder, the request can not use this path
+                    continue
+
+                if path_dict is None:
+                    request_keys.append(([arcs[key]], r))
+                else:
+                    request_keys.append((path_dict["request paths"][r][key].arcs, r))
+                variables.append(variable)
+
+        values = variable_values(model, variables) if variables else np.zeros(0)
+        aircraft_values = values[:len(aircraft_keys)]
+        request_values = values[len(aircraft_keys):]
+
+        # -> Aircraft routing
+        rows = []
+        for i in np.flatnonzero(aircraft_values > tolerance):
+            arc, k = aircraft_keys[i]
+            rows.append(arc_row(arc) + [k, aircraft_values[i]])
+        self.aircraft_arcs = pd.DataFrame(rows, columns=ARC_COLUMNS + ["arc_index", "aircraft", "value"])
+
+        # -> Request flows
+        rows = []
+        for i in np.flatnonzero(request_values > tolerance):
+            arc_lst, r = request_keys[i]
+            for arc in arc_lst:
+                rows.append(arc_row(arc) + [r, request_dict[r]["airport_D"], request_dict[r]["weight"], request_values[i]])
+        self.request_arcs = pd.DataFrame(rows, columns=ARC_COLUMNS + ["arc_index", "request", "request_destination",
+                                                           "weight", "value"])
+        self.request_arcs["load"] = self.request_arcs["weight"] * self.request_arcs["value"] # ton
+
+        # -> Unserved requests
+        unserved = self.request_arcs[self.request_arcs["arc_type"] == "NS"]
+        penalty = np.array([request_dict[r]["penalty"] for r in unserved["request"]], dtype=float)
+        self.unserved = pd.DataFrame({"request": unserved["request"].to_numpy(),
+                                      "value": unserved["value"].to_numpy(),
+                                      "penalty": penalty * unserved["load"].to_numpy()}) # MU
+
+    def flight_arcs(self):
+        return self.aircraft_arcs[self.aircraft_arcs["arc_type"] == "Flight"]
+
+    def ground_arcs(self):
+        return self.aircraft_arcs[self.aircraft_arcs["arc_type"] == "Ground"]
+
+    def served_requests(self):
+        """
+        :return: ids of the requests with flow on a non-NS arc
+        """
+        flows = self.request_arcs[self.request_arcs["arc_type"] != "NS"]
+        return flows["request"].unique()
+
+    def arc_loads(self):
+        """
+        :return: weight carried per non-NS arc (ton), without the arcs leaving the destination of the request
+        """
+        flows = self.request_arcs[(self.request_arcs["arc_type"] != "NS") &
+                                  (self.request_arcs["origin_airport"] != self.request_arcs["request_destination"])]
+        return flows.groupby(ARC_COLUMNS, sort=False, as_index=False)["load"].sum()
@@ -1,15 +1,27 @@
 from Model_generator_3 import Model_3
+from Result_extraction import Solution
+from Result_renderer import render_solution, time_ticks
 from matplotlib import pyplot as plt
 import time
 
 class Results():
-    def __init__(self,show=False,save=True,max_time=3600):
+    def __init__(self,show=False,save=True,max_time=3600,renderer="collection",formats=("png",)):
+        '''
+        :param renderer: "collection" draws every plot category as one LineCollection (headless),
+                         "pyplot" draws every arc with plt.plot (needed for show=True)
+        :param formats: files written by the "collection" renderer, any of "png", "svg" and "npz" (raw segments)
+        '''
         self.show = show
         self.save = save
+        self.renderer = renderer
+        self.formats = formats
         start_time = time.time()
         self.model = Model_3(max_time=max_time) # 2 hours
         self.run_time = time.time()-start_time
         print(f"\nruntime: {round(self.run_time,3)} seconds")
+        self.solution = Solution(model=self.model.model,
+                                 TSN=self.model.TSN,
+                                 decision_variable_dict=self.model.decision_variable_dict)
         self.print_stats()
         self.plot_graph()
 
@@ -17,81 +29,62 @@ class Results():
         '''converts the time step into a string with hour and day number for plotting'''
         tmp = []
         for t in timestep:
-            time = t * 4
-            h = int(time % 24)
-            d = int((time - h) / 24 + 1)
+            time = t * self.model.TSN.data.timestep_duration
+            h = time % 24
+            d = int(round((time - h) / 24)) + 1
+            hour = f"{int(h)}h" if h == int(h) else f"{int(h)}h{int(round(h % 1 * 60)):02d}"
             if h != 0:
-                tmp.append(f"{h}h")
+                tmp.append(hour)
             else:
-                tmp.append(f"{h}h\nDay {d}")
+                tmp.append(f"{hour}\nDay {d}")
         return tmp
 
+    def xticks(self):
+        '''timesteps with a tick, at most 25 (every timestep for 4 h timesteps over 96 h)'''
+        data = self.model.TSN.data
+        return time_ticks(data.timestep_count, data.timestep_duration)
+
     def plot_graph(self):
         '''plots and saves the graph that represents the model'''
+        if self.renderer == "collection" and not self.show:
+            if self.save:
+                for file in render_solution(self.solution, "Results_model_3", formats=self.formats, xticks=self.xticks(),
+                                            xtick_labels=self.timestep2day, ns_markersize=3):
+                    print(f"saved figure to '{file}'")
+            return
+
         model = self.model
+        solution = self.solution
+        airport_dict = model.TSN.data.airport_dict
         c_code = {"AC_1": (1, 0, 0),
                   "AC_2": (0, 0, 1)}
-        results = model.model.getVars()
 
         plt.figure(figsize=[11,4])
-        plt.xticks(range(25),self.timestep2day(range(25)))
-        idx2ref = [""] * 6
-        for airport_ref, airport in model.TSN.data.airport_dict.items():
+        plt.xticks(self.xticks(),self.timestep2day(self.xticks()))
+        idx2ref = [""] * len(airport_dict)
+        for airport_ref, airport in airport_dict.items():
             idx2ref[airport["index"] - 1] = airport_ref
-        plt.yticks(range(7)[1:], idx2ref)
-
-        z_dict = {}
-        for r in results:
-            if r.X != 0:
-                if r.varName[0] == "z":
-                    if r.varName[7:9] != "NS":
-                        # print(r.varName[16:],r.X)
-                        varName_list = r.varName[16:].replace(">", '').split('-')
-                        arc_name = varName_list[0] + '-' + varName_list[1] + '->' + varName_list[2] + '-' + varName_list[3]
-                        ID = int(varName_list[-1].replace("#", ''))
-                        # print(arc_name, 'ID:',  ID)
-                        if varName_list[1] == model.TSN.data.request_dict[ID]["airport_D"]:
-                            pass
-                        else:
-                            try:
-                                z_dict[arc_name] += model.TSN.data.request_dict[ID]["weight"]
-                            except:
-                                z_dict[arc_name] = model.TSN.data.request_dict[ID]["weight"]
-                    else:
-                        tmp = r.varName.split(' - ')[1]
-                        varName_list = tmp.replace(">", '').split('-')
-                        # print(tmp)
-                        # print(varName_list)
-                        # arc_name = varName_list[0] + '-' + varName_list[1] + '->' + varName_list[2] + '-' + varName_list[3]
-                        # ID = int(varName_list[-1].replace("#", ''))
-                        # print(varName_list)
-                        # plt.plot(varName_list[0],model.TSN.data.airport_dict[varName_list[1]]["index"], color=(0, 0.8, 0), marker='o',markersize=4)
-                        plt.plot([varName_list[0], varName_list[2]],
-                                 [model.TSN.data.airport_dict[varName_list[1]]["index"],
-                                  model.TSN.data.airport_dict[varName_list[3]]["index"]]
-                                 , color=(0, 0.8, 0), marker='o', markersize=3, linestyle='dashed', linewidth=1, zorder=1)
-
-        for arc_name, weight in z_dict.items():
-            arc_name = arc_name.split("->")
-            t = [0, 0]
-            n = [0, 0]
-            for i in range(2):
-                t[i] = int(arc_name[i].split("-")[0])
-                n[i] = int(model.TSN.data.airport_dict[arc_name[i].split("-")[1]]["index"])
-            plt.plot(t, n, linewidth=weight/10, color=(0.3, 0.3, 0.3), zorder=2)
-
-        for r in results:
-            if r.X != 0:
-                if r.varName[0] in ["x", "y"]:
-                    # print(r.varName,r.X)
-                    arc_name = r.varName[16:].split("->")
-                    t = [0, 0]
-                    n = [0, 0]
-                    plane = arc_name[1].split("-")[-1]
-                    for i in range(2):
-                        t[i] = int(arc_name[i].split("-")[0])
-                        n[i] = int(model.TSN.data.airport_dict[arc_name[i].split("-")[1]]["index"])
-                    plt.plot(t, n, color=c_code[plane], linestyle=":", zorder = 3)
+        plt.yticks(range(len(airport_dict)+1)[1:], idx2ref)
+
+        # -> Requests not handled (NS arcs)
+        ns_arcs = solution.request_arcs[solution.request_arcs["arc_type"] == "NS"]
+        for arc in ns_arcs.itertuples():
+            plt.plot([arc.origin_timestep, arc.destination_timestep],
+                     [airport_dict[arc.origin_airport]["index"], airport_dict[arc.destination_airport]["index"]],
+                     color=(0, 0.8, 0), marker='o', markersize=3, linestyle='dashed', linewidth=1, zorder=1)
+
+        # -> Weight carried per arc
+        for arc in solution.arc_loads().itertuples():
+            t = [arc.origin_timestep, arc.destination_timestep]
+            n = [airport_dict[arc.origin_airport]["index"], airport_dict[arc.destination_airport]["index"]]
+            plt.plot(t, n, linewidth=arc.load/10, color=(0.3, 0.3, 0.3), zorder=2)
+
+        # -> Aircraft routing
+        for arc in solution.aircraft_arcs.itertuples():
+            t = [arc.origin_timestep, arc.destination_timestep]
+            n = [airport_dict[arc.origin_airport]["index"], airport_dict[arc.destination_airport]["index"]]
+            plt.plot(t, n, color=c_code[arc.aircraft], linestyle=":", zorder = 3)
+
         if self.save:
             file_name = "Results_model_3"
             plt.savefig(f"{file_name}.png")
@@ -102,56 +95,37 @@ class Results():
     def print_stats(self):
         '''prints the stats of the model'''
         # =========================================================== Generate data
+        solution = self.solution
+        duration_df = self.model.TSN.data.duration_df
+
         # -> Arc used (non-NS)
-        total_arc_used = 0
-        f_arc_used = 0
-        t_f = 0
-        g_arc_used = 0
+        flight_arcs = solution.flight_arcs()
+        flight_arcs = flight_arcs[flight_arcs["value"].round() == 1]
+        ground_arcs = solution.ground_arcs()
+        ground_arcs = ground_arcs[ground_arcs["value"].round() == 1]
+
+        f_arc_used = len(flight_arcs)
+        g_arc_used = len(ground_arcs)
+        total_arc_used = f_arc_used + g_arc_used
+        t_f = sum(duration_df.loc[o, d] for o, d in zip(flight_arcs["origin_airport"], flight_arcs["destination_airport"]))
+        t_g = ((ground_arcs["destination_timestep"] - ground_arcs["origin_timestep"]).sum()
+               * self.model.TSN.data.timestep_duration)
 
         # -> NS arcs used
-        NS_arc_used = 0
-        # -> Packages handled
-        packages_handled = []
-        packages_not_handled = []
-        packages_not_handled_penalty = 0
-
-        results = self.model.model.getVars()
-
-        for decision_variable in results:
-            if decision_variable.varName[0] in ["x", "y"] and int(decision_variable.x) == 1:
-                total_arc_used += 1
+        unserved = solution.unserved[solution.unserved["value"].round() == 1]
+        NS_arc_used = len(unserved)
 
-                if decision_variable.varName[0] == "x":
-                    f_arc_used += 1
-                    name_list = decision_variable.varName.split('->')
-                    # print(name_list)
-                    t_f += self.model.TSN.data.duration_df.loc[name_list[0][-3:], name_list[1].split('-')[1]]
-                else:
-                    g_arc_used += 1
-
-            if decision_variable.varName[0] == "z" and "NS" not in decision_variable.varName:
-                # print(decision_variable.varName, decision_variable.X)
-                package_id = int(decision_variable.varName.split("#")[-2])
-
-                if package_id not in packages_handled and int(decision_variable.x) == 1:
-                    packages_handled.append(package_id)
-
-            if decision_variable.varName[0] == "z" and "NS" in decision_variable.varName and int(
-                    decision_variable.x) == 1:
-                NS_arc_used += 1
-
-                package_id = int(decision_variable.varName.split("#")[-2])
-                if package_id not in packages_not_handled:
-                    packages_not_handled.append(package_id)
-
-                    request = self.model.TSN.data.request_dict[package_id]
-
-                    packages_not_handled_penalty += request["penalty"] * request["weight"]
+        # -> Packages handled
+        request_arcs = solution.request_arcs
+        handled = request_arcs[(request_arcs["arc_type"] != "NS") & (request_arcs["value"].round() == 1)]
+        packages_handled = handled["request"].unique()
+        packages_not_handled = unserved["request"].unique()
+        packages_not_handled_penalty = unserved["penalty"].sum()
 
         print(f"- Nb. arcs used: {total_arc_used}")
         print(f"   > Flight arcs: {f_arc_used}")
         print(f"   > Ground arcs: {g_arc_used}")
-        print(f"   > Airtime percentage: {round(t_f/(t_f+g_arc_used*4)*100)}%")
+        print(f"   > Airtime percentage: {round(t_f/(t_f+t_g)*100)}%")
 
         print(f"- Nb. NS arcs used: {NS_arc_used}")
         print(f"- Nb. packages handled: {len(packages_handled)}")
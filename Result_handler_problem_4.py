@@ -1,17 +1,30 @@
 from Collum_generation import CG
+from Result_extraction import Solution
+from Result_renderer import render_solution, time_ticks
 from matplotlib import pyplot as plt
 import time
 
 class Results():
-    def __init__(self,show=False,save=True,max_time=3600):
+    def __init__(self,show=False,save=True,max_time=3600,renderer="collection",formats=("png",)):
+        '''
+        :param renderer: "collection" draws every plot category as one LineCollection (headless),
+                         "pyplot" draws every arc with plt.plot (needed for show=True)
+        :param formats: files written by the "collection" renderer, any of "png", "svg" and "npz" (raw segments)
+        '''
         self.show = show
         self.save = save
+        self.renderer = renderer
+        self.formats = formats
 
         start_time = time.time()
         self.model = CG()
         self.run_time = time.time()-start_time
         print(f"\nruntime: {round(self.run_time,3)} seconds")
 
+        self.solution = Solution(model=self.model.master,
+                                 TSN=self.model.TSN,
+                                 decision_variable_dict=self.model.decision_variable_dict,
+                                 path_dict=self.model.path_dict)
         self.print_stats()
         self.plot_graph()
 
@@ -19,68 +32,60 @@ class Results():
         '''converts the time step into a string with hour and day number for plotting'''
         tmp = []
         for t in timestep:
-            time = t * 4
-            h = int(time % 24)
-            d = int((time - h) / 24 + 1)
+            time = t * self.model.TSN.data.timestep_duration
+            h = time % 24
+            d = int(round((time - h) / 24)) + 1
+            hour = f"{int(h)}h" if h == int(h) else f"{int(h)}h{int(round(h % 1 * 60)):02d}"
             if h != 0:
-                tmp.append(f"{h}h")
+                tmp.append(hour)
             else:
-                tmp.append(f"{h}h\nDay {d}")
+                tmp.append(f"{hour}\nDay {d}")
         return tmp
 
+    def xticks(self):
+        '''timesteps with a tick, at most 25 (every timestep for 4 h timesteps over 96 h)'''
+        data = self.model.TSN.data
+        return time_ticks(data.timestep_count, data.timestep_duration)
+
     def plot_graph(self):
         '''plots and saves the graph that represents the model'''
+        if self.renderer == "collection" and not self.show:
+            if self.save:
+                for file in render_solution(self.solution, "Results_model_4", formats=self.formats, xticks=self.xticks(),
+                                            xtick_labels=self.timestep2day, ns_markersize=2):
+                    print(f"saved figure to '{file}'")
+            return
+
+        solution = self.solution
+        airport_dict = self.model.TSN.data.airport_dict
         c_code = {"AC_1": (1, 0, 0),
                   "AC_2": (0, 0, 1)}
-        results = self.model.decision_variable_dict
 
         plt.figure(figsize=[11,4])
-        plt.xticks(range(25),self.timestep2day(range(25)))
-        idx2ref = [""] * 6
-        for airport_ref, airport in self.model.TSN.data.airport_dict.items():
+        plt.xticks(self.xticks(),self.timestep2day(self.xticks()))
+        idx2ref = [""] * len(airport_dict)
+        for airport_ref, airport in airport_dict.items():
             idx2ref[airport["index"] - 1] = airport_ref
-        plt.yticks(range(7)[1:], idx2ref)
-
-        request_plot_dict = {}
-        # for every z_p_r
-        for p, zp in results["z"].items():
-            for r, zpr in zp.items():
-                if type(zpr) != int:
-                    path = self.model.path_dict["request paths"][r][p]
-                    for arc in path.arcs:
-                        a = arc.ref
-                        if arc.type != "NS":
-                            if self.model.TSN.data.request_dict[r]["airport_D"] != arc.origin_airport:
-                                weight = self.model.TSN.data.request_dict[r]["weight"] * zpr.X
-                            else:
-                                weight = 0
-                            try:
-                                request_plot_dict[a] += weight
-                            except:
-                                request_plot_dict[a] = weight
-                            t = [arc.origin_timestep,arc.destination_timestep]
-                            n = [self.model.TSN.data.airport_dict[arc.origin_airport]["index"] , self.model.TSN.data.airport_dict[arc.destination_airport]["index"]]
-                            plt.plot(t, n, linewidth=request_plot_dict[a] / 10, color=(0.3, 0.3, 0.3),zorder = 2)
-                        else:
-                            if zpr.X:
-                                # plt.plot(arc.origin_timestep, self.model.TSN.data.airport_dict[arc.origin_airport]["index"], 'ro')
-                                plt.plot([arc.origin_timestep, arc.destination_timestep],
-                                         [self.model.TSN.data.airport_dict[arc.origin_airport]["index"],
-                                         self.model.TSN.data.airport_dict[arc.destination_airport]["index"]],
-                                         color=(0, 0.8, 0), marker='o',markersize=2, linestyle='dashed', linewidth=1, zorder=1)
-
-        for r in self.model.master.getVars():
-            if r.X != 0:
-                if r.varName[0] in ["x", "y"]:
-                    # print(r.varName,r.X)
-                    arc_name = r.varName[16:].split("->")
-                    t = [0, 0]
-                    n = [0, 0]
-                    plane = arc_name[1].split("-")[-1]
-                    for i in range(2):
-                        t[i] = int(arc_name[i].split("-")[0])
-                        n[i] = int(self.model.TSN.data.airport_dict[arc_name[i].split("-")[1]]["index"])
-                    plt.plot(t, n, color=c_code[plane], linestyle=":",zorder=3)
+        plt.yticks(range(len(airport_dict)+1)[1:], idx2ref)
+
+        # -> Requests not handled (NS arcs)
+        ns_arcs = solution.request_arcs[solution.request_arcs["arc_type"] == "NS"]
+        for arc in ns_arcs.itertuples():
+            plt.plot([arc.origin_timestep, arc.destination_timestep],
+                     [airport_dict[arc.origin_airport]["index"], airport_dict[arc.destination_airport]["index"]],
+                     color=(0, 0.8, 0), marker='o',markersize=2, linestyle='dashed', linewidth=1, zorder=1)
+
+        # -> Weight carried per arc, summed over the paths using it
+        for arc in solution.arc_loads().itertuples():
+            t = [arc.origin_timestep, arc.destination_timestep]
+            n = [airport_dict[arc.origin_airport]["index"], airport_dict[arc.destination_airport]["index"]]
+            plt.plot(t, n, linewidth=arc.load / 10, color=(0.3, 0.3, 0.3),zorder = 2)
+
+        # -> Aircraft routing
+        for arc in solution.aircraft_arcs.itertuples():
+            t = [arc.origin_timestep, arc.destination_timestep]
+            n = [airport_dict[arc.origin_airport]["index"], airport_dict[arc.destination_airport]["index"]]
+            plt.plot(t, n, color=c_code[arc.aircraft], linestyle=":",zorder=3)
 
         if self.save:
             file_name = "Results_model_4"
@@ -92,54 +97,17 @@ class Results():
     def print_stats(self):
         '''prints the stats of the model'''
         # =========================================================== Generate data
-        # -> Arc used (non-NS)
-        total_arc_used = 0
-        f_arc_used = 0
-        g_arc_used = 0
+        solution = self.solution
 
         # -> NS arcs used
-        NS_arc_used = 0
-        # -> Packages handled
-        packages_handled = []
-        packages_not_handled = []
-        packages_not_handled_penalty = 0
-
-        results = self.model.decision_variable_dict
-
-        for p, zp in results["z"].items():
-            for r, zpr in zp.items():
-                if type(zpr) != int:
-                    path = self.model.path_dict["request paths"][r][p]
-
-                    for arc in path.arcs:
-                        if arc.type == "NS":
-                            NS_arc_used += 1 * zpr.X
-
-                        # elif arc.type == "Ground":
-                        #     g_arc_used += 1
-                        #
-                        # elif arc.type == "Flight":
-                        #     f_arc_used += 1
-
-        # ... per request
-        for r, request in self.model.TSN.data.request_dict.items():
-            # ... find Pns
-            for p, path in self.model.path_dict["request paths"][r].items():
-                if path.type == "NS":
-
-                    PCr = request["penalty"]  # MU/ton
-                    Wr = request["weight"] # ton
-                    if type(self.model.decision_variable_dict["z"][p][r]) != int:
-                        packages_not_handled_penalty += PCr * Wr * self.model.decision_variable_dict["z"][p][r].x
-
-        total_arc_used += f_arc_used + g_arc_used
-
-        # print(f"- Nb. arcs used: {total_arc_used}")
-        # print(f"   > Flight arcs: {f_arc_used}")
-        # print(f"   > Ground arcs: {g_arc_used}")
+        NS_arc_used = solution.unserved["value"].sum()
+        request_count = len(self.model.TSN.data.request_dict)
+
+        # -> Packages not handled
+        packages_not_handled_penalty = solution.unserved["penalty"].sum()
 
         print(f"- Nb. NS arcs used: {NS_arc_used}")
-        print(f"- Nb. packages handled: {115-NS_arc_used}")
+        print(f"- Nb. packages handled: {request_count-NS_arc_used}")
         print(f"- Nb. packages not handled: {NS_arc_used}")
         print(f"- Total packages not handled penalty: {packages_not_handled_penalty}")
 
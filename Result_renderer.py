@@ -0,0 +1,123 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+AIRCRAFT_COLORS = {"AC_1": (1, 0, 0),
+                   "AC_2": (0, 0, 1)}
+
+# -> Candidate spacings of the time axis ticks (h)
+TICK_SPACINGS = (0.25, 0.5, 1, 2, 4, 6, 12, 24, 48, 168, 336)
+
+
+def time_ticks(timestep_count, timestep_duration, max_ticks=25):
+    """
+    Timesteps with a tick on the time axis: the smallest spacing of TICK_SPACINGS that is a whole number of timesteps
+    and gives at most max_ticks ticks (every timestep for the 4 h timesteps over 96 h)
+    :return: list of timesteps
+    """
+    for spacing in TICK_SPACINGS:
+        steps = spacing / timestep_duration
+        if steps >= 1 and abs(steps - round(steps)) < 1e-9 and (timestep_count - 1) / round(steps) + 1 <= max_ticks:
+            return list(range(0, timestep_count, int(round(steps))))
+
+    return list(range(0, timestep_count, max(1, -(-timestep_count // max_ticks))))
+
+
+def arc_segments(arcs, airport_dict):
+    """
+    :param arcs: DataFrame with origin/destination timestep and airport columns (see Result_extraction)
+    :return: (arc count, 2, 2) array of ((origin timestep, origin airport index), (destination timestep, ...))
+    """
+    segments = np.zeros((len(arcs), 2, 2))
+    segments[:, 0, 0] = arcs["origin_timestep"].to_numpy()
+    segments[:, 1, 0] = arcs["destination_timestep"].to_numpy()
+    segments[:, 0, 1] = [airport_dict[airport_ref]["index"] for airport_ref in arcs["origin_airport"]]
+    segments[:, 1, 1] = [airport_dict[airport_ref]["index"] for airport_ref in arcs["destination_airport"]]
+    return segments
+
+
+def solution_segments(solution):
+    """
+    Segments of every plot category of a Solution
+    :return: {category: (segments, line widths)}, categories: "NS", "load" and one per aircraft type
+    """
+    airport_dict = solution.TSN.data.airport_dict
+    request_arcs = solution.request_arcs
+
+    ns_arcs = request_arcs[request_arcs["arc_type"] == "NS"]
+    arc_loads = solution.arc_loads()
+
+    categories = {"NS": (arc_segments(ns_arcs, airport_dict), np.ones(len(ns_arcs))),
+                  "load": (arc_segments(arc_loads, airport_dict), arc_loads["load"].to_numpy() / 10)}
+
+    for aircraft_ref, aircraft_arcs in solution.aircraft_arcs.groupby("aircraft", sort=False):
+        categories[aircraft_ref] = (arc_segments(aircraft_arcs, airport_dict), np.ones(len(aircraft_arcs)))
+
+    return categories
+
+
+def render_solution(solution, file_name, formats=("png",), xticks=None, xtick_labels=None, ns_markersize=3,
+                    figsize=(11, 4)):
+    """
+    Draws the solution with one LineCollection per category on the Agg canvas (no pyplot, no display needed).
+        NS arcs: dashed green, load: grey with width = weight / 10, aircraft routing: dotted per aircraft type
+    :param formats: any of "png", "svg" (figure) and "npz" (raw segments and widths per category)
+    :param xticks: timesteps with a tick, default: every timestep
+    :param xtick_labels: function of the timesteps returning their labels, default: the timestep numbers
+    :return: list of the files written
+    """
+    categories = solution_segments(solution)
+    airport_dict = solution.TSN.data.airport_dict
+    timesteps = range(solution.TSN.request_incidence.timestep_count) if xticks is None else xticks
+
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    ax.set_xticks(list(timesteps))
+    ax.set_xticklabels(xtick_labels(timesteps) if xtick_labels is not None else list(timesteps))
+    ax.set_yticks([airport["index"] for airport in airport_dict.values()])
+    ax.set_yticklabels(list(airport_dict.keys()))
+
+    # -> Requests not handled
+    segments, widths = categories["NS"]
+    ax.add_collection(LineCollection(segments, colors=[(0, 0.8, 0)], linewidths=widths, linestyles="dashed", zorder=1))
+    ax.scatter(segments[:, :, 0].ravel(), segments[:, :, 1].ravel(), color=(0, 0.8, 0), s=ns_markersize**2, zorder=1)
+
+    # -> Weight carried per arc
+    segments, widths = categories["load"]
+    ax.add_collection(LineCollection(segments, colors=[(0.3, 0.3, 0.3)], linewidths=widths, zorder=2))
+
+    # -> Aircraft routing
+    for aircraft_ref in solution.TSN.data.aircraft_dict.keys():
+        if aircraft_ref in categories:
+            segments, widths = categories[aircraft_ref]
+            ax.add_collection(LineCollection(segments, colors=[AIRCRAFT_COLORS.get(aircraft_ref, (0, 0, 0))],
+                                             linewidths=widths, linestyles="dotted", zorder=3))
+
+    ax.autoscale_view()
+
+    # -> Export
+    files = []
+    for file_format in formats:
+        path = f"{file_name}.{file_format}"
+
+        if file_format == "npz":
+            arrays = {}
+            for category, (segments, widths) in categories.items():
+                arrays[f"{category}/segments"] = segments
+                arrays[f"{category}/widths"] = widths
+            np.savez(path, **arrays)
+        else:
+            figure.savefig(path, format=file_format)
+
+        files.append(path)
+
+    return files
@@ -0,0 +1,290 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+
+Rolling horizon mode of Model_3: the planning horizon is solved as a sequence of overlapping windows.
+    Every window is a Model_3 on its own Time_space_network (window length / timestep + 1 layers), so the model size
+    and solve time per window do not grow with the planning horizon.
+    Only the decisions of the first commit hours of a window are kept (x/y/z on arcs departing before the commit
+    timestep), the next window starts at the commit timestep:
+        aircraft: the committed arcs crossing the commit timestep give the h boundary terms of the next window
+                  (-aircraft at the node where they arrive), the last window ends at the fleet positions of the data
+        requests: start the next window where their committed arcs end, requests at their destination airport
+                  are delivered, requests on their NS arc are only given up once their due step is committed
+    Requests due after the end of a window have to reach their destination by the end of that window to be
+    served in it, otherwise they stay where they are and are planned again in the next window.
+    Aircraft arriving after the commit timestep of a window (on committed arcs or from an earlier window) keep their
+    arrival node, the fleet per aircraft type is checked after every window.
+    The windows before the last do not see the fleet positions at the end of the horizon, the last window is a full
+    window (also when that overlaps the previous window by more than usual) that has to bring the aircraft back.
+"""
+
+import numpy as np
+import pandas as pd
+
+from Data_processor import Data_processor, shared_data_processor
+from TSN import Time_space_network
+from Model_generator_3 import Model_3
+from Result_extraction import Solution, ARC_COLUMNS
+from Metrics import metrics, model_size, solve_result
+
+
+class Window_data_processor(Data_processor):
+    """
+    Data of one window of the planning horizon: the tables of the full data with the requests of the window,
+    their release/due steps counted from the start of the window (timestep_offset)
+    """
+    def __init__(self, data, start_step, end_step, request_dict):
+        """
+        :param data: Data_processor of the full planning horizon
+        :param request_dict: requests of the window, in the request_dict layout with window timesteps
+        """
+        self.use_cache = data.use_cache
+        self.timestep_duration = data.timestep_duration # hours
+        self.planning_horizon = (end_step - start_step) * data.timestep_duration # hours
+        self.timestep_offset = start_step
+
+        for name in ["airport_dict", "OD_df", "OD_list", "distance_df", "aircraft_dict", "duration_df", "max_arc_time"]:
+            setattr(self, name, getattr(data, name))
+
+        self.request_dict = request_dict
+
+
+class Rolling_horizon:
+    """
+    Solves Model_3 window by window (see module docstring), the committed decisions are collected in
+        aircraft_arcs:  one row per committed (flight/ground arc, aircraft type), timesteps of the full horizon
+        request_arcs:   one row per committed (non-NS arc, request)
+        delivered/unserved: request ids, objective: cost of the committed decisions + penalty of the unserved requests
+    """
+    def __init__(self, window=48, commit=24, max_time=600, data=None, prune_z=True, backend=None, output=False,
+                 solve=True):
+        """
+        :param window: length of a window (h), a whole number of timesteps
+        :param commit: hours of a window that are committed, the next window starts after them
+        :param max_time: time limit per window (s)
+        :param data: Data_processor of the full planning horizon, default: the process-wide shared_data_processor
+        :param backend: None (gurobipy), "gurobi" or "highs", see Model_3
+        :param output: solver console output per window
+        """
+        self.data = shared_data_processor() if data is None else data
+
+        self.window_steps = int(round(window/self.data.timestep_duration))
+        self.commit_steps = int(round(commit/self.data.timestep_duration))
+        if not 0 < self.commit_steps <= self.window_steps:
+            raise ValueError(f"commit ({commit} h) has to be a positive number of timesteps, at most the window ({window} h)")
+
+        self.max_time = max_time
+        self.prune_z = prune_z
+        self.backend = backend
+        self.output = output
+
+        self.aircraft_refs = list(self.data.aircraft_dict.keys())
+        self.airport_refs = list(self.data.airport_dict.keys())
+        self.last_step = self.data.timestep_count - 1
+
+        # -> Aircraft per (arrival timestep, airport, aircraft type) at or after the start of the next window
+        self.aircraft_position = {(0, airport_ref, k): airport["aircrafts"][k]
+                                  for airport_ref, airport in self.data.airport_dict.items()
+                                  for k in self.aircraft_refs if airport["aircrafts"][k] > 0}
+
+        # -> (timestep, airport) of every open request
+        self.request_position = {r: (request["release_step"], request["airport_O"])
+                                 for r, request in self.data.request_dict.items()}
+
+        self.delivered = []
+        self.unserved = []
+        self.aircraft_arcs = []
+        self.request_arcs = []
+        self.windows = []
+        self.objective = 0
+
+        if solve:
+            self.run()
+
+    def run(self):
+        start = 0
+        with metrics.phase("Rolling_horizon") as phase:
+            while True:
+                end = min(start + self.window_steps, self.last_step)
+
+                # ... the last window is a full window, it also has to bring the aircraft back to the fleet positions
+                commit = end if end == self.last_step else min(start + self.commit_steps, self.last_step - self.window_steps)
+
+                self.solve_window(start, commit, end)
+
+                if end == self.last_step:
+                    break
+                start = commit
+
+            # -> Requests that never fitted in a window (e.g. release step == due step)
+            for r in list(self.request_position.keys()):
+                self.close_request(r, delivered=False)
+
+            self.aircraft_arcs = pd.concat(self.aircraft_arcs, ignore_index=True)
+            self.request_arcs = pd.concat(self.request_arcs, ignore_index=True) if self.request_arcs else \
+                pd.DataFrame(columns=ARC_COLUMNS + ["request", "weight"])
+
+            phase.count(windows=len(self.windows), objective=self.objective,
+                        delivered=len(self.delivered), unserved=len(self.unserved))
+
+        return self.objective
+
+    def window_requests(self, start, end):
+        """
+        :return: request_dict of the window, release/due steps counted from start (due clipped to the window end)
+        """
+        request_dict = {}
+        for r, (step, airport_ref) in list(self.request_position.items()):
+            request = self.data.request_dict[r]
+            step = max(step, start)
+
+            if step >= request["due_step"]:
+                self.close_request(r, delivered=False)
+
+            elif step < end:
+                request_dict[r] = dict(request,
+                                       airport_O=airport_ref,
+                                       release_step=step - start,
+                                       due_step=min(request["due_step"], end) - start)
+        return request_dict
+
+    def window_boundary(self, TSN, start, last_window):
+        """
+        :return: h per (node id, aircraft type) of the window: -aircraft where they arrive, +fleet at the end of the
+                 last window
+        """
+        incidence = TSN.request_incidence
+        h = np.zeros((incidence.timestep_count * len(self.airport_refs), len(self.aircraft_refs)))
+
+        for (step, airport_ref, k), count in self.aircraft_position.items():
+            h[incidence.node_id(step - start, airport_ref), self.aircraft_refs.index(k)] -= count
+
+        if last_window:
+            for airport_ref, airport in self.data.airport_dict.items():
+                for k_i, k in enumerate(self.aircraft_refs):
+                    h[incidence.node_id(incidence.timestep_count - 1, airport_ref), k_i] += airport["aircrafts"][k]
+        return h
+
+    def solve_window(self, start, commit, end):
+        last_window = end == self.last_step
+
+        with metrics.phase("Rolling_horizon window", start=start, commit=commit, end=end) as phase:
+            # -> Window network and model
+            request_dict = self.window_requests(start, end)
+            TSN = Time_space_network(data=Window_data_processor(self.data, start, end, request_dict))
+
+            model = Model_3(max_time=self.max_time, prune_z=self.prune_z, TSN=TSN, solve=False, backend=self.backend,
+                            aircraft_boundary=self.window_boundary(TSN, start, last_window),
+                            free_end=not last_window)
+
+            if self.backend is None:
+                model.model.setParam("OutputFlag", int(self.output))
+            else:
+                model.model.set_output(self.output)
+
+            # -> Solve
+            model.model.optimize()
+            result = solve_result(model.model)
+            if result.get("objective") is None:
+                reason = ", the last window may be too short to bring the aircraft back to the fleet positions" \
+                    if last_window else ""
+                raise RuntimeError(f"No solution for the window {start}-{end} (status: {result['status']}){reason}")
+
+            solution = Solution(model.model, TSN, model.decision_variable_dict)
+            cost = self.commit_window(TSN, solution, start, commit)
+
+            window = dict(start=start, commit=commit, end=end, requests=len(request_dict), committed_cost=cost,
+                          window_objective=result["objective"], status=result["status"], **model_size(model.model))
+            self.windows.append(window)
+            phase.count(**window)
+
+    def commit_window(self, TSN, solution, start, commit):
+        """
+        Keeps the decisions on the arcs departing before commit and moves the aircraft and requests forward
+        :return: cost of the committed decisions (MU)
+        """
+        costs = TSN.flight_arc_costs
+        cost = 0
+
+        # -> Aircraft arcs, timesteps of the full horizon
+        aircraft_arcs = solution.aircraft_arcs.copy()
+        aircraft_arcs["value"] = aircraft_arcs["value"].round()
+        aircraft_arcs[["origin_timestep", "destination_timestep"]] += start
+        aircraft_arcs = aircraft_arcs[(aircraft_arcs["origin_timestep"] < commit) & (aircraft_arcs["value"] > 0)]
+
+        # ... aircraft entering the window at or after commit are not moved by the committed arcs
+        self.aircraft_position = {key: count for key, count in self.aircraft_position.items() if key[0] >= commit}
+        for arc in aircraft_arcs.itertuples():
+            if arc.arc_type == "Flight":
+                cost += costs.operational_cost[arc.arc_index, self.aircraft_refs.index(arc.aircraft)] * arc.value
+
+            if arc.destination_timestep >= commit:
+                key = (arc.destination_timestep, arc.destination_airport, arc.aircraft)
+                self.aircraft_position[key] = self.aircraft_position.get(key, 0) + int(arc.value)
+
+        self.check_fleet(commit)
+
+        # -> Request arcs
+        request_arcs = solution.request_arcs.copy()
+        request_arcs = request_arcs[request_arcs["value"] > 0.5]
+        request_arcs[["origin_timestep", "destination_timestep"]] += start
+
+        for r, arcs in request_arcs.groupby("request", sort=False):
+            if (arcs["arc_type"] == "NS").any():
+                # ... given up once the due step is committed, otherwise planned again in the next window
+                if self.data.request_dict[r]["due_step"] <= commit:
+                    self.close_request(r, delivered=False)
+                continue
+
+            arcs = arcs[arcs["origin_timestep"] < commit].sort_values("origin_timestep")
+            if arcs.empty:
+                continue
+
+            for arc in arcs[arcs["arc_type"] == "Flight"].itertuples():
+                cost += costs.unit_cost[arc.arc_index] * arc.weight
+
+            last_arc = arcs.iloc[-1]
+            self.request_position[r] = (last_arc["destination_timestep"], last_arc["destination_airport"])
+            self.request_arcs.append(arcs[ARC_COLUMNS + ["request", "weight"]])
+
+            if last_arc["destination_airport"] == self.data.request_dict[r]["airport_D"]:
+                self.close_request(r, delivered=True)
+
+        self.aircraft_arcs.append(aircraft_arcs[ARC_COLUMNS + ["aircraft", "value"]])
+        self.objective += cost
+        return cost
+
+    def check_fleet(self, commit):
+        """
+        Every aircraft of the fleet has to be on a committed arc crossing commit or enter a later window
+        """
+        for k in self.aircraft_refs:
+            fleet = sum(airport["aircrafts"][k] for airport in self.data.airport_dict.values())
+            count = sum(c for (_, _, aircraft), c in self.aircraft_position.items() if aircraft == k)
+            if count != fleet:
+                raise RuntimeError(f"Fleet of {k} not conserved at the commit step {commit}: "
+                                   f"{count} aircraft carried forward, {fleet} in the fleet")
+
+    def close_request(self, r, delivered):
+        del self.request_position[r]
+
+        if delivered:
+            self.delivered.append(r)
+        else:
+            request = self.data.request_dict[r]
+            self.unserved.append(r)
+            self.objective += request["penalty"] * request["weight"]
+
+
+if __name__ == "__main__":
+    rolling_horizon = Rolling_horizon(window=48, commit=24)
+
+    for window in rolling_horizon.windows:
+        print(f"- Window {window['start']}-{window['end']} (commit {window['commit']}): "
+              f"{window['variables']} variables, committed cost {round(window['committed_cost'])}")
+
+    print(f"\nObjective: {round(rolling_horizon.objective)}")
+    print(f"- Nb. packages handled: {len(rolling_horizon.delivered)}")
+    print(f"- Nb. packages not handled: {len(rolling_horizon.unserved)}")
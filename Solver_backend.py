@@ -0,0 +1,421 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+try:
+    import gurobipy as gp
+    from gurobipy import GRB
+except ImportError:
+    gp = None
+
+try:
+    import highspy
+except ImportError:
+    highspy = None
+
+BACKENDS = ("gurobi", "highs")
+
+
+def create_model(backend, name=""):
+    """
+    :param backend: "gurobi" or "highs"
+    :return: empty Linear_model of the backend (minimisation)
+    """
+    if backend == "gurobi":
+        return Gurobi_model(name)
+    elif backend == "highs":
+        return Highs_model(name)
+
+    raise ValueError(f"Unknown solver backend '{backend}', choose from {BACKENDS}")
+
+
+class Variable:
+    """
+    Handle of one column of a Linear_model, with the X/index/VarName attributes of a Gurobi Var
+    """
+    def __init__(self, model, index, name):
+        self.model = model
+        self.index = index
+        self.VarName = name
+
+    def __repr__(self):
+        return f"<Variable {self.VarName}>"
+
+    @property
+    def X(self):
+        return self.model.values()[self.index]
+
+
+def variable_values(model, variables):
+    """
+    :param model: Gurobi model or Linear_model
+    :param variables: Gurobi Vars or Variables of model
+    :return: solution value per variable
+    """
+    if isinstance(model, Linear_model):
+        return model.values()[[variable.index for variable in variables]]
+    return np.array(model.getAttr("X", variables))
+
+
+class Linear_model:
+    """
+    LP/MIP in matrix form, built column block and row block at a time from numpy/scipy arrays.
+        columns: obj, lb, ub, integer;  rows: A x (sense) rhs, sense "<", ">" or "="
+    Columns and rows are numbered in the order they are added, values() and duals() follow that order.
+    Integer columns can be relaxed and restored (set_integrality), e.g. to solve the LP relaxation of the
+    column generation master on the same model and keep its basis while columns are added.
+    """
+    def __init__(self, name=""):
+        self.name = name
+        self.column_names = []
+        self.row_names = []
+        self.integer = np.zeros(0, dtype=bool)
+        self.relaxed = False    # Integer columns solved as continuous (set_integrality)
+
+    @property
+    def column_count(self):
+        return len(self.column_names)
+
+    @property
+    def row_count(self):
+        return len(self.row_names)
+
+    def add_variables(self, obj, lb=0, ub=np.inf, integer=False, names=None):
+        """
+        :return: Variable per new column
+        """
+        count = len(obj)
+        obj = np.asarray(obj, dtype=float)
+        lb = np.broadcast_to(np.asarray(lb, dtype=float), count)
+        ub = np.broadcast_to(np.asarray(ub, dtype=float), count)
+        integer = np.broadcast_to(np.asarray(integer, dtype=bool), count)
+
+        if names is None:
+            names = [f"C{self.column_count + i}" for i in range(count)]
+
+        start = self.column_count
+        self._add_variables(obj, lb, ub, integer, list(names))
+
+        self.column_names += list(names)
+        self.integer = np.concatenate((self.integer, integer))
+        return [Variable(self, start + i, name) for i, name in enumerate(names)]
+
+    def add_constraints(self, A, sense, rhs, names=None):
+        """
+        :param A: sparse matrix over the columns added so far (fewer columns are padded with zeros)
+        :return: row indices of the new constraints
+        """
+        A = sp.csr_matrix(A)
+        A.resize((A.shape[0], self.column_count))
+        rhs = np.broadcast_to(np.asarray(rhs, dtype=float), A.shape[0])
+
+        if names is None:
+            names = [f"R{self.row_count + i}" for i in range(A.shape[0])]
+
+        start = self.row_count
+        self._add_constraints(A, sense, rhs, list(names))
+
+        self.row_names += list(names)
+        return np.arange(start, self.row_count)
+
+    def add_column(self, obj, rows, coefficients, lb=0, ub=np.inf, integer=False, name=None):
+        """
+        Adds a variable with its coefficients in existing rows
+        :return: Variable of the new column
+        """
+        if name is None:
+            name = f"C{self.column_count}"
+
+        self._add_column(float(obj), np.asarray(rows, dtype=np.int32), np.asarray(coefficients, dtype=float),
+                         float(lb), float(ub), bool(integer), name)
+
+        self.column_names.append(name)
+        self.integer = np.append(self.integer, integer)
+        return Variable(self, self.column_count - 1, name)
+
+    def size(self):
+        return {"variables": self.column_count, "constraints": self.row_count, "nonzeros": self.nonzeros()}
+
+    def set_bounds(self, columns, lb, ub):
+        """
+        :param columns: column indices
+        :param lb: lower bound per column (or one for all), ub: upper bound per column (or one for all)
+        """
+        columns = np.asarray(columns, dtype=np.int32)
+        self._set_bounds(columns,
+                         np.broadcast_to(np.asarray(lb, dtype=float), len(columns)),
+                         np.broadcast_to(np.asarray(ub, dtype=float), len(columns)))
+
+    # ============================================================================= Backend
+    def _add_variables(self, obj, lb, ub, integer, names):
+        raise NotImplementedError
+
+    def _add_constraints(self, A, sense, rhs, names):
+        raise NotImplementedError
+
+    def _add_column(self, obj, rows, coefficients, lb, ub, integer, name):
+        raise NotImplementedError
+
+    def nonzeros(self):
+        raise NotImplementedError
+
+    def _set_bounds(self, columns, lb, ub):
+        raise NotImplementedError
+
+    def set_integrality(self, integer):
+        """
+        :param integer: False solves the integer columns as continuous, True restores them
+        """
+        self.relaxed = not integer
+        self._set_integrality(integer)
+
+    def _set_integrality(self, integer):
+        raise NotImplementedError
+
+    def set_time_limit(self, seconds):
+        raise NotImplementedError
+
+    def get_time_limit(self):
+        raise NotImplementedError
+
+    def set_output(self, output):
+        raise NotImplementedError
+
+    def get_output(self):
+        raise NotImplementedError
+
+    def set_start(self, values):
+        """
+        MIP start, one value per column
+        """
+        raise NotImplementedError
+
+    def optimize(self):
+        raise NotImplementedError
+
+    def result(self):
+        """
+        :return: {"status": "optimal", "time_limit", "infeasible", "unbounded" or "other",
+                  "objective" (None without solution), "bound", "gap", "iterations", "nodes"}
+        """
+        raise NotImplementedError
+
+    def values(self):
+        raise NotImplementedError
+
+    def duals(self):
+        """
+        :return: dual value per row of the last LP solve, with the sign convention of Gurobi's Pi
+        """
+        raise NotImplementedError
+
+    def write(self, file_name):
+        raise NotImplementedError
+
+
+class Gurobi_model(Linear_model):
+    STATUS = {} if gp is None else {GRB.OPTIMAL: "optimal",
+                                    GRB.TIME_LIMIT: "time_limit",
+                                    GRB.INFEASIBLE: "infeasible",
+                                    GRB.INF_OR_UNBD: "unbounded",
+                                    GRB.UNBOUNDED: "unbounded"}
+
+    def __init__(self, name=""):
+        if gp is None:
+            raise ImportError("The gurobi backend requires gurobipy")
+
+        super().__init__(name)
+        self.model = gp.Model(name)
+        self.model.ModelSense = GRB.MINIMIZE
+        self.variables = []
+        self.constraints = []
+
+    def _add_variables(self, obj, lb, ub, integer, names):
+        x = self.model.addMVar(len(obj), lb=lb, ub=ub, obj=obj, vtype=np.where(integer, GRB.INTEGER, GRB.CONTINUOUS))
+        self.model.update()
+        self.model.setAttr("VarName", x.tolist(), names)
+        self.variables += x.tolist()
+
+    def _add_constraints(self, A, sense, rhs, names):
+        constraints = self.model.addMConstr(A, gp.MVar.fromlist(self.variables), sense, rhs)
+        self.model.update()
+        self.model.setAttr("ConstrName", constraints.tolist(), names)
+        self.constraints += constraints.tolist()
+
+    def _add_column(self, obj, rows, coefficients, lb, ub, integer, name):
+        self.variables.append(self.model.addVar(lb=lb, ub=ub, obj=obj,
+                                                vtype=GRB.INTEGER if integer and not self.relaxed else GRB.CONTINUOUS,
+                                                name=name,
+                                                column=gp.Column(coefficients, [self.constraints[i] for i in rows])))
+
+    def nonzeros(self):
+        self.model.update()
+        return self.model.NumNZs
+
+    def _set_bounds(self, columns, lb, ub):
+        variables = [self.variables[i] for i in columns]
+        self.model.setAttr("LB", variables, lb.tolist())
+        self.model.setAttr("UB", variables, ub.tolist())
+
+    def _set_integrality(self, integer):
+        integer_variables = [self.variables[i] for i in np.flatnonzero(self.integer)]
+        self.model.setAttr("VType", integer_variables, [GRB.INTEGER if integer else GRB.CONTINUOUS] * len(integer_variables))
+
+    def set_time_limit(self, seconds):
+        self.model.setParam("TimeLimit", seconds)
+
+    def get_time_limit(self):
+        return self.model.Params.TimeLimit
+
+    def set_output(self, output):
+        self.model.setParam("OutputFlag", int(output))
+
+    def get_output(self):
+        return bool(self.model.Params.OutputFlag)
+
+    def set_start(self, values):
+        self.model.update()
+        self.model.setAttr("Start", self.variables, list(values))
+
+    def optimize(self):
+        self.model.optimize()
+
+    def result(self):
+        model = self.model
+        result = {"status": self.STATUS.get(model.Status, "other"),
+                  "objective": model.ObjVal if model.SolCount > 0 else None,
+                  "iterations": int(model.IterCount)}
+
+        if model.IsMIP:
+            result["nodes"] = int(model.NodeCount)
+            result["bound"] = model.ObjBound
+            result["gap"] = model.MIPGap if model.SolCount > 0 else None
+        return result
+
+    def values(self):
+        return np.array(self.model.getAttr("X", self.variables))
+
+    def duals(self):
+        return np.array(self.model.getAttr("Pi", self.constraints))
+
+    def write(self, file_name):
+        self.model.write(file_name)
+
+
+class Highs_model(Linear_model):
+    STATUS = {} if highspy is None else {highspy.HighsModelStatus.kOptimal: "optimal",
+                                         highspy.HighsModelStatus.kTimeLimit: "time_limit",
+                                         highspy.HighsModelStatus.kInfeasible: "infeasible",
+                                         highspy.HighsModelStatus.kUnbounded: "unbounded",
+                                         highspy.HighsModelStatus.kUnboundedOrInfeasible: "unbounded"}
+
+    def __init__(self, name=""):
+        if highspy is None:
+            raise ImportError("The highs backend requires highspy")
+
+        super().__init__(name)
+        self.model = highspy.Highs()
+        self.nonzero_count = 0
+        self.time_limit = np.inf
+        self.output = True
+
+    def _add_variables(self, obj, lb, ub, integer, names):
+        start = self.column_count
+        count = len(obj)
+
+        self.model.addCols(count, obj, lb, ub, 0, np.zeros(count, dtype=np.int32),
+                           np.zeros(0, dtype=np.int32), np.zeros(0))
+        self.set_column_integrality(start + np.flatnonzero(integer), True)
+
+        for i, name in enumerate(names):
+            self.model.passColName(start + i, name)
+
+    def _add_constraints(self, A, sense, rhs, names):
+        lower = np.full(A.shape[0], -np.inf) if sense == "<" else rhs
+        upper = np.full(A.shape[0], np.inf) if sense == ">" else rhs
+
+        self.model.addRows(A.shape[0], lower, upper, A.nnz,
+                           A.indptr[:-1].astype(np.int32), A.indices.astype(np.int32), A.data.astype(float))
+        self.nonzero_count += A.nnz
+
+        start = self.row_count
+        for i, name in enumerate(names):
+            self.model.passRowName(start + i, name)
+
+    def _add_column(self, obj, rows, coefficients, lb, ub, integer, name):
+        self.model.addCol(obj, lb, ub, len(rows), rows, coefficients)
+        self.nonzero_count += len(rows)
+
+        column = self.column_count
+        if integer and not self.relaxed:
+            self.set_column_integrality(np.array([column]), True)
+        self.model.passColName(column, name)
+
+    def set_column_integrality(self, columns, integer):
+        if len(columns) == 0:
+            return
+
+        integrality = highspy.HighsVarType.kInteger if integer else highspy.HighsVarType.kContinuous
+        self.model.changeColsIntegrality(len(columns), columns.astype(np.int32),
+                                         np.full(len(columns), int(integrality), dtype=np.uint8))
+
+    def nonzeros(self):
+        return self.nonzero_count
+
+    def _set_bounds(self, columns, lb, ub):
+        if len(columns) > 0:
+            self.model.changeColsBounds(len(columns), columns, lb, ub)
+
+    def _set_integrality(self, integer):
+        self.set_column_integrality(np.flatnonzero(self.integer), integer)
+
+    def set_time_limit(self, seconds):
+        self.time_limit = float(seconds)
+
+    def get_time_limit(self):
+        return self.time_limit
+
+    def set_output(self, output):
+        self.output = bool(output)
+        self.model.setOptionValue("output_flag", self.output)
+
+    def get_output(self):
+        return self.output
+
+    def set_start(self, values):
+        solution = highspy.HighsSolution()
+        solution.col_value = list(values)
+        self.model.setSolution(solution)
+
+    def optimize(self):
+        # -> HiGHS compares its time_limit with the run time summed over every run, the limit applies per optimize
+        self.model.setOptionValue("time_limit", self.model.getRunTime() + self.time_limit)
+        self.model.run()
+
+    def result(self):
+        info = self.model.getInfo()
+        has_solution = info.primal_solution_status == 2     # Feasible
+
+        result = {"status": self.STATUS.get(self.model.getModelStatus(), "other"),
+                  "objective": info.objective_function_value if has_solution else None,
+                  "iterations": info.simplex_iteration_count}
+
+        if self.integer.any() and not self.relaxed:
+            result["nodes"] = info.mip_node_count
+            result["bound"] = info.mip_dual_bound
+            result["gap"] = info.mip_gap if has_solution else None
+        return result
+
+    def values(self):
+        return np.array(self.model.getSolution().col_value)
+
+    def duals(self):
+        return np.array(self.model.getSolution().row_dual)
+
+    def write(self, file_name):
+        self.model.writeModel(file_name)
@@ -1,21 +1,265 @@
-from Data_processor import Data_processor
+from collections.abc import Mapping
+from time import time as current_time
+
+import numpy as np
+
+from Data_processor import shared_data_processor
+from Metrics import metrics
+
+
+def flight_arc_steps(data):
+    """
+    Duration in timesteps of every viable OD pair, read once from duration_df
+    :return: list of (airport_o_ref, airport_d_ref, steps)
+    """
+    steps_lst = []
+    for airport_o_ref, airport_d_ref in dict.fromkeys(data.OD_list):
+        steps = int(round(data.duration_df.loc[airport_o_ref, airport_d_ref]/data.timestep_duration))
+        if steps > 0:
+            steps_lst.append((airport_o_ref, airport_d_ref, steps))
+    return steps_lst
+
+
+class Request_incidence:
+    """
+    Sparse request boundary values v, keyed by (release_step, airport_O) and (due_step, airport_D).
+    Only the non-zero entries are stored, every other (node, request) pair is 0.
+        Node id (used by rhs) = timestep * airport_count + airport index (in airport_dict order)
+    """
+    def __init__(self, request_dict, airport_refs, timestep_count):
+        self.request_dict = request_dict
+        self.airport_index = {airport_ref: i for i, airport_ref in enumerate(airport_refs)}
+        self.timestep_count = timestep_count
+
+        self.entries = {}
+        for r, request in request_dict.items():
+            origin = (int(request["release_step"]), request["airport_O"])
+            destination = (int(request["due_step"]), request["airport_D"])
+
+            # -> Origin takes precedence if both fall on the same node
+            self.entries.setdefault(origin, {})[r] = -1
+            self.entries.setdefault(destination, {}).setdefault(r, 1)
+
+    def get(self, timestep, airport_ref, request_id):
+        return self.entries.get((timestep, airport_ref), {}).get(request_id, 0)
+
+    def node_v(self, timestep, airport_ref):
+        return Node_v(self.entries.get((timestep, airport_ref), {}), self.request_dict)
+
+    def node_id(self, timestep, airport_ref):
+        return int(timestep) * len(self.airport_index) + self.airport_index[airport_ref]
+
+    def rhs(self, request_id):
+        """
+        :return: v of every node for one request, as an array indexed by node id
+        """
+        request = self.request_dict[request_id]
+
+        v = np.zeros(self.timestep_count * len(self.airport_index))
+        v[self.node_id(request["due_step"], request["airport_D"])] = 1
+        v[self.node_id(request["release_step"], request["airport_O"])] = -1
+        return v
+
+
+def arc_node_ids(TSN):
+    """
+    :param TSN: Time_space_network or Compact_time_space_network
+    :return: (origin node ids, destination node ids) of TSN.arc_lst_no_ns, as arrays
+    """
+    if hasattr(TSN, "arc_origin"):
+        arc_count = TSN.flight_count + TSN.ground_count
+        return TSN.arc_origin[:arc_count].astype(np.int64), TSN.arc_destination[:arc_count].astype(np.int64)
+
+    incidence = TSN.request_incidence
+    arcs = TSN.arc_lst_no_ns
+
+    arc_origin = np.array([incidence.node_id(arc.origin_timestep, arc.origin_airport) for arc in arcs], dtype=np.int64)
+    arc_destination = np.array([incidence.node_id(arc.destination_timestep, arc.destination_airport) for arc in arcs],
+                               dtype=np.int64)
+    return arc_origin, arc_destination
+
+
+def group_by_timestep(arc_timestep, timestep_count):
+    """
+    :return: (arc ids sorted by timestep, indptr), the arcs of timestep t are order[indptr[t]:indptr[t+1]]
+    """
+    order = np.argsort(arc_timestep, kind="stable")
+    indptr = np.zeros(timestep_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(arc_timestep, minlength=timestep_count), out=indptr[1:])
+    return order, indptr
+
+
+def reachable_request_arcs(TSN):
+    """
+    Non-NS arcs that lie on at least one path from the origin to the destination node of a request.
+        Forward: the arc origin is reachable from (release_step, airport_O)
+        Backward: (due_step, airport_D) is reachable from the arc destination
+    Every non-NS arc goes forward in time, so per request both passes are a single sweep over the timesteps of its
+    time window, with the arcs grouped per timestep once. Only the node masks of one request are held at a time and
+    only the reachable pairs are kept.
+    :return: (arc ids in TSN.arc_lst_no_ns, request indices in request_dict order) of the reachable pairs,
+             sorted by arc then request
+    """
+    incidence = TSN.request_incidence
+    requests = list(incidence.request_dict.values())
+    airport_count = len(incidence.airport_index)
+    node_count = incidence.timestep_count * airport_count
+
+    arc_origin, arc_destination = arc_node_ids(TSN)
+    arc_origin_timestep = arc_origin // airport_count
+    arc_destination_timestep = arc_destination // airport_count
+
+    origin_order, origin_indptr = group_by_timestep(arc_origin_timestep, incidence.timestep_count)
+    destination_order, destination_indptr = group_by_timestep(arc_destination_timestep, incidence.timestep_count)
+
+    forward = np.zeros(node_count, dtype=bool)
+    backward = np.zeros(node_count, dtype=bool)
+    pair_arcs = []
+    pair_requests = []
+
+    # ... per request
+    for j, request in enumerate(requests):
+        release_step = int(request["release_step"])
+        due_step = int(request["due_step"])
+        if due_step <= release_step:
+            continue
+
+        forward[:] = False
+        backward[:] = False
+        forward[incidence.node_id(release_step, request["airport_O"])] = True
+        backward[incidence.node_id(due_step, request["airport_D"])] = True
+
+        # ... per timestep, forward in time
+        for t in range(release_step, due_step):
+            arc_ids = origin_order[origin_indptr[t]:origin_indptr[t+1]]
+            forward[arc_destination[arc_ids[forward[arc_origin[arc_ids]]]]] = True
+
+        # ... per timestep, backward in time
+        for t in range(due_step, release_step, -1):
+            arc_ids = destination_order[destination_indptr[t]:destination_indptr[t+1]]
+            backward[arc_origin[arc_ids[backward[arc_destination[arc_ids]]]]] = True
+
+        # -> Arcs departing in the time window with both ends on a path
+        arc_ids = origin_order[origin_indptr[release_step]:origin_indptr[due_step]]
+        arc_ids = arc_ids[forward[arc_origin[arc_ids]] & backward[arc_destination[arc_ids]]]
+        pair_arcs.append(arc_ids)
+        pair_requests.append(np.full(len(arc_ids), j, dtype=np.int64))
+
+    if not pair_arcs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    pair_arcs = np.concatenate(pair_arcs).astype(np.int64)
+    pair_requests = np.concatenate(pair_requests)
+    order = np.lexsort((pair_requests, pair_arcs))
+    return pair_arcs[order], pair_requests[order]
+
+
+class Flight_arc_costs:
+    """
+    Cost vectors of the flight arcs in TSN.flight_arc_lst order, computed once when the TSN is built.
+    Flight arcs come first in TSN.arc_lst, so the position of a flight arc in the vectors is arc.index.
+        distance:           Df (km)
+        marginal_cost:      MCf (MU/(km*ton))
+        unit_cost:          MCf*Df (MU/ton)
+        operational_cost:   Ck*Df per flight arc and aircraft type, in aircraft_dict order (MU)
+    """
+    def __init__(self, TSN):
+        data = TSN.data
+        airport_refs = list(TSN.request_incidence.airport_index.keys())
+        airport_count = len(airport_refs)
+
+        flight_count = TSN.flight_count if hasattr(TSN, "flight_count") else len(TSN.flight_arc_lst)
+        arc_origin, arc_destination = arc_node_ids(TSN)
+        origin_airport = arc_origin[:flight_count] % airport_count
+        destination_airport = arc_destination[:flight_count] % airport_count
+        origin_timestep = arc_origin[:flight_count] // airport_count + data.timestep_offset
+
+        # -> Df
+        distance_matrix = data.distance_df.loc[airport_refs, airport_refs].to_numpy(dtype=float)
+        self.distance = distance_matrix[origin_airport, destination_airport] # km
+
+        # -> MCf, same formula as the assignment (i, j: airport index, h: hour of the day, d: day)
+        #    The hour and day are taken in the full planning horizon, also in a window of Rolling_horizon
+        airport_number = np.array([data.airport_dict[airport_ref]["index"] for airport_ref in airport_refs])
+        i = airport_number[origin_airport]
+        j = airport_number[destination_airport]
+        depart_time = origin_timestep * data.timestep_duration
+        h = depart_time % 24
+        d = (depart_time - h) / 24 + 1
+
+        self.marginal_cost = 0.05 * (i + j) / (2 * airport_count - 1) + 0.15 * np.sin(2 * np.pi * h / 24) ** 2 + 0.005 * d # MU/(km*ton)
+        self.unit_cost = self.marginal_cost * self.distance # MU/ton
+
+        # -> Ck*Df
+        self.aircraft_refs = list(data.aircraft_dict.keys())
+        operational_cost = np.array([data.aircraft_dict[k]["operational_cost"] for k in self.aircraft_refs], dtype=float)
+        self.operational_cost = np.outer(self.distance, operational_cost) # MU
+
+
+class Node_v(Mapping):
+    """Read-only request boundary values of a single node, requests without an entry are 0"""
+    __slots__ = ("entries", "request_dict")
+
+    def __init__(self, entries, request_dict):
+        self.entries = entries
+        self.request_dict = request_dict
+
+    def __getitem__(self, request_id):
+        return self.entries.get(request_id, 0)
+
+    def __iter__(self):
+        return iter(self.request_dict)
+
+    def __len__(self):
+        return len(self.request_dict)
 
 
 class Time_space_network:
-    def __init__(self):
+    def __init__(self, arc_builder="projection", data=None, compress=False):
+        """
+        :param arc_builder: "projection" projects every OD pair forward in time once the nodes exist,
+                            "scan" connects every new node to all earlier layers (original constructor)
+        :param data: Data_processor, default: the process-wide shared_data_processor
+        :param compress: merge the chains of event-free nodes of every airport into single ground arcs (see compress)
+        """
         self.network = []
+        self.arc_builder = arc_builder
 
         self.flight_arc_lst = []
         self.ground_arc_lst = []
         self.ns_arc_lst = []
 
-        self.data = Data_processor()
+        self.data = shared_data_processor() if data is None else data
+
+        with metrics.phase("TSN build", arc_builder=arc_builder, compress=compress) as phase:
+            timestep_count = self.data.timestep_count
+
+            self.request_incidence = Request_incidence(request_dict=self.data.request_dict,
+                                                       airport_refs=list(self.data.airport_dict.keys()),
+                                                       timestep_count=timestep_count)
+
+            for _ in range(timestep_count):
+                self.add_timestep()
 
-        timestep_count = int(self.data.planning_horizon/self.data.timestep_duration + 1)
-        for _ in range(timestep_count):
-            self.add_timestep()
+            if self.arc_builder == "projection":
+                self.add_ground_arcs()
+                self.add_flight_arcs()
 
-        self.add_ns_arcs()
+            self.add_ns_arcs()
+
+            if compress:
+                self.compress()
+
+            # -> Position in arc_lst, flight arcs first (also the position in the flight arc cost vectors)
+            for index, arc in enumerate(self.arc_lst):
+                arc.index = index
+
+            self.flight_arc_costs = Flight_arc_costs(self)
+
+            phase.count(nodes=sum(len(network_layer) for network_layer in self.network),
+                        flight_arcs=len(self.flight_arc_lst),
+                        ground_arcs=len(self.ground_arc_lst),
+                        ns_arcs=len(self.ns_arc_lst))
 
     @property
     def arc_lst(self):
@@ -35,6 +279,38 @@ class Time_space_network:
 
         self.network.append(network_layer)
 
+    def add_ground_arcs(self):
+        for timestep in range(len(self.network)-1):
+            for airport_ref, node in self.network[timestep].items():
+                next_node = self.network[timestep+1][airport_ref]
+
+                ground_arc = Arc(type="Ground",
+                                 origin=node.ref,
+                                 origin_timestep=node.timestep,
+                                 destination=next_node.ref,
+                                 destination_timestep=next_node.timestep)
+
+                node.out_ground_arc_lst.append(ground_arc)
+                next_node.in_ground_arc_lst.append(ground_arc)
+                self.ground_arc_lst.append(ground_arc)
+
+    def add_flight_arcs(self):
+        # ... per OD pair, projected forward over every departure timestep
+        for airport_o_ref, airport_d_ref, steps in flight_arc_steps(self.data):
+            for timestep in range(len(self.network)-steps):
+                start_node = self.network[timestep][airport_o_ref]
+                end_node = self.network[timestep+steps][airport_d_ref]
+
+                flight_arc = Arc(type="Flight",
+                                 origin=start_node.ref,
+                                 origin_timestep=start_node.timestep,
+                                 destination=end_node.ref,
+                                 destination_timestep=end_node.timestep)
+
+                start_node.out_flight_arc_lst.append(flight_arc)
+                end_node.in_flight_arc_lst.append(flight_arc)
+                self.flight_arc_lst.append(flight_arc)
+
     def add_ns_arcs(self):
         for request_id, request in self.data.request_dict.items():
             start_node = self.network[request["release_step"]][request["airport_O"]]
@@ -57,6 +333,49 @@ class Time_space_network:
             self.ns_arc_lst.append(ns_arc)
 
 
+    def compress(self):
+        """
+        Node aggregation: a node without flight arcs, request events (Node.v) or aircraft boundary values (h, first
+        and last timestep) only passes aircraft and requests on along the ground. Every chain of these nodes is
+        removed and the ground arcs around it are merged into one ground arc between the event nodes of the airport.
+            Removed nodes are taken out of their network layer, layer t still holds the remaining nodes of timestep t
+            Flow through a chain equals flow on its merged arc and ground arcs cost nothing, so the models keep
+            the same optimum with fewer conservation constraints, y/z variables and pricing arcs
+        """
+        last_timestep = len(self.network) - 1
+
+        # -> Event nodes per airport, in time order
+        event_nodes = {airport_ref: [] for airport_ref in self.data.airport_dict.keys()}
+        for t, network_layer in enumerate(self.network):
+            for airport_ref, node in list(network_layer.items()):
+                node.in_ground_arc_lst = []
+                node.out_ground_arc_lst = []
+
+                if t in (0, last_timestep) or node.in_flight_arc_lst or node.out_flight_arc_lst \
+                        or node.in_ns_arc_lst or node.out_ns_arc_lst:
+                    event_nodes[airport_ref].append(node)
+                else:
+                    del network_layer[airport_ref]
+
+        # -> One ground arc between consecutive event nodes
+        self.ground_arc_lst = []
+        for airport_ref, nodes in event_nodes.items():
+            for node, next_node in zip(nodes[:-1], nodes[1:]):
+                ground_arc = Arc(type="Ground",
+                                 origin=node.ref,
+                                 origin_timestep=node.timestep,
+                                 destination=next_node.ref,
+                                 destination_timestep=next_node.timestep)
+
+                node.out_ground_arc_lst.append(ground_arc)
+                next_node.in_ground_arc_lst.append(ground_arc)
+                self.ground_arc_lst.append(ground_arc)
+
+        # ... ordered per timestep like add_ground_arcs
+        airport_index = self.request_incidence.airport_index
+        self.ground_arc_lst.sort(key=lambda arc: (arc.origin_timestep, airport_index[arc.origin_airport]))
+
+
 class Node:
     def __init__(self, airport_ref, TSN):
         self.airport_ref = airport_ref
@@ -71,8 +390,10 @@ class Node:
         self.in_ground_arc_lst = []
         self.in_ns_arc_lst = []
 
-        self.v = self.build_v(TSN=TSN)
-        self.connect_node(TSN=TSN)
+        self.v = TSN.request_incidence.node_v(self.timestep, self.airport_ref)
+
+        if TSN.arc_builder == "scan":
+            self.connect_node(TSN=TSN)
 
     def __str__(self):
         return f"Node: {self.ref}"
@@ -92,16 +413,17 @@ class Node:
         if len(TSN.network) != 0:
             # Iterating through all networks timesteps backward
             for timestep in range(len(TSN.network)-1, -1, -1):
-                delta_t = (self.timestep - timestep) * TSN.data.timestep_duration
+                # -> Durations compared in whole timesteps, float hours are not exact for e.g. 10 minute timesteps
+                delta_steps = self.timestep - timestep
 
                 # -> Limiting node parsing to maximum arc duration
-                if delta_t < TSN.data.max_arc_time + TSN.data.timestep_duration:
+                if delta_steps <= round(TSN.data.max_arc_time/TSN.data.timestep_duration):
                     # -> Connect every node
                     for node_ref, node in TSN.network[timestep].items():
 
                         # -> Add ground arc
                         if self.airport_ref == node.airport_ref:
-                            if delta_t == TSN.data.timestep_duration:
+                            if delta_steps == 1:
                                 new_ground_arc = Arc(type="Ground",
                                                      origin=node.ref,
                                                      origin_timestep=node.timestep,
@@ -118,7 +440,7 @@ class Node:
                                 TSN.ground_arc_lst.append(new_ground_arc)
 
                         # -> Add flight arcs
-                        elif TSN.data.duration_df.loc[node.airport_ref, self.airport_ref] == delta_t:
+                        elif round(TSN.data.duration_df.loc[node.airport_ref, self.airport_ref]/TSN.data.timestep_duration) == delta_steps:
                             # -> If arc is viable
                             if TSN.data.OD_df.loc[node.airport_ref, self.airport_ref] == 1:
                                 new_flight_arc = Arc(type="Flight",
@@ -139,17 +461,6 @@ class Node:
                 else:
                     break
 
-    def build_v(self, TSN: Time_space_network):
-        v = {}
-        for r, request in TSN.data.request_dict.items():
-            if request["release_step"] == self.timestep and request["airport_O"] == self.airport_ref:
-                v[r] = -1
-            elif request["due_step"] == self.timestep and request["airport_D"] == self.airport_ref:
-                v[r] = 1
-            else:
-                v[r] = 0
-        return v
-
 
 class Arc:
     def __init__(self, type, origin, origin_timestep, destination, destination_timestep, request_id=None):
@@ -164,6 +475,7 @@ class Arc:
         self.destination_timestep = destination_timestep
 
         self.request_id = request_id
+        self.index = None   # Position in TSN.arc_lst, set once the network is complete
 
         if self.request_id is None:
             self.ref = f"Arc: {self.type} - {self.origin}->{self.destination}"
@@ -181,6 +493,12 @@ class Arc:
 
 
 if __name__ == '__main__':
+    # -> Timing benchmark of both arc builders
+    for arc_builder in ["scan", "projection"]:
+        t_start = current_time()
+        net = Time_space_network(arc_builder=arc_builder)
+        print(f"{arc_builder} builder: {round(current_time()-t_start, 3)} s")
+
     net = Time_space_network()
     print(net.network)
 
@@ -0,0 +1,306 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+from functools import cached_property
+
+import numpy as np
+
+from Data_processor import shared_data_processor
+from Metrics import metrics
+from TSN import flight_arc_steps, Flight_arc_costs, Request_incidence
+
+# -> Arc type codes, the position in ARC_TYPES is the code stored in arc_type
+ARC_TYPES = ("Flight", "Ground", "NS")
+FLIGHT, GROUND, NS = 0, 1, 2
+
+
+class Compact_time_space_network:
+    """
+    Time space network stored as integer columns instead of Node/Arc objects.
+        Node id = timestep * airport_count + airport index (in airport_dict order)
+        Arcs are stored as origin node, destination node, type code and request id (-1 if not NS),
+        ordered flight arcs | ground arcs | NS arcs, like Time_space_network.arc_lst
+    Node_view and Arc_view offer the same attributes as Node and Arc, so Model_3 and CG can iterate over it as usual,
+    the view lists are only built when they are first used.
+    """
+    def __init__(self, data=None):
+        self.data = shared_data_processor() if data is None else data
+
+        with metrics.phase("TSN build", arc_builder="compact") as phase:
+            self.airport_refs = list(self.data.airport_dict.keys())
+            self.airport_index = {airport_ref: i for i, airport_ref in enumerate(self.airport_refs)}
+            self.airport_count = len(self.airport_refs)
+            self.timestep_count = self.data.timestep_count
+
+            # -> Nodes
+            self.node_count = self.timestep_count * self.airport_count
+            self.node_timestep = np.repeat(np.arange(self.timestep_count, dtype=np.int32), self.airport_count)
+            self.node_airport = np.tile(np.arange(self.airport_count, dtype=np.int32), self.timestep_count)
+
+            # -> Arcs
+            self.arc_origin = None
+            self.arc_destination = None
+            self.arc_type = None
+            self.arc_request = None
+            self.build_arcs()
+
+            # -> CSR adjacency (arc ids sorted per origin/destination node)
+            self.out_indptr, self.out_arcs = self.build_adjacency(self.arc_origin)
+            self.in_indptr, self.in_arcs = self.build_adjacency(self.arc_destination)
+
+            # -> Request boundary values, only the non-zero entries are stored
+            self.request_incidence = Request_incidence(request_dict=self.data.request_dict,
+                                                       airport_refs=self.airport_refs,
+                                                       timestep_count=self.timestep_count)
+
+            # -> Cost vectors of the flight arcs
+            self.flight_arc_costs = Flight_arc_costs(self)
+
+            phase.count(nodes=self.node_count,
+                        flight_arcs=self.flight_count,
+                        ground_arcs=self.ground_count,
+                        ns_arcs=self.ns_count)
+
+    def node_id(self, timestep, airport_ref):
+        return int(timestep) * self.airport_count + self.airport_index[airport_ref]
+
+    # ============================================================================= Arc generation
+    def build_arcs(self):
+        A = self.airport_count
+        T = self.timestep_count
+
+        # -> Flight arcs, every OD pair is projected over all timesteps at once
+        flight_origin = []
+        flight_destination = []
+        for airport_o_ref, airport_d_ref, steps in flight_arc_steps(self.data):
+            if steps >= T:
+                continue
+
+            departures = np.arange(T - steps, dtype=np.int64)
+            flight_origin.append(departures * A + self.airport_index[airport_o_ref])
+            flight_destination.append((departures + steps) * A + self.airport_index[airport_d_ref])
+
+        flight_origin = np.concatenate(flight_origin) if flight_origin else np.zeros(0, dtype=np.int64)
+        flight_destination = np.concatenate(flight_destination) if flight_destination else np.zeros(0, dtype=np.int64)
+
+        order = np.lexsort((flight_destination, flight_origin))
+        flight_origin = flight_origin[order]
+        flight_destination = flight_destination[order]
+
+        # -> Ground arcs, every node to the same airport one timestep later
+        ground_origin = np.arange((T - 1) * A, dtype=np.int64)
+        ground_destination = ground_origin + A
+
+        # -> NS arcs, one per request
+        request_ids = list(self.data.request_dict.keys())
+        ns_origin = np.array([self.node_id(request["release_step"], request["airport_O"])
+                              for request in self.data.request_dict.values()], dtype=np.int64)
+        ns_destination = np.array([self.node_id(request["due_step"], request["airport_D"])
+                                   for request in self.data.request_dict.values()], dtype=np.int64)
+
+        self.flight_count = len(flight_origin)
+        self.ground_count = len(ground_origin)
+        self.ns_count = len(ns_origin)
+
+        self.arc_origin = np.concatenate((flight_origin, ground_origin, ns_origin)).astype(np.int32)
+        self.arc_destination = np.concatenate((flight_destination, ground_destination, ns_destination)).astype(np.int32)
+        self.arc_type = np.concatenate((np.full(self.flight_count, FLIGHT, dtype=np.int8),
+                                        np.full(self.ground_count, GROUND, dtype=np.int8),
+                                        np.full(self.ns_count, NS, dtype=np.int8)))
+        self.arc_request = np.concatenate((np.full(self.flight_count + self.ground_count, -1, dtype=np.int64),
+                                           np.array(request_ids, dtype=np.int64)))
+
+    def build_adjacency(self, arc_node):
+        order = np.argsort(arc_node, kind="stable").astype(np.int32)
+        indptr = np.zeros(self.node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(arc_node, minlength=self.node_count), out=indptr[1:])
+        return indptr, order
+
+    @property
+    def arc_count(self):
+        return len(self.arc_origin)
+
+    # ============================================================================= View layer
+    # ... the views are built on first access and shared by every later access (and by the Node_view arc lists)
+    @cached_property
+    def arc_views(self):
+        return [Arc_view(self, a) for a in range(self.arc_count)]
+
+    @cached_property
+    def network(self):
+        network = []
+        for t in range(self.timestep_count):
+            network.append({airport_ref: Node_view(self, t * self.airport_count + i)
+                            for i, airport_ref in enumerate(self.airport_refs)})
+        return network
+
+    @cached_property
+    def flight_arc_lst(self):
+        return self.arc_views[:self.flight_count]
+
+    @cached_property
+    def ground_arc_lst(self):
+        return self.arc_views[self.flight_count:self.flight_count + self.ground_count]
+
+    @cached_property
+    def ns_arc_lst(self):
+        return self.arc_views[self.flight_count + self.ground_count:]
+
+    @property
+    def arc_lst(self):
+        return self.arc_views
+
+    @cached_property
+    def arc_lst_no_ns(self):
+        return self.arc_views[:self.flight_count + self.ground_count]
+
+
+class Node_view:
+    __slots__ = ("TSN", "index")
+
+    def __init__(self, TSN, index):
+        self.TSN = TSN
+        self.index = index
+
+    def __str__(self):
+        return f"Node: {self.ref}"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __eq__(self, other):
+        return isinstance(other, Node_view) and other.TSN is self.TSN and other.index == self.index
+
+    def __hash__(self):
+        return hash(self.index)
+
+    @property
+    def airport_ref(self):
+        return self.TSN.airport_refs[self.TSN.node_airport[self.index]]
+
+    @property
+    def timestep(self):
+        return int(self.TSN.node_timestep[self.index])
+
+    @property
+    def ref(self):
+        return f"{self.timestep}-{self.airport_ref}"
+
+    @property
+    def v(self):
+        return self.TSN.request_incidence.node_v(self.timestep, self.airport_ref)
+
+    def arcs(self, indptr, arcs, arc_type=None):
+        arc_ids = arcs[indptr[self.index]:indptr[self.index + 1]]
+        if arc_type is not None:
+            arc_ids = arc_ids[self.TSN.arc_type[arc_ids] == arc_type]
+        arc_views = self.TSN.arc_views
+        return [arc_views[a] for a in arc_ids]
+
+    @property
+    def out_flight_arc_lst(self):
+        return self.arcs(self.TSN.out_indptr, self.TSN.out_arcs, FLIGHT)
+
+    @property
+    def out_ground_arc_lst(self):
+        return self.arcs(self.TSN.out_indptr, self.TSN.out_arcs, GROUND)
+
+    @property
+    def out_ns_arc_lst(self):
+        return self.arcs(self.TSN.out_indptr, self.TSN.out_arcs, NS)
+
+    @property
+    def in_flight_arc_lst(self):
+        return self.arcs(self.TSN.in_indptr, self.TSN.in_arcs, FLIGHT)
+
+    @property
+    def in_ground_arc_lst(self):
+        return self.arcs(self.TSN.in_indptr, self.TSN.in_arcs, GROUND)
+
+    @property
+    def in_ns_arc_lst(self):
+        return self.arcs(self.TSN.in_indptr, self.TSN.in_arcs, NS)
+
+    @property
+    def in_arc_lst(self):
+        return self.in_flight_arc_lst + self.in_ground_arc_lst + self.in_ns_arc_lst
+
+    @property
+    def out_arc_lst(self):
+        return self.out_flight_arc_lst + self.out_ground_arc_lst + self.out_ns_arc_lst
+
+
+class Arc_view:
+    __slots__ = ("TSN", "index")
+
+    def __init__(self, TSN, index):
+        self.TSN = TSN
+        self.index = index
+
+    def __str__(self):
+        return self.ref
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __eq__(self, other):
+        return isinstance(other, Arc_view) and other.TSN is self.TSN and other.index == self.index
+
+    def __hash__(self):
+        return hash(self.index)
+
+    @property
+    def type(self):
+        return ARC_TYPES[self.TSN.arc_type[self.index]]
+
+    @property
+    def origin(self):
+        return f"{self.origin_timestep}-{self.origin_airport}"
+
+    @property
+    def origin_airport(self):
+        return self.TSN.airport_refs[self.TSN.node_airport[self.TSN.arc_origin[self.index]]]
+
+    @property
+    def origin_timestep(self):
+        return int(self.TSN.node_timestep[self.TSN.arc_origin[self.index]])
+
+    @property
+    def destination(self):
+        return f"{self.destination_timestep}-{self.destination_airport}"
+
+    @property
+    def destination_airport(self):
+        return self.TSN.airport_refs[self.TSN.node_airport[self.TSN.arc_destination[self.index]]]
+
+    @property
+    def destination_timestep(self):
+        return int(self.TSN.node_timestep[self.TSN.arc_destination[self.index]])
+
+    @property
+    def request_id(self):
+        request_id = int(self.TSN.arc_request[self.index])
+        return None if request_id == -1 else request_id
+
+    @property
+    def ref(self):
+        if self.request_id is None:
+            return f"Arc: {self.type} - {self.origin}->{self.destination}"
+        else:
+            return f"Arc: {self.type} (id:{self.request_id}) - {self.origin}->{self.destination}"
+
+
+if __name__ == '__main__':
+    net = Compact_time_space_network()
+
+    print(f"Node count: {net.node_count}")
+    print(f"Flight arcs count: {net.flight_count}")
+    print(f"Ground arcs count: {net.ground_count}")
+    print(f"NS arcs count: {net.ns_count}")
+
+    arrays = [net.node_timestep, net.node_airport, net.arc_origin, net.arc_destination, net.arc_type, net.arc_request,
+              net.out_indptr, net.out_arcs, net.in_indptr, net.in_arcs]
+    print(f"Array memory: {sum(array.nbytes for array in arrays)/1024:.1f} kB")
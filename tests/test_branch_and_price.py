@@ -0,0 +1,122 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import time
+
+import pytest
+
+from Benchmark import create_data
+from TSN import Time_space_network
+from Model_generator_3 import Model_3
+from Collum_generation import CG
+from Branch_and_price import Branch_and_price, Branch_node
+
+pytest.importorskip("highspy")
+
+
+@pytest.fixture(scope="module")
+def TSN():
+    return Time_space_network(data=create_data("4x48x12"))
+
+
+def test_bounds_bracket_the_optimum(TSN):
+    model = Model_3(TSN=TSN, backend="highs", solve=False)
+    model.model.set_output(False)
+    model.model.optimize()
+    optimum = model.model.result()["objective"]
+
+    branch_and_price = Branch_and_price(CG(TSN=TSN, solve=False, backend="highs"), node_limit=30)
+
+    assert branch_and_price.incumbent is not None
+    assert branch_and_price.best_bound <= optimum + 1e-6 * optimum
+    assert branch_and_price.incumbent_objective >= optimum - 1e-6 * optimum
+
+
+def test_time_limited_lp_is_no_node_bound(TSN, monkeypatch):
+    branch_and_price = Branch_and_price(CG(TSN=TSN, solve=False, backend="highs"), solve=False)
+    branch_and_price.t_start = 0
+    monkeypatch.setattr(branch_and_price, "remaining_time", lambda: 60)
+
+    # -> The LP has a (feasible, non-optimal) solution, but was stopped by the time limit
+    master = branch_and_price.cg.master
+    result = master.result
+    monkeypatch.setattr(master, "result", lambda: dict(result(), status="time_limit"))
+
+    path_count = branch_and_price.cg.path_count
+    status, values = branch_and_price.solve_node(Branch_node([], bound=float("-inf"), depth=0))
+
+    assert branch_and_price.cg.lp_bound is not None
+    assert (status, values) == ("time_limit", None)
+    assert branch_and_price.cg.path_count == path_count
+
+
+def test_gurobi_pricing_is_rejected(TSN):
+    with pytest.raises(ValueError, match="forbidden"):
+        Branch_and_price(CG(TSN=TSN, solve=False, backend="highs", pricing="gurobi"), solve=False)
+
+
+
+@pytest.mark.parametrize("backend", ["highs", None])
+def test_solver_settings_are_restored(TSN, backend):
+    cg = CG(TSN=TSN, solve=False, backend=backend)
+    if backend is not None:
+        cg.master.set_time_limit(123)
+        settings = (cg.master.get_time_limit(), cg.master.get_output())
+    else:
+        cg.master.setParam("TimeLimit", 123)
+        cg.relaxed_master.setParam("TimeLimit", 456)
+        settings = [(model.Params.TimeLimit, model.Params.OutputFlag) for model in [cg.master, cg.relaxed_master]]
+
+    Branch_and_price(cg, node_limit=3)
+
+    if backend is not None:
+        assert (cg.master.get_time_limit(), cg.master.get_output()) == settings
+    else:
+        assert [(model.Params.TimeLimit, model.Params.OutputFlag)
+                for model in [cg.master, cg.relaxed_master]] == settings
+
+
+def test_gurobi_master_bounds_bracket_the_optimum(TSN):
+    pytest.importorskip("gurobipy")
+    model = Model_3(TSN=TSN, backend="highs", solve=False)
+    model.model.set_output(False)
+    model.model.optimize()
+    optimum = model.model.result()["objective"]
+
+    branch_and_price = Branch_and_price(CG(TSN=TSN, solve=False, backend=None), node_limit=30)
+
+    assert branch_and_price.incumbent is not None
+    assert branch_and_price.best_bound <= optimum + 1e-6 * optimum
+    assert branch_and_price.incumbent_objective >= optimum - 1e-6 * optimum
+
+
+def test_gurobi_forbidden_arc_closes_the_paths_using_it(TSN):
+    pytest.importorskip("gurobipy")
+    branch_and_price = Branch_and_price(CG(TSN=TSN, solve=False, backend=None), solve=False)
+    cg = branch_and_price.cg
+    branch_and_price.t_start = time.perf_counter()
+    branch_and_price.solve_node(Branch_node([], bound=float("-inf"), depth=0))
+
+    # -> The master and its relaxation hold the same column at every index, also for the priced columns
+    cg.master.update()
+    cg.relaxed_master.update()
+    assert [v.VarName for v in cg.master.getVars()] == [v.VarName for v in cg.relaxed_master.getVars()]
+
+    path, arc_ids = next((path, arc_ids) for path, arc_ids in zip(branch_and_price.paths, branch_and_price.path_arc_ids)
+                         if any(a < branch_and_price.flight_count for a in arc_ids))
+    r = path.request_id
+    a = min(a for a in arc_ids if a < branch_and_price.flight_count)
+
+    branch_and_price.apply_decisions([("flow", (r, a), 0)])
+    cg.relaxed_master.update()
+    variables = cg.relaxed_master.getVars()
+
+    assert list(cg.forbidden_arcs[r]) == [a]
+    for path, column, arc_ids in zip(branch_and_price.paths, branch_and_price.path_columns,
+                                     branch_and_price.path_arc_ids):
+        closed = path.request_id == r and a in arc_ids
+        assert variables[column].VarName == f"z-{path.ref}-#{path.request_id}#"
+        assert (variables[column].UB == 0) == closed
@@ -0,0 +1,94 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+
+Distance_engine against the per-pair haversine loops the data loaders used before (copied from the baseline).
+"""
+
+import os
+from math import sqrt, pi, sin, cos
+
+import numpy as np
+import pandas as pd
+import pytest
+from numpy import arcsin
+
+from Data_processor import Data_processor
+from Distance_engine import haversine_matrix
+
+
+def data_processor_distance_df(airport_dict):
+    # -> Data_processor.create_distance_df before Distance_engine
+    deg2rad = pi/180
+    R_E = 6371 # km
+
+    airports = airport_dict.keys()
+    distance_df = pd.DataFrame(index=airports, columns=airports, data=0.)
+
+    for airport_i_ref, airport_i in airport_dict.items():
+        for airport_j_ref, airport_j in airport_dict.items():
+            lat_i = deg2rad * airport_i["lat"]
+            lat_j = deg2rad * airport_j["lat"]
+            lon_i = deg2rad * airport_i["lon"]
+            lon_j = deg2rad * airport_j["lon"]
+
+            term_1 = (np.sin( (lat_i-lat_j)/2 ))**2
+            term_2 = np.cos(lat_i)*np.cos(lat_j)*(np.sin( (lon_i-lon_j)/2 ))**2
+
+            distance_df.loc[airport_i_ref, airport_j_ref] = 2 * R_E * np.arcsin(np.sqrt(term_1+term_2))
+    return distance_df
+
+
+def network_generator_haversine(coord1: tuple, coord2: tuple):
+    # -> Network_generator_1B/2.haversine before Distance_engine
+    deg2rad = pi / 180
+    R = 6371
+    lat1, lon1 = coord1
+    lat2, lon2 = coord2
+
+    phi_i = deg2rad * lat1
+    phi_j = deg2rad * lat2
+    lambda_i = deg2rad * lon1
+    lambda_j = deg2rad * lon2
+
+    term_1 = (sin((phi_i - phi_j) / 2)) ** 2
+    term_2 = cos(phi_i) * cos(phi_j) * (sin((lambda_i - lambda_j) / 2)) ** 2
+
+    km = 2 * R * arcsin(sqrt(term_1 + term_2))
+    return 0, km
+
+
+def test_data_processor_distances():
+    data = Data_processor(use_cache=False)
+
+    expected = data_processor_distance_df(data.airport_dict)
+    pd.testing.assert_index_equal(data.distance_df.index, expected.index)
+    pd.testing.assert_index_equal(data.distance_df.columns, expected.columns)
+    np.testing.assert_allclose(data.distance_df.to_numpy(dtype=float), expected.to_numpy(dtype=float),
+                               rtol=1e-12, atol=1e-9)
+
+
+def test_network_generator_distances(repository_root):
+    airport_df = pd.read_csv(os.path.join(repository_root, "Assignment_1", "Destination_coordinates.csv"))
+    airport_df = airport_df.transpose()
+    airport_df.columns = airport_df.iloc[0]
+    airport_df = airport_df.iloc[1:].reset_index(drop=True)
+
+    lat = pd.to_numeric(airport_df["Latitude (deg)"]).to_numpy()
+    lon = pd.to_numeric(airport_df["Longitude (deg)"]).to_numpy()
+
+    expected = np.array([[network_generator_haversine((lat[i], lon[i]), (lat[j], lon[j]))[1]
+                          for j in range(len(lat))] for i in range(len(lat))])
+    np.testing.assert_allclose(haversine_matrix(lat, lon), expected, rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_random_coordinates(seed):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(-90, 90, 50)
+    lon = rng.uniform(-180, 180, 50)
+
+    expected = np.array([[network_generator_haversine((lat[i], lon[i]), (lat[j], lon[j]))[1]
+                          for j in range(len(lat))] for i in range(len(lat))])
+    np.testing.assert_allclose(haversine_matrix(lat, lon), expected, rtol=1e-12, atol=1e-6)
@@ -0,0 +1,50 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import numpy as np
+import pandas as pd
+
+from Data_processor import Data_processor, INPUT_FILES
+from Input_cache import save_frames, load_frames, read_excel_cached
+
+
+def test_round_trip_keeps_missing_cells(tmp_path):
+    df = pd.DataFrame({"Airport": ["LUX", np.nan, "ORD"],
+                       "Lat": [49.6, np.nan, 41.9],
+                       "Index": [1, 2, 3]})
+
+    path = str(tmp_path / "frames.npz")
+    save_frames(path, {"df": df})
+    loaded = load_frames(path, ["df"])["df"]
+
+    pd.testing.assert_frame_equal(loaded, df)
+    assert loaded["Airport"].isna().tolist() == [False, True, False]
+    assert len(loaded.dropna()) == 2
+
+
+def test_cached_frames_match_the_workbooks(tmp_path):
+    expected = {name: pd.read_excel(file_name) for name, file_name in INPUT_FILES.items()}
+
+    # -> Miss (parses and writes the snapshot), then hit (reads the snapshot)
+    for _ in range(2):
+        frames = read_excel_cached(INPUT_FILES, cache_dir=str(tmp_path))
+        for name, df in expected.items():
+            pd.testing.assert_frame_equal(frames[name], df)
+
+    assert len(list(tmp_path.glob("input_*.npz"))) == 1
+
+
+def test_cached_data_processor_matches_uncached():
+    Data_processor(use_cache=True)          # ... makes sure the snapshot exists
+    cached = Data_processor(use_cache=True).build_all()
+    uncached = Data_processor(use_cache=False).build_all()
+
+    assert cached.airport_dict == uncached.airport_dict
+    assert cached.OD_list == uncached.OD_list
+    assert cached.request_dict == uncached.request_dict
+    assert cached.aircraft_dict == uncached.aircraft_dict
+    pd.testing.assert_frame_equal(cached.distance_df, uncached.distance_df)
+    pd.testing.assert_frame_equal(cached.duration_df, uncached.duration_df)
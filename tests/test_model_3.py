@@ -0,0 +1,72 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import pytest
+
+from Benchmark import create_data, backend_parity
+from TSN import Time_space_network
+from Model_generator_3 import Model_3
+
+
+@pytest.fixture(scope="module")
+def TSN():
+    return Time_space_network(data=create_data("4x48x12"))
+
+
+def model_terms(model):
+    """
+    :return: objective and type per variable name, coefficients, sense and rhs per constraint name
+    """
+    model.update()
+    variables = model.getVars()
+    names = model.getAttr("VarName", variables)
+    objective = dict(zip(names, model.getAttr("Obj", variables)))
+    vtype = dict(zip(names, model.getAttr("VType", variables)))
+
+    A = model.getA().tocsr()
+    rows = {}
+    for i, constraint in enumerate(model.getConstrs()):
+        columns = A.indices[A.indptr[i]:A.indptr[i+1]]
+        values = A.data[A.indptr[i]:A.indptr[i+1]]
+        rows[constraint.ConstrName] = ({names[j]: value for j, value in zip(columns, values) if value != 0},
+                                       constraint.Sense, constraint.RHS)
+    return objective, vtype, rows
+
+
+@pytest.mark.parametrize("prune_z", [True, False])
+def test_matrix_builder_matches_linexpr_builder(TSN, prune_z):
+    matrix = Model_3(TSN=TSN, builder="matrix", prune_z=prune_z, solve=False)
+    linexpr = Model_3(TSN=TSN, builder="linexpr", prune_z=prune_z, solve=False)
+
+    matrix_objective, matrix_vtype, matrix_rows = model_terms(matrix.model)
+    linexpr_objective, linexpr_vtype, linexpr_rows = model_terms(linexpr.model)
+
+    assert matrix_objective == pytest.approx(linexpr_objective)
+    assert matrix_vtype == linexpr_vtype
+    assert matrix_rows.keys() == linexpr_rows.keys()
+
+    for name, (coefficients, sense, rhs) in linexpr_rows.items():
+        assert matrix_rows[name][0] == pytest.approx(coefficients), name
+        assert matrix_rows[name][1:] == (sense, pytest.approx(rhs)), name
+
+
+def test_backends_agree(TSN):
+    pytest.importorskip("highspy")
+    parity = backend_parity("4x48x12", backends=["gurobi", "highs"], time_limit=60)
+    gurobi, highs = parity["gurobi"], parity["highs"]
+
+    assert highs["model_3 LP bound"] == pytest.approx(gurobi["model_3 LP bound"], rel=1e-6)
+    assert highs["cg LP bound"] == pytest.approx(gurobi["cg LP bound"], rel=1e-6)
+
+    # -> The CG masters may hold different paths, only the Model_3 MIP has the same optimum on both backends
+    assert gurobi["model_3 MIP"]["status"] == highs["model_3 MIP"]["status"] == "optimal"
+    assert highs["model_3 MIP"]["objective"] == pytest.approx(gurobi["model_3 MIP"]["objective"], rel=1e-6)
+
+    # -> ... and the gurobipy model without Solver_backend
+    model = Model_3(TSN=TSN, solve=False)
+    model.model.setParam("OutputFlag", 0)
+    model.model.optimize()
+    assert model.model.ObjVal == pytest.approx(gurobi["model_3 MIP"]["objective"], rel=1e-6)
@@ -0,0 +1,74 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+
+DAG_pricer against the pricing MIP of CG.price_gurobi on the same duals.
+"""
+
+import numpy as np
+import pytest
+
+from Benchmark import create_data
+from TSN import Time_space_network
+from Collum_generation import CG
+
+
+@pytest.fixture(scope="module")
+def cg():
+    return CG(TSN=Time_space_network(data=create_data("4x48x12")), solve=False)
+
+
+def random_duals(cg, seed):
+    rng = np.random.default_rng(seed)
+    costs = cg.TSN.flight_arc_costs
+
+    # -> Weight capacity duals (<= 0) of the order of the flight arc unit costs, some arcs get cheaper than free
+    pi_f = -rng.uniform(0, 1.5, len(costs.unit_cost)) * costs.unit_cost
+    pi_r = rng.uniform(0, 1, len(cg.TSN.data.request_dict)) * 1e5
+
+    pi = {"f": dict(zip([arc.ref for arc in cg.TSN.flight_arc_lst], pi_f)),
+          "r": dict(zip(cg.TSN.data.request_dict.keys(), pi_r))}
+    return pi, pi_f
+
+
+def path_cost(cg, request, pi, arcs):
+    costs = cg.TSN.flight_arc_costs
+    return sum((costs.unit_cost[arc.index] - pi["f"][arc.ref]) * request["weight"]
+               for arc in arcs if arc.type == "Flight")
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("columns", [1, 3])
+def test_dag_pricer_matches_pricing_mip(cg, seed, columns):
+    pi, pi_f = random_duals(cg, seed)
+
+    for r, request in cg.TSN.data.request_dict.items():
+        dag = cg.pricer.price_columns(request, pi_f, pi["r"][r], columns)
+        mip = cg.price_gurobi(r, request, pi, columns)
+
+        assert len(dag) == len(mip)
+        np.testing.assert_allclose([reduced_cost for reduced_cost, _ in dag],
+                                   sorted(reduced_cost for reduced_cost, _ in mip), rtol=1e-6, atol=1e-3)
+
+        # -> The DAG paths go from the origin to the destination of the request and cost what they report
+        for reduced_cost, arcs in dag:
+            assert (arcs[0].origin_timestep, arcs[0].origin_airport) == (request["release_step"], request["airport_O"])
+            assert (arcs[-1].destination_timestep, arcs[-1].destination_airport) == (request["due_step"],
+                                                                                    request["airport_D"])
+            assert all(a.destination == b.origin for a, b in zip(arcs[:-1], arcs[1:]))
+            assert reduced_cost == pytest.approx(path_cost(cg, request, pi, arcs) - pi["r"][r], abs=1e-3)
+
+
+def test_forbidden_arcs_are_not_used(cg):
+    pi, pi_f = random_duals(cg, 0)
+
+    for r, request in cg.TSN.data.request_dict.items():
+        column = cg.pricer.price_arc_ids(request, pi_f, pi["r"][r])
+        if column is None or not column[1]:
+            continue
+
+        forbidden = np.array(column[1][:1])
+        for reduced_cost, arc_ids in cg.pricer.price_columns_arc_ids(request, pi_f, pi["r"][r], 3, forbidden):
+            assert forbidden[0] not in arc_ids
+            assert reduced_cost >= column[0] - 1e-6
@@ -0,0 +1,48 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import pytest
+
+from Rolling_horizon import Rolling_horizon
+
+pytest.importorskip("highspy")
+
+
+def fleet(data):
+    return {k: sum(airport["aircrafts"][k] for airport in data.airport_dict.values()) for k in data.aircraft_dict}
+
+
+@pytest.mark.parametrize("window, commit", [(24, 12), (32, 16)])
+def test_fleet_conserved_across_windows(window, commit):
+    rolling_horizon = Rolling_horizon(window=window, commit=commit, max_time=60, backend="highs", solve=False)
+
+    commits = []
+    commit_window = rolling_horizon.commit_window
+
+    def checked_commit_window(TSN, solution, start, commit):
+        cost = commit_window(TSN, solution, start, commit)
+        carried = {k: 0 for k in rolling_horizon.aircraft_refs}
+        for (step, _, k), count in rolling_horizon.aircraft_position.items():
+            assert step >= commit
+            carried[k] += count
+        assert carried == fleet(rolling_horizon.data)
+        commits.append(commit)
+        return cost
+
+    rolling_horizon.commit_window = checked_commit_window
+    rolling_horizon.run()
+
+    assert commits[-1] == rolling_horizon.last_step
+    assert len(rolling_horizon.windows) == len(commits)
+    assert sorted(rolling_horizon.delivered + rolling_horizon.unserved) == sorted(rolling_horizon.data.request_dict)
+
+
+def test_lost_aircraft_are_reported():
+    rolling_horizon = Rolling_horizon(solve=False)
+    rolling_horizon.aircraft_position.popitem()
+
+    with pytest.raises(RuntimeError, match="not conserved"):
+        rolling_horizon.check_fleet(0)
@@ -0,0 +1,131 @@
+"""
+Created on 18 oct. 2026
+@author: Group 10
+@course: AE4423, Airline planning and optimisation
+"""
+
+import numpy as np
+import pytest
+
+from Data_processor import shared_data_processor
+from TSN import Time_space_network, reachable_request_arcs
+from TSN_compact import Compact_time_space_network
+from Model_generator_3 import Model_3
+from Collum_generation import CG
+from Benchmark import create_data, run_scenario
+
+
+def arc_refs(arcs):
+    return sorted(arc.ref for arc in arcs)
+
+
+def node_arc_refs(network):
+    return {node.ref: (arc_refs(node.in_arc_lst), arc_refs(node.out_arc_lst))
+            for timestep in network for node in timestep.values()}
+
+
+@pytest.fixture(scope="module")
+def TSN():
+    return Time_space_network(data=shared_data_processor())
+
+
+@pytest.fixture(scope="module")
+def compact_TSN():
+    return Compact_time_space_network(data=shared_data_processor())
+
+
+@pytest.mark.parametrize("scenario", ["input", "4x48x12", "6x96x40x120"])
+def test_projection_builder_matches_scan_builder(scenario):
+    data = shared_data_processor() if scenario == "input" else create_data(scenario)
+    scan = Time_space_network(arc_builder="scan", data=data)
+    projection = Time_space_network(arc_builder="projection", data=data)
+
+    for arc_lst in ["flight_arc_lst", "ground_arc_lst", "ns_arc_lst"]:
+        assert arc_refs(getattr(projection, arc_lst)) == arc_refs(getattr(scan, arc_lst))
+
+    assert node_arc_refs(projection.network) == node_arc_refs(scan.network)
+
+
+def test_compact_network_matches_time_space_network(TSN, compact_TSN):
+    for arc_lst in ["flight_arc_lst", "ground_arc_lst", "ns_arc_lst", "arc_lst_no_ns"]:
+        assert arc_refs(getattr(compact_TSN, arc_lst)) == arc_refs(getattr(TSN, arc_lst))
+
+    assert node_arc_refs(compact_TSN.network) == node_arc_refs(TSN.network)
+
+
+def test_compact_views_are_built_once(compact_TSN):
+    for arc_lst in ["network", "flight_arc_lst", "ground_arc_lst", "ns_arc_lst", "arc_lst", "arc_lst_no_ns"]:
+        assert getattr(compact_TSN, arc_lst) is getattr(compact_TSN, arc_lst)
+
+    node = compact_TSN.network[1][compact_TSN.airport_refs[0]]
+    assert all(arc is compact_TSN.arc_lst[arc.index] for arc in node.out_arc_lst + node.in_arc_lst)
+
+
+@pytest.mark.parametrize("build", ["Model_3", "CG", "run_scenario"])
+def test_compact_network_is_not_compressed(build):
+    builders = {"Model_3": lambda: Model_3(compact_network=True, compress_network=True, solve=False),
+                "CG": lambda: CG(compact_network=True, compress_network=True, solve=False),
+                "run_scenario": lambda: run_scenario("input", compact_network=True, compress_network=True)}
+
+    with pytest.raises(ValueError, match="compress_network"):
+        builders[build]()
+
+
+def test_compact_network_builds_no_views():
+    compact_TSN = Compact_time_space_network(data=create_data("6x96x40x120"))
+    assert not {"arc_views", "network", "flight_arc_lst"} & compact_TSN.__dict__.keys()
+
+
+def test_flight_arc_costs_follow_the_arc_index(TSN, compact_TSN):
+    TSN_costs, compact_costs = TSN.flight_arc_costs, compact_TSN.flight_arc_costs
+    compact_arcs = {arc.ref: arc for arc in compact_TSN.flight_arc_lst}
+
+    for arc in TSN.flight_arc_lst:
+        assert arc is TSN.arc_lst[arc.index]
+        compact_arc = compact_arcs[arc.ref]
+        assert compact_costs.unit_cost[compact_arc.index] == pytest.approx(TSN_costs.unit_cost[arc.index])
+        assert (compact_costs.operational_cost[compact_arc.index] ==
+                pytest.approx(TSN_costs.operational_cost[arc.index]))
+
+
+def dense_reachable_request_arcs(TSN):
+    # -> Reference: forward/backward reachability of every (node, request) pair as dense matrices
+    incidence = TSN.request_incidence
+    requests = list(incidence.request_dict.values())
+    arcs = TSN.arc_lst_no_ns
+    node_ids = {(t, airport_ref): incidence.node_id(t, airport_ref)
+                for t in range(incidence.timestep_count) for airport_ref in incidence.airport_index}
+    arc_origin = np.array([node_ids[arc.origin_timestep, arc.origin_airport] for arc in arcs])
+    arc_destination = np.array([node_ids[arc.destination_timestep, arc.destination_airport] for arc in arcs])
+    arc_timestep = np.array([arc.origin_timestep for arc in arcs])
+
+    forward = np.zeros((len(node_ids), len(requests)), dtype=bool)
+    backward = np.zeros((len(node_ids), len(requests)), dtype=bool)
+    for j, request in enumerate(requests):
+        forward[node_ids[request["release_step"], request["airport_O"]], j] = True
+        backward[node_ids[request["due_step"], request["airport_D"]], j] = True
+
+    for t in range(incidence.timestep_count):
+        for a in np.flatnonzero(arc_timestep == t):
+            forward[arc_destination[a]] |= forward[arc_origin[a]]
+    for t in range(incidence.timestep_count - 1, -1, -1):
+        for a in np.flatnonzero(arc_timestep == t):
+            backward[arc_origin[a]] |= backward[arc_destination[a]]
+
+    return np.nonzero(forward[arc_origin] & backward[arc_destination])
+
+
+@pytest.mark.parametrize("network", ["input", "compressed", "compact", "synthetic"])
+def test_reachable_request_arcs(network):
+    data = create_data("6x96x40x120") if network == "synthetic" else shared_data_processor()
+    if network == "compact":
+        TSN = Compact_time_space_network(data=data)
+    else:
+        TSN = Time_space_network(data=data, compress=network == "compressed")
+
+    z_arc, z_request = reachable_request_arcs(TSN)
+    expected_arc, expected_request = dense_reachable_request_arcs(TSN)
+
+    assert len(z_arc) > 0
+    np.testing.assert_array_equal(z_arc, expected_arc)
+    np.testing.assert_array_equal(z_request, expected_request)